@@ -0,0 +1,34 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.domain.exceptions import (
+    GroupNotFoundException,
+    ReadOnlyStorageException,
+    StudentAlreadyInGroupException,
+    StudentNotFoundException,
+    StudentNotInGroupException,
+)
+
+
+async def not_found_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    """Ответ 404 для отсутствующих групп и студентов."""
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+async def conflict_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    """Ответ 409 для конфликтующих изменений."""
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
+
+
+async def read_only_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    """Ответ 405 для изменений в хранилище, доступном только для чтения."""
+    return JSONResponse(status_code=405, content={"detail": str(exc)})
+
+
+def register_exception_handlers(app: FastAPI) -> None:
+    """Сопоставить доменные исключения HTTP-ответам."""
+    app.add_exception_handler(GroupNotFoundException, not_found_exception_handler)
+    app.add_exception_handler(StudentNotFoundException, not_found_exception_handler)
+    app.add_exception_handler(StudentAlreadyInGroupException, conflict_exception_handler)
+    app.add_exception_handler(StudentNotInGroupException, conflict_exception_handler)
+    app.add_exception_handler(ReadOnlyStorageException, read_only_exception_handler)
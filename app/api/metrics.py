@@ -0,0 +1,64 @@
+from typing import Dict, List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.db_config import ASYNC_DB_ENGINE, REPLICA_DB_ENGINES
+from app.core.db_pool import pool_status
+from app.core.dependencies.group import GROUP_CACHE
+from app.core.instrumentation import prometheus_metric, render_route_metrics
+
+router = APIRouter()
+
+# Версия текстового формата экспозиции Prometheus
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pool_metrics() -> List[str]:
+    """Показатели пулов соединений основного сервера и реплик."""
+    pools: Dict[str, dict] = {"primary": pool_status(ASYNC_DB_ENGINE)}
+    for index, engine in enumerate(REPLICA_DB_ENGINES):
+        pools[f"replica-{index}"] = pool_status(engine)
+    lines = prometheus_metric("db_pool_connections", "gauge", "Соединения пула по состоянию.", [
+        ({"pool": name, "state": state}, status[state])
+        for name, status in pools.items()
+        for state in ("in_use", "idle", "overflow")
+    ])
+    lines += prometheus_metric("db_pool_size", "gauge", "Постоянный размер пула.", [
+        ({"pool": name}, status["size"]) for name, status in pools.items()
+    ])
+    lines += prometheus_metric("db_pool_waiting", "gauge", "Запросы, ждущие соединение.", [
+        ({"pool": name}, status["waiting"]) for name, status in pools.items()
+    ])
+    lines += prometheus_metric("db_pool_checkouts_total", "counter", "Выданные соединения.", [
+        ({"pool": name}, status["checkouts"]) for name, status in pools.items()
+    ])
+    lines += prometheus_metric("db_pool_wait_seconds_total", "counter", "Суммарное ожидание соединения.", [
+        ({"pool": name}, status["wait_seconds_total"]) for name, status in pools.items()
+    ])
+    lines += prometheus_metric("db_pool_timeouts_total", "counter", "Запросы, не дождавшиеся соединения.", [
+        ({"pool": name}, status["timeouts"]) for name, status in pools.items()
+    ])
+    return lines
+
+
+def _cache_metrics() -> List[str]:
+    """Показатели кэша чтений процесса."""
+    stats = GROUP_CACHE.stats
+    lines = prometheus_metric("cache_entries", "gauge", "Записи в кэше процесса.", [({}, len(GROUP_CACHE))])
+    for name, value, description in (
+            ("cache_hits_total", stats.hits, "Попадания в кэш."),
+            ("cache_misses_total", stats.misses, "Промахи кэша."),
+            ("cache_evictions_total", stats.evictions, "Вытеснения по размеру."),
+            ("cache_expirations_total", stats.expirations, "Удаления устаревших записей."),
+            ("cache_discarded_total", stats.discarded, "Значения, устаревшие за время загрузки."),
+    ):
+        lines += prometheus_metric(name, "counter", description, [({}, value)])
+    return lines
+
+
+@router.get("/metrics", summary="Prometheus metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Показатели запросов по маршрутам, пулов соединений и кэша в текстовом формате Prometheus"""
+    lines = render_route_metrics() + _pool_metrics() + _cache_metrics()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_MEDIA_TYPE)
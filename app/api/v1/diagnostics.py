@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.v1.schemas.diagnostics import ApiV1PoolsStatusSchema, ApiV1PoolStatusSchema, ApiV1ProfileSchema
+from app.core.config import SETTINGS
+from app.core.db_config import ASYNC_DB_ENGINE, REPLICA_DB_ENGINES
+from app.core.db_pool import pool_status
+from app.core.profiling import breakdown, sample_event_loop
+
+router = APIRouter()
+
+MAX_PROFILE_SECONDS = 300
+
+
+@router.get("/pool", summary="Get connection pool status")
+async def get_pool_status() -> ApiV1PoolsStatusSchema:
+    """Получить показатели пула соединений: занятые и свободные соединения и ожидание их выдачи"""
+    pools = {"primary": ApiV1PoolStatusSchema(**pool_status(ASYNC_DB_ENGINE))}
+    for index, engine in enumerate(REPLICA_DB_ENGINES):
+        pools[f"replica-{index}"] = ApiV1PoolStatusSchema(**pool_status(engine))
+    return ApiV1PoolsStatusSchema(pools=pools)
+
+
+@router.post("/profile", summary="Sample event loop stacks for a time window")
+async def profile(seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS)) -> ApiV1ProfileSchema:
+    """Снимать стеки цикла событий по всем запросам в течение окна и записать их в файл для flamegraph"""
+    if not SETTINGS.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    result = await sample_event_loop(
+        seconds, SETTINGS.PROFILING_SAMPLE_INTERVAL_MS / 1000, SETTINGS.PROFILING_OUTPUT_DIR
+    )
+    if result is None:
+        raise HTTPException(status_code=409, detail="Another profile is in progress")
+    path, stacks = result
+    return ApiV1ProfileSchema(path=path, samples=sum(stacks.values()), breakdown=breakdown(stacks))
@@ -0,0 +1,29 @@
+import hashlib
+
+from fastapi import Request, Response
+
+
+def make_etag(version: object) -> str:
+    """Сформировать сильный ETag из версии ресурса."""
+    return f'"{version}"'
+
+
+def make_query_etag(version: object, *params: object) -> str:
+    """Сформировать ETag ответа, зависящего от параметров запроса: версия ресурса и хэш параметров."""
+    digest = hashlib.blake2b(repr(params).encode(), digest_size=8).hexdigest()
+    return make_etag(f"{version}-{digest}")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Проверить, совпадает ли ETag с одним из значений заголовка If-None-Match."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match сравнивается слабо: префикс W/ не учитывается
+    candidates = [candidate.strip().removeprefix("W/") for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 без тела."""
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,55 @@
+import csv
+import io
+from typing import AsyncIterator, Literal, Union
+
+from app.domain.entities import Group, Student
+
+# Поддерживаемые форматы выгрузки и их MIME-типы
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Количество строк, отправляемых клиенту одним фрагментом
+EXPORT_CHUNK_SIZE = 500
+
+
+async def export_chunks(
+        entities: AsyncIterator[Union[Group, Student]],
+        export_format: ExportFormat
+) -> AsyncIterator[str]:
+    """
+    Преобразовать поток сущностей в фрагменты NDJSON или CSV.
+
+    Строки накапливаются в буфере не больше `EXPORT_CHUNK_SIZE` штук, поэтому
+    расход памяти не зависит от общего числа записей.
+
+    Args:
+        entities (AsyncIterator[Union[Group, Student]]): Поток групп или студентов.
+        export_format (ExportFormat): Формат выгрузки.
+
+    Yields:
+        str: Очередной фрагмент ответа.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if export_format == "csv":
+        writer.writerow(["id", "name", "number"])
+
+    rows = 0
+    async for entity in entities:
+        if export_format == "csv":
+            writer.writerow([entity.id, entity.name, entity.number])
+        else:
+            buffer.write(entity.model_dump_json())
+            buffer.write("\n")
+        rows += 1
+        if rows % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    tail = buffer.getvalue()
+    if tail:
+        yield tail
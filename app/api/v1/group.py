@@ -1,50 +1,171 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Optional, Set, Tuple, TypeVar
 
 from app.api.v1.schemas.group import (
+    ApiV1BatchGetSchema,
+    ApiV1BulkCreateItemSchema,
+    ApiV1BulkCreateResponseSchema,
+    ApiV1GroupBulkCreateSchema,
+    ApiV1StudentBulkCreateSchema,
+    ApiV1GroupBatchGetPayload,
+    ApiV1GroupBatchGetResponseSchema,
     ApiV1GroupGetSchema,
     ApiV1GroupCreateSchema,
+    ApiV1GroupListPayload,
     ApiV1GroupListSchema,
+    ApiV1GroupPayload,
     ApiV1GroupDeleteResponseSchema,
+    ApiV1GroupStudentsPayload,
     ApiV1GroupStudentsSchema,
+    ApiV1StudentBatchGetPayload,
+    ApiV1StudentBatchGetResponseSchema,
     ApiV1StudentCreateSchema,
     ApiV1StudentGetSchema,
+    ApiV1StudentListPayload,
     ApiV1StudentListSchema,
+    ApiV1StudentPayload,
     ApiV1StudentDeleteResponseSchema,
     ApiV1StudentGroupAssignSchema,
+    ApiV1StudentGroupBulkAssignSchema,
+    ApiV1StudentGroupBulkRemoveSchema,
+    ApiV1StudentGroupBulkTransferSchema,
     ApiV1StudentGroupRemoveSchema,
     ApiV1StudentGroupTransferSchema
 )
+from app.api.v1.etag import etag_matches, make_etag, make_query_etag, not_modified
+from app.api.v1.export import EXPORT_MEDIA_TYPES, ExportFormat, export_chunks
+from app.api.v1.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, decode_cursor, encode_cursor
+from app.api.v1.responses import json_response
 from app.core.dependencies.group import group_persistence_dependency
-from app.domain.entities import Group, Student
+from app.domain.entities import Group, GroupFilter, Student, StudentFilter
+from app.domain.exceptions import GroupNotFoundException
 from app.persistance.base import BaseGroupPersistence
 
 router = APIRouter()
 
+T = TypeVar("T", Group, Student)
+
+
+def _bulk_create_response(requested_ids: List[UUID], created_ids: Set[UUID]) -> ApiV1BulkCreateResponseSchema:
+    """Сформировать поэлементный результат пакетного создания."""
+    results = []
+    for entity_id in requested_ids:
+        # Повтор ID внутри одного запроса считается созданным только один раз
+        created = entity_id in created_ids
+        created_ids.discard(entity_id)
+        results.append(ApiV1BulkCreateItemSchema(id=entity_id, created=created))
+    created_count = sum(item.created for item in results)
+    return ApiV1BulkCreateResponseSchema(
+        created=created_count,
+        skipped=len(results) - created_count,
+        results=results
+    )
+
+
+def _group_payload(group: Group) -> ApiV1GroupPayload:
+    """Сформировать представление группы для быстрой сериализации."""
+    return {"id": group.id, "name": group.name, "number": group.number}
+
+
+def _student_payload(student: Student) -> ApiV1StudentPayload:
+    """Сформировать представление студента вместе с его группами для быстрой сериализации."""
+    return {
+        "id": student.id,
+        "name": student.name,
+        "number": student.number,
+        "group_id": student.group_ids[0] if student.group_ids else None,
+        "group_ids": student.group_ids,
+    }
+
+
+def _split_found(requested_ids: List[UUID], found: List[T]) -> Tuple[List[T], List[UUID]]:
+    """Упорядочить найденные записи по первому упоминанию в запросе и собрать ненайденные ID."""
+    by_id: Dict[UUID, T] = {entity.id: entity for entity in found}
+    ordered, not_found = [], []
+    for entity_id in dict.fromkeys(requested_ids):
+        entity = by_id.get(entity_id)
+        if entity is not None:
+            ordered.append(entity)
+        else:
+            not_found.append(entity_id)
+    return ordered, not_found
+
+
+def _filters(filters: GroupFilter) -> Optional[GroupFilter]:
+    """Вернуть None, если ни одно условие отбора не задано: хранилище отдаст страницу без проверки условий."""
+    return filters if filters.model_dump(exclude_none=True) else None
+
 
 # Эндпоинты для работы с группами
 @router.get("/groups", summary="Get all groups", response_model=ApiV1GroupListSchema)
 async def get_groups(
+        request: Request,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+        after: Optional[str] = None,
+        number: Optional[str] = None,
+        name_prefix: Optional[str] = Query(None, min_length=1),
+        search: Optional[str] = Query(None, min_length=1),
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ) -> ApiV1GroupListSchema:
-    """Получить список всех групп (требование 8)"""
-    groups = group_persistence.get_all()
-    return ApiV1GroupListSchema(
-        groups=[ApiV1GroupGetSchema(id=g.id, name=g.name, number=g.number) for g in groups]
+    """Получить страницу списка групп с отбором по номеру, префиксу и подстроке названия (требование 8)"""
+    # Версия списка проверяется до загрузки страницы: неизменившийся список отдаётся как 304.
+    # Параметры входят в ETag, иначе ETag одной страницы подошёл бы к другой странице или отбору
+    etag = make_query_etag(await group_persistence.get_groups_revision(), limit, after, number, name_prefix, search)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница
+    filters = _filters(GroupFilter(number=number, name_prefix=name_prefix, search=search))
+    groups = await group_persistence.get_groups_page(limit + 1, decode_cursor(after), filters)
+    next_cursor = None
+    if len(groups) > limit:
+        groups = groups[:limit]
+        next_cursor = encode_cursor(groups[-1].name, groups[-1].id)
+    return json_response(ApiV1GroupListPayload, {
+        "groups": [_group_payload(group) for group in groups],
+        "next_cursor": next_cursor,
+    }, response)
+
+
+@router.get("/groups/export", summary="Export all groups")
+async def export_groups(
+        format: ExportFormat = "ndjson",
+        group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
+) -> StreamingResponse:
+    """Потоковая выгрузка всех групп в формате NDJSON или CSV"""
+    return StreamingResponse(
+        export_chunks(group_persistence.iter_groups(), format),
+        media_type=EXPORT_MEDIA_TYPES[format]
     )
 
 
+@router.post("/groups/batch-get", summary="Get groups by IDs", response_model=ApiV1GroupBatchGetResponseSchema)
+async def get_groups_by_ids(
+        batch: ApiV1BatchGetSchema,
+        response: Response,
+        group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
+) -> ApiV1GroupBatchGetResponseSchema:
+    """Получить несколько групп по их ID одним запросом"""
+    groups, not_found = _split_found(batch.ids, await group_persistence.get_groups_by_ids(batch.ids))
+    return json_response(ApiV1GroupBatchGetPayload, {
+        "groups": [_group_payload(group) for group in groups],
+        "not_found": not_found,
+    }, response)
+
+
 @router.get("/groups/{group_id}", summary="Get group by ID", response_model=Optional[ApiV1GroupGetSchema])
 async def get_group(
         group_id: UUID,
+        response: Response,
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ) -> Optional[ApiV1GroupGetSchema]:
     """Получить информацию о группе по её ID (требование 4)"""
-    group = group_persistence.get_by_id(group_id)
-    if group:
-        return ApiV1GroupGetSchema(id=group.id, name=group.name, number=group.number)
-    return None
+    group = await group_persistence.get_by_id(group_id)
+    return json_response(Optional[ApiV1GroupPayload], _group_payload(group) if group else None, response)
 
 
 @router.post("/groups", summary="Create new group", response_model=ApiV1GroupGetSchema)
@@ -58,7 +179,7 @@ async def create_group(
         name=group_to_create.name,
         number=group_to_create.number
     )
-    created_group = group_persistence.create_group(group)
+    created_group = await group_persistence.create_group(group)
     return ApiV1GroupCreateSchema(
         id=created_group.id,
         name=created_group.name,
@@ -66,16 +187,26 @@ async def create_group(
     )
 
 
+@router.post("/groups/bulk", summary="Create groups in bulk", response_model=ApiV1BulkCreateResponseSchema)
+async def create_groups_bulk(
+        bulk: ApiV1GroupBulkCreateSchema,
+        group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
+) -> ApiV1BulkCreateResponseSchema:
+    """Создать несколько групп одной транзакцией"""
+    created_ids = set(await group_persistence.create_groups_bulk([
+        Group(id=group.id, name=group.name, number=group.number)
+        for group in bulk.groups
+    ]))
+    return _bulk_create_response([group.id for group in bulk.groups], created_ids)
+
+
 @router.delete("/groups/{group_id}", summary="Delete group", response_model=ApiV1GroupDeleteResponseSchema)
 async def delete_group(
         group_id: UUID,
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ) -> ApiV1GroupDeleteResponseSchema:
     """Удалить группу (требование 6)"""
-    if not group_persistence.get_by_id(group_id):
-        raise HTTPException(status_code=404, detail="Group not found")
-
-    group_persistence.delete_group(group_id)
+    await group_persistence.delete_group(group_id)
     return ApiV1GroupDeleteResponseSchema(
         success=True,
         message="Group successfully deleted",
@@ -86,35 +217,68 @@ async def delete_group(
 # Эндпоинты для работы со студентами
 @router.get("/students", summary="Get all students", response_model=ApiV1StudentListSchema)
 async def get_students(
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+        after: Optional[str] = None,
+        number: Optional[str] = None,
+        name_prefix: Optional[str] = Query(None, min_length=1),
+        search: Optional[str] = Query(None, min_length=1),
+        group_id: Optional[UUID] = None,
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ) -> ApiV1StudentListSchema:
-    """Получить список всех студентов (требование 7)"""
-    students = group_persistence.get_all_students()
-    return ApiV1StudentListSchema(
-        students=[
-            ApiV1StudentGetSchema(
-                id=student.id,
-                name=student.name,
-                number=student.number
-            ) for student in students
-        ]
+    """Получить страницу списка студентов с отбором по номеру, названию и группе (требование 7)"""
+    filters = _filters(StudentFilter(number=number, name_prefix=name_prefix, search=search, group_id=group_id))
+    students = await group_persistence.get_students_page(limit + 1, decode_cursor(after), filters)
+    next_cursor = None
+    if len(students) > limit:
+        students = students[:limit]
+        next_cursor = encode_cursor(students[-1].name, students[-1].id)
+    return json_response(ApiV1StudentListPayload, {
+        "students": [_student_payload(student) for student in students],
+        "next_cursor": next_cursor,
+    })
+
+
+@router.get("/students/export", summary="Export all students")
+async def export_students(
+        format: ExportFormat = "ndjson",
+        group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
+) -> StreamingResponse:
+    """Потоковая выгрузка всех студентов в формате NDJSON или CSV"""
+    return StreamingResponse(
+        export_chunks(group_persistence.iter_students(), format),
+        media_type=EXPORT_MEDIA_TYPES[format]
     )
 
 
+@router.post(
+    "/students/batch-get",
+    summary="Get students by IDs",
+    response_model=ApiV1StudentBatchGetResponseSchema
+)
+async def get_students_by_ids(
+        batch: ApiV1BatchGetSchema,
+        response: Response,
+        group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
+) -> ApiV1StudentBatchGetResponseSchema:
+    """Получить нескольких студентов вместе с их группами по их ID одним запросом"""
+    students, not_found = _split_found(batch.ids, await group_persistence.get_students_by_ids(batch.ids))
+    return json_response(ApiV1StudentBatchGetPayload, {
+        "students": [_student_payload(student) for student in students],
+        "not_found": not_found,
+    }, response)
+
+
 @router.get("/students/{student_id}", summary="Get student by ID", response_model=ApiV1StudentGetSchema)
 async def get_student(
         student_id: UUID,
+        response: Response,
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ) -> ApiV1StudentGetSchema:
     """Получить информацию о студенте по его ID (требование 3)"""
-    student = group_persistence.get_student_by_id(student_id)
+    student = await group_persistence.get_student_by_id(student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return ApiV1StudentGetSchema(
-        id=student.id,
-        name=student.name,
-        number=student.number
-    )
+    return json_response(ApiV1StudentPayload, _student_payload(student), response)
 
 
 @router.post("/students", summary="Create new student", response_model=ApiV1StudentGetSchema)
@@ -128,12 +292,21 @@ async def create_student(
         name=student.name,
         number=student.number
     )
-    created_student = group_persistence.create_student(new_student)
-    return ApiV1StudentGetSchema(
-        id=created_student.id,
-        name=created_student.name,
-        number=created_student.number
-    )
+    created_student = await group_persistence.create_student(new_student)
+    return ApiV1StudentGetSchema(**_student_payload(created_student))
+
+
+@router.post("/students/bulk", summary="Create students in bulk", response_model=ApiV1BulkCreateResponseSchema)
+async def create_students_bulk(
+        bulk: ApiV1StudentBulkCreateSchema,
+        group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
+) -> ApiV1BulkCreateResponseSchema:
+    """Создать несколько студентов одной транзакцией"""
+    created_ids = set(await group_persistence.create_students_bulk([
+        Student(id=student.id, name=student.name, number=student.number)
+        for student in bulk.students
+    ]))
+    return _bulk_create_response([student.id for student in bulk.students], created_ids)
 
 
 @router.delete("/students/{student_id}", summary="Delete student", response_model=ApiV1StudentDeleteResponseSchema)
@@ -142,10 +315,7 @@ async def delete_student(
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ) -> ApiV1StudentDeleteResponseSchema:
     """Удалить студента (требование 5)"""
-    if not group_persistence.get_student_by_id(student_id):
-        raise HTTPException(status_code=404, detail="Student not found")
-
-    group_persistence.delete_student(student_id)
+    await group_persistence.delete_student(student_id)
     return ApiV1StudentDeleteResponseSchema(
         success=True,
         message="Student successfully deleted",
@@ -157,25 +327,27 @@ async def delete_student(
 @router.get("/groups/{group_id}/students", summary="Get students in group", response_model=ApiV1GroupStudentsSchema)
 async def get_group_students(
         group_id: UUID,
+        request: Request,
+        response: Response,
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ) -> ApiV1GroupStudentsSchema:
     """Получить всех студентов в группе (требование 11)"""
-    group = group_persistence.get_by_id(group_id)
-    if not group:
-        raise HTTPException(status_code=404, detail="Group not found")
-
-    students = group_persistence.get_group_students(group_id)
-    return ApiV1GroupStudentsSchema(
-        group_id=group.id,
-        group_name=group.name,
-        students=[
-            ApiV1StudentGetSchema(
-                id=student.id,
-                name=student.name,
-                number=student.number
-            ) for student in students
-        ]
-    )
+    # Ревизия группы меняется при каждом изменении состава, поэтому 304 отдаётся без загрузки студентов
+    found = await group_persistence.get_group_with_revision(group_id)
+    if found is None:
+        raise GroupNotFoundException(group_id)
+    group, revision = found
+    etag = make_etag(revision)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    students = await group_persistence.get_group_students(group_id)
+    return json_response(ApiV1GroupStudentsPayload, {
+        "group_id": group.id,
+        "group_name": group.name,
+        "students": [_student_payload(student) for student in students],
+    }, response)
 
 
 @router.post("/groups/assign-student", summary="Assign student to group")
@@ -184,12 +356,7 @@ async def assign_student_to_group(
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ):
     """Добавить студента в группу (требование 9)"""
-    if not group_persistence.get_student_by_id(assignment.student_id):
-        raise HTTPException(status_code=404, detail="Student not found")
-    if not group_persistence.get_by_id(assignment.group_id):
-        raise HTTPException(status_code=404, detail="Group not found")
-
-    group_persistence.assign_student_to_group(assignment.student_id, assignment.group_id)
+    await group_persistence.assign_student_to_group(assignment.student_id, assignment.group_id)
     return {"message": "Student successfully assigned to group"}
 
 
@@ -199,12 +366,7 @@ async def remove_student_from_group(
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ):
     """Удалить студента из группы (требование 10)"""
-    if not group_persistence.get_student_by_id(removal.student_id):
-        raise HTTPException(status_code=404, detail="Student not found")
-    if not group_persistence.get_by_id(removal.group_id):
-        raise HTTPException(status_code=404, detail="Group not found")
-
-    group_persistence.remove_student_from_group(removal.student_id, removal.group_id)
+    await group_persistence.remove_student_from_group(removal.student_id, removal.group_id)
     return {"message": "Student successfully removed from group"}
 
 
@@ -214,16 +376,45 @@ async def transfer_student(
         group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
 ):
     """Перевести студента из одной группы в другую (требование 12)"""
-    if not group_persistence.get_student_by_id(transfer.student_id):
-        raise HTTPException(status_code=404, detail="Student not found")
-    if not group_persistence.get_by_id(transfer.from_group_id):
-        raise HTTPException(status_code=404, detail="Source group not found")
-    if not group_persistence.get_by_id(transfer.to_group_id):
-        raise HTTPException(status_code=404, detail="Destination group not found")
-
-    group_persistence.transfer_student_between_groups(
+    await group_persistence.transfer_student_between_groups(
         transfer.student_id,
         transfer.from_group_id,
         transfer.to_group_id
     )
-    return {"message": "Student successfully transferred between groups"}
\ No newline at end of file
+    return {"message": "Student successfully transferred between groups"}
+
+
+@router.post("/groups/assign-students", summary="Assign students to groups in bulk")
+async def assign_students_to_groups(
+        bulk: ApiV1StudentGroupBulkAssignSchema,
+        group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
+):
+    """Добавить несколько студентов в группы одной транзакцией"""
+    await group_persistence.assign_students_to_groups(
+        [(assignment.student_id, assignment.group_id) for assignment in bulk.assignments]
+    )
+    return {"message": "Students successfully assigned to groups"}
+
+
+@router.post("/groups/remove-students", summary="Remove students from groups in bulk")
+async def remove_students_from_groups(
+        bulk: ApiV1StudentGroupBulkRemoveSchema,
+        group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
+):
+    """Удалить несколько студентов из групп одной транзакцией"""
+    await group_persistence.remove_students_from_groups(
+        [(removal.student_id, removal.group_id) for removal in bulk.removals]
+    )
+    return {"message": "Students successfully removed from groups"}
+
+
+@router.post("/groups/transfer-students", summary="Transfer students between groups in bulk")
+async def transfer_students(
+        bulk: ApiV1StudentGroupBulkTransferSchema,
+        group_persistence: BaseGroupPersistence = Depends(group_persistence_dependency)
+):
+    """Перевести несколько студентов между группами одной транзакцией"""
+    await group_persistence.transfer_students_between_groups(
+        [(transfer.student_id, transfer.from_group_id, transfer.to_group_id) for transfer in bulk.transfers]
+    )
+    return {"message": "Students successfully transferred between groups"}
\ No newline at end of file
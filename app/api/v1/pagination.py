@@ -0,0 +1,28 @@
+import base64
+import binascii
+import json
+from typing import Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+
+# Размер страницы по умолчанию и максимально допустимый размер
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+
+def encode_cursor(name: str, entity_id: UUID) -> str:
+    """Упаковать позицию (name, id) последней записи страницы в непрозрачный курсор."""
+    raw = json.dumps([name, str(entity_id)], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, UUID]]:
+    """Распаковать курсор в позицию (name, id); некорректный курсор даёт ответ 400."""
+    if cursor is None:
+        return None
+    try:
+        name, entity_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(name), UUID(entity_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
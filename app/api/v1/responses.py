@@ -0,0 +1,33 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _adapter(payload_type: Any) -> TypeAdapter:
+    """Сериализатор для формы ответа; схема сериализации строится один раз на тип."""
+    return TypeAdapter(payload_type)
+
+
+def json_response(payload_type: Any, content: Any, response: Optional[Response] = None) -> Response:
+    """
+    Закодировать ответ в JSON-байты сериализатором pydantic-core.
+
+    Ответ собирается из словарей, описанных `TypedDict`-формами, и не проходит ни создание схем, ни
+    повторную валидацию и `jsonable_encoder` по `response_model`: готовый `Response` FastAPI отдаёт
+    как есть. `response_model` эндпоинта остаётся для документации OpenAPI.
+
+    Args:
+        payload_type (Any): Форма ответа (`TypedDict` или `Optional[...]` от него).
+        content (Any): Данные ответа.
+        response (Optional[Response]): Ответ, внедрённый в эндпоинт; его код и заголовки (ETag, cookie)
+            переносятся в итоговый ответ.
+    """
+    fast_response = Response(content=_adapter(payload_type).dump_json(content), media_type="application/json")
+    if response is not None:
+        if response.status_code:
+            fast_response.status_code = response.status_code
+        fast_response.raw_headers.extend(response.headers.raw)
+    return fast_response
@@ -0,0 +1,23 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class ApiV1PoolStatusSchema(BaseModel):
+    size: int
+    in_use: int
+    idle: int
+    overflow: int
+    checkouts: int
+    waiting: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    timeouts: int
+
+class ApiV1PoolsStatusSchema(BaseModel):
+    pools: Dict[str, ApiV1PoolStatusSchema]  # Показатели пула каждого движка по его имени
+
+class ApiV1ProfileSchema(BaseModel):
+    path: str  # Файл со свёрнутыми стеками для flamegraph.pl или speedscope
+    samples: int
+    breakdown: Dict[str, float]  # Доля выборок по пакетам и ожиданию ввода-вывода
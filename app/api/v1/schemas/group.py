@@ -1,6 +1,13 @@
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
+from typing_extensions import TypedDict
+
+# Максимальное количество элементов в одном пакетном запросе
+MAX_BULK_SIZE = 50000
+
+# Максимальное количество ID в одном запросе пакетного чтения
+MAX_BATCH_GET_SIZE = 1000
 
 # Базовые схемы
 class ApiV1GroupCreateSchema(BaseModel):
@@ -22,14 +29,17 @@ class ApiV1StudentGetSchema(BaseModel):
     id: UUID
     name: str
     number: str
-    group_id: Optional[UUID] = None  # Студент может принадлежать к группе
+    group_id: Optional[UUID] = None  # Первая из групп студента (для совместимости со старыми клиентами)
+    group_ids: List[UUID] = []  # Все группы студента в порядке возрастания ID
 
 # Схемы для списков
 class ApiV1GroupListSchema(BaseModel):
     groups: List[ApiV1GroupGetSchema]
+    next_cursor: Optional[str] = None  # Курсор следующей страницы, None на последней странице
 
 class ApiV1StudentListSchema(BaseModel):
     students: List[ApiV1StudentGetSchema]
+    next_cursor: Optional[str] = None  # Курсор следующей страницы, None на последней странице
 
 # Схемы для ответов на удаление
 class ApiV1StudentDeleteResponseSchema(BaseModel):
@@ -56,8 +66,82 @@ class ApiV1StudentGroupTransferSchema(BaseModel):
     from_group_id: UUID
     to_group_id: UUID
 
+# Схемы для пакетных операций с группами студентов
+class ApiV1StudentGroupBulkAssignSchema(BaseModel):
+    assignments: List[ApiV1StudentGroupAssignSchema] = Field(max_length=MAX_BULK_SIZE)
+
+class ApiV1StudentGroupBulkRemoveSchema(BaseModel):
+    removals: List[ApiV1StudentGroupRemoveSchema] = Field(max_length=MAX_BULK_SIZE)
+
+class ApiV1StudentGroupBulkTransferSchema(BaseModel):
+    transfers: List[ApiV1StudentGroupTransferSchema] = Field(max_length=MAX_BULK_SIZE)
+
 # Схема для списка студентов в группе
 class ApiV1GroupStudentsSchema(BaseModel):
     group_id: UUID
     group_name: str
     students: List[ApiV1StudentGetSchema]
+
+# Схемы для пакетного создания
+class ApiV1GroupBulkCreateSchema(BaseModel):
+    groups: List[ApiV1GroupCreateSchema] = Field(max_length=MAX_BULK_SIZE)
+
+class ApiV1StudentBulkCreateSchema(BaseModel):
+    students: List[ApiV1StudentCreateSchema] = Field(max_length=MAX_BULK_SIZE)
+
+class ApiV1BulkCreateItemSchema(BaseModel):
+    id: UUID
+    created: bool  # False, если запись с таким ID уже существовала
+
+class ApiV1BulkCreateResponseSchema(BaseModel):
+    created: int
+    skipped: int
+    results: List[ApiV1BulkCreateItemSchema]
+
+# Схемы для пакетного чтения по ID
+class ApiV1BatchGetSchema(BaseModel):
+    ids: List[UUID] = Field(max_length=MAX_BATCH_GET_SIZE)
+
+class ApiV1GroupBatchGetResponseSchema(BaseModel):
+    groups: List[ApiV1GroupGetSchema]  # В порядке первого упоминания в запросе
+    not_found: List[UUID]
+
+class ApiV1StudentBatchGetResponseSchema(BaseModel):
+    students: List[ApiV1StudentGetSchema]  # В порядке первого упоминания в запросе
+    not_found: List[UUID]
+
+# Формы JSON-ответов списков и карточек для быстрой сериализации (app/api/v1/responses.py):
+# ответ собирается из словарей и сразу кодируется в JSON без создания и валидации схем выше.
+# Поля должны совпадать с соответствующими схемами, которые остаются описанием ответа в OpenAPI.
+class ApiV1GroupPayload(TypedDict):
+    id: UUID
+    name: str
+    number: str
+
+class ApiV1StudentPayload(TypedDict):
+    id: UUID
+    name: str
+    number: str
+    group_id: Optional[UUID]
+    group_ids: List[UUID]
+
+class ApiV1GroupListPayload(TypedDict):
+    groups: List[ApiV1GroupPayload]
+    next_cursor: Optional[str]
+
+class ApiV1StudentListPayload(TypedDict):
+    students: List[ApiV1StudentPayload]
+    next_cursor: Optional[str]
+
+class ApiV1GroupStudentsPayload(TypedDict):
+    group_id: UUID
+    group_name: str
+    students: List[ApiV1StudentPayload]
+
+class ApiV1GroupBatchGetPayload(TypedDict):
+    groups: List[ApiV1GroupPayload]
+    not_found: List[UUID]
+
+class ApiV1StudentBatchGetPayload(TypedDict):
+    students: List[ApiV1StudentPayload]
+    not_found: List[UUID]
@@ -13,6 +13,50 @@ class Settings(BaseSettings):
     DB_HOSTNAME: str
     DB_PORT: str
 
+    # Пул соединений и параметры сессий базы данных
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # -1 отключает пересоздание соединений по возрасту
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 — без ограничения
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # 0 отключает кэш подготовленных выражений (нужно за pgbouncer)
+
+    # Реплики для чтения: DSN через запятую; методы чтения распределяются между ними по кругу
+    DB_REPLICA_URIS: str = ""
+    # Сколько секунд после записи клиент читает с основного сервера (0 — не закреплять)
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Журнал SQL-выражений дольше порога с формой параметров (типы и размеры, без значений); 0 отключает журнал
+    DB_SLOW_QUERY_MS: float = 0.0
+
+    # Заголовок Server-Timing с временем ответа, SQL и ожидания пула в каждом ответе
+    SERVER_TIMING_ENABLED: bool = True
+
+    # Профилирование по запросу: заголовок PROFILING_HEADER (pstats или collapsed) и выборка стеков за окно
+    # через /api/v1/diagnostics/profile; профили пишутся в PROFILING_OUTPUT_DIR
+    PROFILING_ENABLED: bool = False
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_OUTPUT_DIR: str = "data/profiles"
+    PROFILING_SAMPLE_INTERVAL_MS: float = 5.0
+
+    # Кэш чтений групп и студентов в памяти процесса
+    CACHE_ENABLED: bool = False
+    CACHE_MAX_SIZE: int = 10000
+    CACHE_TTL_SECONDS: float = 30.0
+
+    # Хранилище групп: postgres, memory (память процесса) или snapshot (общий для процессов снимок только для чтения)
+    STORAGE_BACKEND: str = "postgres"
+    SNAPSHOT_PATH: str = "data/snapshot.bin"
+
+    # Журнал изменений хранилища в памяти; пустой путь отключает сохранение на диск
+    WAL_PATH: str = ""
+    WAL_SYNC_INTERVAL_SECONDS: float = 0.05
+    CHECKPOINT_INTERVAL_SECONDS: float = 300.0
+    # gc.freeze() после восстановления: сборщик перестаёт обходить загруженный набор данных, но и
+    # всё остальное, созданное к этому моменту, остаётся в памяти до остановки процесса
+    GC_FREEZE_AFTER_RECOVERY: bool = False
+
     class Config:
         env_file = ".env"
 
@@ -1,7 +1,11 @@
 from pydantic import PostgresDsn
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import create_engine
 
 from app.core.config import SETTINGS
+from app.core.db_pool import InstrumentedAsyncQueuePool
+from app.core.instrumentation import instrument_engine
 
 # Вывод настроек для проверки
 print(SETTINGS)
@@ -9,5 +13,50 @@ print(SETTINGS)
 # Создание URI для подключения к PostgreSQL
 DB_URI = f"postgresql://{SETTINGS.DB_USER}:{SETTINGS.DB_PASSWORD}@{SETTINGS.DB_HOSTNAME}:{SETTINGS.DB_PORT}/{SETTINGS.DB_NAME}"
 
-# Создание движка базы данных с использованием SQLModel
-DB_ENGINE = create_engine(DB_URI)
+# URI для асинхронного драйвера asyncpg; размер кэша подготовленных выражений SQLAlchemy задаётся параметром URI
+ASYNC_DB_URI = (
+    f"postgresql+asyncpg://{SETTINGS.DB_USER}:{SETTINGS.DB_PASSWORD}@{SETTINGS.DB_HOSTNAME}:{SETTINGS.DB_PORT}/{SETTINGS.DB_NAME}"
+    f"?prepared_statement_cache_size={SETTINGS.DB_PREPARED_STATEMENT_CACHE_SIZE}"
+)
+
+# Параметры пула, общие для всех движков
+POOL_OPTIONS = dict(
+    pool_size=SETTINGS.DB_POOL_SIZE,
+    max_overflow=SETTINGS.DB_MAX_OVERFLOW,
+    pool_timeout=SETTINGS.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=SETTINGS.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=SETTINGS.DB_POOL_PRE_PING,
+)
+
+# Параметры соединений asyncpg: ограничение времени запроса на стороне сервера и собственный кэш выражений драйвера
+ASYNC_CONNECT_ARGS = dict(
+    statement_cache_size=SETTINGS.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    server_settings={"statement_timeout": str(SETTINGS.DB_STATEMENT_TIMEOUT_MS)},
+)
+
+# Создание движка базы данных с использованием SQLModel (используется миграциями Alembic).
+# Ограничение времени запроса к нему не применяется: миграции могут выполняться долго
+DB_ENGINE = create_engine(DB_URI, **POOL_OPTIONS)
+
+# Асинхронный движок для обработчиков API, не блокирующий цикл событий
+ASYNC_DB_ENGINE = create_async_engine(
+    ASYNC_DB_URI, poolclass=InstrumentedAsyncQueuePool, connect_args=ASYNC_CONNECT_ARGS, **POOL_OPTIONS
+)
+
+
+def _create_replica_engine(uri: str) -> AsyncEngine:
+    """Создать движок реплики с драйвером asyncpg и теми же параметрами пула и соединений."""
+    url = make_url(uri).set(drivername="postgresql+asyncpg").update_query_dict(
+        {"prepared_statement_cache_size": str(SETTINGS.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+    )
+    return create_async_engine(
+        url, poolclass=InstrumentedAsyncQueuePool, connect_args=ASYNC_CONNECT_ARGS, **POOL_OPTIONS
+    )
+
+
+# Движки реплик для чтения; пустой список — всё читается с основного сервера
+REPLICA_DB_ENGINES = [_create_replica_engine(uri.strip()) for uri in SETTINGS.DB_REPLICA_URIS.split(",") if uri.strip()]
+
+# Время, число выражений и строк для каждого запроса API и журнал медленных запросов
+for _engine in (DB_ENGINE, ASYNC_DB_ENGINE.sync_engine, *(engine.sync_engine for engine in REPLICA_DB_ENGINES)):
+    instrument_engine(_engine, SETTINGS.DB_SLOW_QUERY_MS)
@@ -0,0 +1,83 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.instrumentation import current_request_stats
+
+
+@dataclass
+class PoolStats:
+    """Счётчики ожидания соединений из пула."""
+    checkouts: int = 0
+    waiting: int = 0  # Запросы, ждущие соединение прямо сейчас
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    timeouts: int = 0  # Запросы, не дождавшиеся соединения за DB_POOL_TIMEOUT_SECONDS
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул asyncpg-соединений, измеряющий время ожидания свободного соединения."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        # Пул пересоздаётся при dispose() и после потери соединения с сервером: счётчики сохраняются
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self) -> Any:
+        stats = self.stats
+        stats.waiting += 1
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            stats.timeouts += 1
+            raise
+        finally:
+            stats.waiting -= 1
+            waited = time.perf_counter() - started_at
+            stats.wait_seconds_total += waited
+            stats.wait_seconds_max = max(stats.wait_seconds_max, waited)
+            request_stats = current_request_stats()
+            if request_stats is not None:
+                request_stats.pool_wait_seconds += waited
+        stats.checkouts += 1
+        return connection
+
+
+def pool_status(engine: AsyncEngine | Engine) -> Dict[str, Any]:
+    """
+    Снять показатели пула движка.
+
+    Args:
+        engine (AsyncEngine | Engine): Движок с пулом `QueuePool`.
+
+    Returns:
+        Dict[str, Any]: Размер пула, занятые и свободные соединения, переполнение и счётчики ожидания.
+    """
+    pool = engine.pool
+    status = {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(
+            checkouts=stats.checkouts,
+            waiting=stats.waiting,
+            wait_seconds_total=stats.wait_seconds_total,
+            wait_seconds_max=stats.wait_seconds_max,
+            timeouts=stats.timeouts,
+        )
+    return status
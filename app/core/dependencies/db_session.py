@@ -1,9 +1,58 @@
-from sqlmodel import Session
+import time
+from itertools import cycle
+from typing import AsyncIterator, Optional
 
-from app.core.db_config import DB_ENGINE
+from fastapi import Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import SETTINGS
+from app.core.db_config import ASYNC_DB_ENGINE, REPLICA_DB_ENGINES
 
-def session_dependency():
-    """Зависимость для создания сессии базы данных."""
-    with Session(DB_ENGINE) as session:
+# Cookie с моментом, до которого клиент читает с основного сервера после собственной записи
+PRIMARY_PIN_COOKIE = "db_primary_until"
+
+# Методы, которые не изменяют данные
+READ_METHODS = ("GET", "HEAD")
+
+_replica_engines = cycle(REPLICA_DB_ENGINES)
+
+
+async def session_dependency():
+    """Зависимость для создания асинхронной сессии базы данных."""
+    async with AsyncSession(ASYNC_DB_ENGINE, expire_on_commit=False) as session:
+        yield session
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    """Проверить, писал ли клиент недавно."""
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def read_session_dependency(request: Request, response: Response) -> AsyncIterator[Optional[AsyncSession]]:
+    """
+    Зависимость для сессии чтения на реплике.
+
+    Реплики выбираются по кругу. Запросы на изменение закрепляют клиента за основным сервером
+    на `DB_READ_YOUR_WRITES_SECONDS` через cookie, чтобы следующее чтение увидело его запись.
+
+    Yields:
+        Optional[AsyncSession]: Сессия реплики или None, если читать нужно с основного сервера.
+    """
+    if request.method not in READ_METHODS:
+        if REPLICA_DB_ENGINES and SETTINGS.DB_READ_YOUR_WRITES_SECONDS > 0:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                str(time.time() + SETTINGS.DB_READ_YOUR_WRITES_SECONDS),
+                max_age=int(SETTINGS.DB_READ_YOUR_WRITES_SECONDS) + 1,
+                httponly=True,
+            )
+        yield None
+        return
+    if not REPLICA_DB_ENGINES or _pinned_to_primary(request):
+        yield None
+        return
+    async with AsyncSession(next(_replica_engines), expire_on_commit=False) as session:
         yield session
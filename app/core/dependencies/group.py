@@ -1,19 +1,53 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
 from fastapi import Depends
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.dependencies.db_session import session_dependency
+from app.core.config import SETTINGS
+from app.core.dependencies.db_session import read_session_dependency, session_dependency
 from app.persistance.base import BaseGroupPersistence
-from app.persistance.postgres import PostgresGroupPersistence
+from app.persistance.cache import LRUCache
+from app.persistance.cached import CachedGroupPersistence
+from app.persistance.dictionary import GroupDictionaryPersistence
+from app.persistance.postgres import AsyncPostgresGroupPersistence
+from app.persistance.snapshot import MappedSnapshot, SnapshotGroupPersistence
+
+# Кэш процесса общий для всех запросов; сессии и реализации создаются на каждый запрос
+GROUP_CACHE = LRUCache(max_size=SETTINGS.CACHE_MAX_SIZE, ttl=SETTINGS.CACHE_TTL_SECONDS)
+
 
+@lru_cache(maxsize=1)
+def _mapped_snapshot(path: str, modified_at: int) -> MappedSnapshot:
+    """Снимок отображается в память один раз на процесс и заново — после замены файла."""
+    return MappedSnapshot(path)
 
-def group_persistence_dependency(session: Session = Depends(session_dependency)) -> BaseGroupPersistence:
+
+def group_persistence_dependency(
+        session: AsyncSession = Depends(session_dependency),
+        read_session: Optional[AsyncSession] = Depends(read_session_dependency)
+) -> BaseGroupPersistence:
     """
     Зависимость для получения реализации работы с группами в базе данных.
 
     Args:
-        session (Session): Сессия базы данных, полученная через зависимость `session_dependency`.
+        session (AsyncSession): Асинхронная сессия базы данных, полученная через зависимость `session_dependency`.
+        read_session (Optional[AsyncSession]): Сессия реплики для чтения или None, если читать нужно с основного сервера.
 
     Returns:
-        BaseGroupPersistence: Реализация интерфейса `BaseGroupPersistence` для работы с группами.
+        BaseGroupPersistence: Реализация интерфейса `BaseGroupPersistence`, выбранная `STORAGE_BACKEND`;
+            при включённом `CACHE_ENABLED` — обёрнутая в `CachedGroupPersistence`, которая не сохраняет
+            в кэш чтения с реплики.
     """
-    return PostgresGroupPersistence(session)
\ No newline at end of file
+    if SETTINGS.STORAGE_BACKEND == "memory":
+        persistence = GroupDictionaryPersistence()
+    elif SETTINGS.STORAGE_BACKEND == "snapshot":
+        snapshot = _mapped_snapshot(SETTINGS.SNAPSHOT_PATH, os.stat(SETTINGS.SNAPSHOT_PATH).st_mtime_ns)
+        persistence = SnapshotGroupPersistence(snapshot)
+    else:
+        persistence = AsyncPostgresGroupPersistence(session, read_session)
+    if SETTINGS.CACHE_ENABLED:
+        persistence = CachedGroupPersistence(persistence, GROUP_CACHE, store_reads=read_session is None)
+    return persistence
+
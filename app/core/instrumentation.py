@@ -0,0 +1,264 @@
+"""
+Инструментирование HTTP-запросов и SQL.
+
+Статистика текущего HTTP-запроса хранится в `ContextVar`: обработчики событий SQLAlchemy и пул
+соединений дописывают в неё время выполнения SQL, число выражений, строк и ожидание соединения.
+`InstrumentationMiddleware` отдаёт её клиенту в заголовке `Server-Timing` и накапливает по маршрутам
+в `ROUTE_METRICS`, откуда показатели забирает эндпоинт `/metrics` в формате Prometheus.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Границы корзин гистограммы длительности запросов, в секундах
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+@dataclass
+class RequestStats:
+    """Затраты одного HTTP-запроса на базу данных."""
+    db_seconds: float = 0.0
+    statements: int = 0
+    rows: int = 0  # Строки, возвращённые или изменённые выражениями (без серверных курсоров)
+    pool_wait_seconds: float = 0.0
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Значение заголовка `Server-Timing`; длительности — в миллисекундах."""
+        return (
+            f"total;dur={total_seconds * 1000:.3f}, "
+            f'db;dur={self.db_seconds * 1000:.3f};desc="{self.statements} statements, {self.rows} rows", '
+            f"pool;dur={self.pool_wait_seconds * 1000:.3f}"
+        )
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Статистика текущего HTTP-запроса; None вне запроса (миграции, фоновые задачи, замеры)."""
+    return _current_request.get()
+
+
+@dataclass
+class RouteStats:
+    """Накопленные показатели одного маршрута."""
+    statuses: Dict[int, int] = field(default_factory=dict)
+    buckets: List[int] = field(default_factory=lambda: [0] * len(DURATION_BUCKETS))
+    seconds: float = 0.0
+    db_seconds: float = 0.0
+    statements: int = 0
+    rows: int = 0
+    pool_wait_seconds: float = 0.0
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+
+class RouteMetrics:
+    """Показатели запросов по паре (метод, шаблон пути маршрута)."""
+
+    def __init__(self):
+        self.__routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.slow_queries = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        """Учесть завершённый запрос."""
+        route_stats = self.__routes.get((method, route))
+        if route_stats is None:
+            route_stats = self.__routes[(method, route)] = RouteStats()
+        route_stats.statuses[status] = route_stats.statuses.get(status, 0) + 1
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                route_stats.buckets[index] += 1
+        route_stats.seconds += seconds
+        route_stats.db_seconds += stats.db_seconds
+        route_stats.statements += stats.statements
+        route_stats.rows += stats.rows
+        route_stats.pool_wait_seconds += stats.pool_wait_seconds
+
+    def items(self) -> List[Tuple[Tuple[str, str], RouteStats]]:
+        return sorted(self.__routes.items())
+
+
+ROUTE_METRICS = RouteMetrics()
+
+
+class InstrumentationMiddleware:
+    """ASGI-middleware: статистика запроса, заголовок `Server-Timing` и учёт в `ROUTE_METRICS`."""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        """
+        Args:
+            app (ASGIApp): Оборачиваемое приложение.
+            server_timing (bool): Добавлять ли заголовок `Server-Timing` в ответы.
+        """
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started_at = time.perf_counter()
+        status = 500  # Остаётся, если приложение упало, не начав ответ
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    # Для потоковых ответов время считается до начала ответа
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", stats.server_timing(time.perf_counter() - started_at)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            # Шаблон пути, а не сам путь: ID в пути не должны порождать отдельные ряды метрик
+            route = scope.get("route")
+            ROUTE_METRICS.observe(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - started_at,
+                stats
+            )
+
+
+def _shape(value: Any) -> str:
+    """Тип и размер параметра без его значения: в журнал не должны попадать персональные данные."""
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]" + (f" of {_shape(value[0])}" if value else "")
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters: Any, executemany: bool) -> str:
+    """Описать параметры выражения: позиционные, именованные или пакет наборов параметров."""
+    if executemany:
+        return f"{len(parameters)} x ({parameter_shapes(parameters[0], False)})" if parameters else "0 x ()"
+    if isinstance(parameters, dict):
+        return ", ".join(f"{name}: {_shape(value)}" for name, value in parameters.items())
+    return ", ".join(_shape(value) for value in parameters or ())
+
+
+def instrument_engine(engine: Engine, slow_query_ms: float = 0.0) -> None:
+    """
+    Подписать движок на события выполнения выражений.
+
+    Args:
+        engine (Engine): Синхронный движок; для асинхронного передаётся `AsyncEngine.sync_engine`.
+        slow_query_ms (float): Порог журнала медленных запросов в миллисекундах; 0 отключает журнал.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        context.instrumentation_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.instrumentation_started_at
+        stats = _current_request.get()
+        if stats is not None:
+            stats.db_seconds += elapsed
+            stats.statements += 1
+            stats.rows += max(cursor.rowcount, 0)
+        if slow_query_ms and elapsed * 1000 >= slow_query_ms:
+            ROUTE_METRICS.slow_queries += 1
+            slow_query_logger.warning(
+                "Медленный запрос %.1f мс: %s; параметры: %s",
+                elapsed * 1000,
+                " ".join(statement.split()),
+                parameter_shapes(parameters, executemany)
+            )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_samples(name: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Строки отсчётов метрики в текстовом формате Prometheus."""
+    lines = []
+    for labels, value in samples:
+        rendered = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+    return lines
+
+
+def prometheus_metric(
+        name: str,
+        kind: str,
+        description: str,
+        samples: Iterable[Tuple[Dict[str, str], float]]
+) -> List[str]:
+    """
+    Метрика в текстовом формате Prometheus: описание, тип и отсчёты.
+
+    Args:
+        name (str): Имя метрики.
+        kind (str): Тип: counter, gauge или histogram.
+        description (str): Описание для `# HELP`.
+        samples (Iterable[Tuple[Dict[str, str], float]]): Метки и значения отсчётов.
+    """
+    return [f"# HELP {name} {description}", f"# TYPE {name} {kind}", *prometheus_samples(name, samples)]
+
+
+def render_route_metrics(metrics: RouteMetrics = ROUTE_METRICS) -> List[str]:
+    """Показатели запросов по маршрутам в текстовом формате Prometheus."""
+    routes = metrics.items()
+
+    def per_route(value) -> List[Tuple[Dict[str, str], float]]:
+        return [({"method": method, "route": route}, value(stats)) for (method, route), stats in routes]
+
+    lines = prometheus_metric("http_requests_total", "counter", "Завершённые HTTP-запросы.", [
+        ({"method": method, "route": route, "status": str(status)}, count)
+        for (method, route), stats in routes
+        for status, count in sorted(stats.statuses.items())
+    ])
+    histogram = "http_request_duration_seconds"
+    lines += prometheus_metric(histogram, "histogram", "Длительность HTTP-запросов.", [])
+    for (method, route), stats in routes:
+        labels = {"method": method, "route": route}
+        lines += prometheus_samples(f"{histogram}_bucket", [
+            *((labels | {"le": str(bound)}, count) for bound, count in zip(DURATION_BUCKETS, stats.buckets)),
+            (labels | {"le": "+Inf"}, stats.requests),
+        ])
+        lines += prometheus_samples(f"{histogram}_sum", [(labels, stats.seconds)])
+        lines += prometheus_samples(f"{histogram}_count", [(labels, stats.requests)])
+    lines += prometheus_metric(
+        "http_request_db_seconds_total", "counter", "Время выполнения SQL в запросах.",
+        per_route(lambda stats: stats.db_seconds)
+    )
+    lines += prometheus_metric(
+        "http_request_db_statements_total", "counter", "Выполненные SQL-выражения.",
+        per_route(lambda stats: stats.statements)
+    )
+    lines += prometheus_metric(
+        "http_request_db_rows_total", "counter", "Строки, возвращённые или изменённые SQL-выражениями.",
+        per_route(lambda stats: stats.rows)
+    )
+    lines += prometheus_metric(
+        "http_request_pool_wait_seconds_total", "counter", "Ожидание соединения из пула.",
+        per_route(lambda stats: stats.pool_wait_seconds)
+    )
+    lines += prometheus_metric(
+        "db_slow_queries_total", "counter", "SQL-выражения дольше DB_SLOW_QUERY_MS.", [({}, metrics.slow_queries)]
+    )
+    return lines
@@ -0,0 +1,39 @@
+import asyncio
+import gc
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+
+from app.core.config import SETTINGS
+from app.persistance import dictionary
+
+
+async def _checkpoint_periodically() -> None:
+    """Периодически сохранять снимок, ограничивая длину журнала и время восстановления."""
+    while True:
+        await asyncio.sleep(SETTINGS.CHECKPOINT_INTERVAL_SECONDS)
+        await asyncio.to_thread(dictionary.checkpoint, SETTINGS.SNAPSHOT_PATH)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Восстановить хранилище в памяти из снимка и журнала при старте и сохранить снимок при остановке."""
+    if SETTINGS.STORAGE_BACKEND != "memory" or not SETTINGS.WAL_PATH:
+        yield
+        return
+    await asyncio.to_thread(
+        dictionary.recover, SETTINGS.SNAPSHOT_PATH, SETTINGS.WAL_PATH, SETTINGS.WAL_SYNC_INTERVAL_SECONDS
+    )
+    if SETTINGS.GC_FREEZE_AFTER_RECOVERY:
+        # Загруженные данные живут до остановки процесса: убираем их из поколений сборщика,
+        # чтобы последующие сборки не обходили весь набор данных
+        gc.collect()
+        gc.freeze()
+    checkpoints = asyncio.create_task(_checkpoint_periodically())
+    try:
+        yield
+    finally:
+        checkpoints.cancel()
+        await asyncio.to_thread(dictionary.checkpoint, SETTINGS.SNAPSHOT_PATH)
+        dictionary.close()
@@ -0,0 +1,222 @@
+"""
+Профилирование работающего процесса по запросу.
+
+Два режима, оба включаются настройкой `PROFILING_ENABLED`:
+- профиль одного запроса: клиент передаёт заголовок `PROFILING_HEADER` со значением `pstats`
+  (cProfile, файл `.prof` для `pstats`/snakeviz) или `collapsed` (выборка стеков, файл для flamegraph.pl
+  и speedscope); имя файла возвращается в том же заголовке ответа;
+- выборка стеков за окно времени по всем запросам (`StackSampler`) — её запускает эндпоинт диагностики.
+
+Запросы обслуживаются одним потоком цикла событий, поэтому профиль запроса включает и шаги
+других запросов, выполнявшихся одновременно с ним; на ненагруженном процессе это незаметно.
+Одновременно идёт только одно профилирование: остальные запросы с заголовком получают в ответ `busy`.
+Выборка стеков работает на сигнале SIGALRM и рассчитана на цикл событий в главном потоке, как у uvicorn.
+"""
+import asyncio
+import cProfile
+import os
+import re
+import signal
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Пакеты, время в которых выделяется в сводке выборки; стек относится к пакету самого глубокого своего кадра
+BREAKDOWN_PACKAGES = ("pydantic", "pydantic_core", "sqlalchemy", "asyncpg", "starlette", "fastapi", "app")
+
+# Ожидание ввода-вывода в цикле событий: в том числе ответов базы данных
+IO_WAIT_FUNCTIONS = {
+    ("selectors", "EpollSelector.select"),
+    ("selectors", "_PollLikeSelector.select"),
+    ("selectors", "KqueueSelector.select"),
+}
+
+# Режим профиля запроса (значение заголовка) и расширение файла профиля
+PROFILE_MODES = {"pstats": "prof", "collapsed": "collapsed"}
+
+_profiling_lock = threading.Lock()
+
+
+class StackSampler:
+    """
+    Выборка стека главного потока по таймеру реального времени и накопление свёрнутых стеков.
+
+    Таймер `ITIMER_REAL` присылает SIGALRM, и обработчик получает прерванный кадр главного потока,
+    в котором работает цикл событий. Выборка из отдельного потока была бы смещена к местам, где цикл
+    событий сам отпускает GIL (опрос `select` на каждой итерации), и почти не видела бы работу Python-кода.
+    Реальное, а не процессорное время нужно, чтобы в выборку попадало и ожидание ответов базы данных.
+    """
+
+    def __init__(self, interval_seconds: float):
+        """
+        Args:
+            interval_seconds (float): Интервал между выборками.
+        """
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.__previous_handler = None
+
+    def __on_signal(self, signum, frame) -> None:
+        stack = []
+        while frame is not None:
+            stack.append((frame.f_globals.get("__name__", "?"), frame.f_code.co_qualname))
+            frame = frame.f_back
+        if stack:
+            self.stacks[tuple(reversed(stack))] += 1
+
+    def start(self) -> None:
+        """Начать выборку; вызывается только из главного потока."""
+        self.__previous_handler = signal.signal(signal.SIGALRM, self.__on_signal)
+        signal.setitimer(signal.ITIMER_REAL, self.interval_seconds, self.interval_seconds)
+
+    def stop(self) -> Counter:
+        """Остановить выборку и вернуть накопленные стеки с числом попаданий."""
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self.__previous_handler)
+        return self.stacks
+
+
+def collapsed_stacks(stacks: Counter) -> str:
+    """Стеки в свёрнутом формате flamegraph: кадры через `;`, затем число выборок."""
+    return "".join(
+        ";".join(f"{module}:{function}" for module, function in stack) + f" {count}\n"
+        for stack, count in stacks.most_common()
+    )
+
+
+def write_collapsed(stacks: Counter, path: str) -> None:
+    """Записать стеки в свёрнутом формате."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(collapsed_stacks(stacks))
+
+
+def breakdown(stacks: Counter) -> Dict[str, float]:
+    """
+    Доли выборок по пакетам: сколько времени цикл событий провёл в Pydantic, SQLAlchemy, драйвере
+    базы данных, коде приложения или в ожидании ввода-вывода.
+
+    Args:
+        stacks (Counter): Стеки из `StackSampler`.
+
+    Returns:
+        Dict[str, float]: Доля выборок по категориям, от большей к меньшей.
+    """
+    total = sum(stacks.values())
+    shares: Counter = Counter()
+    for stack, count in stacks.items():
+        if stack[-1] in IO_WAIT_FUNCTIONS:
+            category = "io_wait"
+        else:
+            packages = (module.split(".")[0] for module, _ in reversed(stack))
+            category = next((package for package in packages if package in BREAKDOWN_PACKAGES), "other")
+        shares[category] += count
+    return {category: round(count / total, 4) for category, count in shares.most_common()} if total else {}
+
+
+def profile_path(output_dir: str, name: str, extension: str) -> str:
+    """Путь к новому файлу профиля: время, затем имя без символов, недопустимых в имени файла."""
+    os.makedirs(output_dir, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_")
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10 ** 9:09d}"
+    return os.path.join(output_dir, f"{stamp}-{slug}.{extension}")
+
+
+async def sample_event_loop(
+        seconds: float,
+        interval_seconds: float,
+        output_dir: str
+) -> Optional[Tuple[str, Counter]]:
+    """
+    Снимать стек цикла событий в течение окна времени и записать свёрнутые стеки в файл.
+
+    Args:
+        seconds (float): Длительность окна.
+        interval_seconds (float): Интервал между выборками.
+        output_dir (str): Каталог для файла со стеками.
+
+    Returns:
+        Optional[Tuple[str, Counter]]: Путь к файлу и стеки; None, если уже идёт другое профилирование.
+    """
+    if not _profiling_lock.acquire(blocking=False):
+        return None
+    try:
+        path = profile_path(output_dir, "window", "collapsed")
+        sampler = StackSampler(interval_seconds)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stacks = sampler.stop()
+        await asyncio.to_thread(write_collapsed, stacks, path)
+        return path, stacks
+    finally:
+        _profiling_lock.release()
+
+
+class ProfilingMiddleware:
+    """ASGI-middleware: профиль отдельных запросов, помеченных заголовком."""
+
+    def __init__(self, app: ASGIApp, header: str, output_dir: str, sample_interval_seconds: float):
+        """
+        Args:
+            app (ASGIApp): Оборачиваемое приложение.
+            header (str): Заголовок запроса, включающий профилирование, и заголовок ответа с файлом профиля.
+            output_dir (str): Каталог для файлов профилей.
+            sample_interval_seconds (float): Интервал выборки стеков для режима `collapsed`.
+        """
+        self.app = app
+        self.header = header.lower()
+        self.output_dir = output_dir
+        self.sample_interval_seconds = sample_interval_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        mode = Headers(scope=scope).get(self.header) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+        mode = mode.strip().lower() or "pstats"
+        if mode not in PROFILE_MODES:
+            await self.app(scope, receive, self.__with_header(send, "invalid"))
+            return
+        if not _profiling_lock.acquire(blocking=False):
+            await self.app(scope, receive, self.__with_header(send, "busy"))
+            return
+        try:
+            name = f"{scope['method']}-{scope['path']}"
+            path = profile_path(self.output_dir, name, PROFILE_MODES[mode])
+            send = self.__with_header(send, os.path.basename(path))
+            if mode == "pstats":
+                await self.__profile(scope, receive, send, path)
+            else:
+                await self.__sample(scope, receive, send, path)
+        finally:
+            _profiling_lock.release()
+
+    def __with_header(self, send: Send, value: str) -> Send:
+        async def send_with_header(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(self.header, value)
+            await send(message)
+
+        return send_with_header
+
+    async def __profile(self, scope: Scope, receive: Receive, send: Send, path: str) -> None:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            await asyncio.to_thread(profiler.dump_stats, path)
+
+    async def __sample(self, scope: Scope, receive: Receive, send: Send, path: str) -> None:
+        sampler = StackSampler(self.sample_interval_seconds)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await asyncio.to_thread(write_collapsed, sampler.stop(), path)
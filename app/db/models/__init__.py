@@ -1,5 +1,6 @@
 from .group import GroupModel
+from .group import GroupListRevisionModel
 from .group import StudentModel
 from .group import GroupStudentModel
 
-__all__ = ["GroupModel","StudentModel","GroupStudentModel"]
\ No newline at end of file
+__all__ = ["GroupModel","GroupListRevisionModel","StudentModel","GroupStudentModel"]
\ No newline at end of file
@@ -1,29 +1,79 @@
+from typing import Optional
+
+from sqlalchemy import DDL, BigInteger, Column, Index, Sequence, event
 from sqlmodel import SQLModel, Field
-from uuid import UUID, uuid4
+from uuid import UUID
+
+# Последовательность ревизий групп: каждое изменение группы или её состава получает новое значение
+GROUP_REVISION_SEQUENCE = Sequence("groups_revision_seq")
+
+# Триграммные индексы поиска по подстроке требуют расширения pg_trgm
+PG_TRGM_EXTENSION = DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+def _name_search_indexes(table: str):
+    """Индексы поиска по названию: B-tree для префикса (LIKE 'abc%') и GIN-триграммы для подстроки (ILIKE '%abc%')."""
+    return (
+        Index(f"ix_{table}_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+        Index(f"ix_{table}_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
 
 class GroupModel(SQLModel, table=True):
     """Модель группы."""
     __tablename__ = "groups"  # Название таблицы в базе данных
+    __table_args__ = (
+        Index("ix_groups_name_id", "name", "id"),  # Индекс для keyset-пагинации по (name, id)
+        *_name_search_indexes("groups"),
+    )
 
     id: UUID = Field(primary_key=True)  # Уникальный идентификатор группы (первичный ключ)
     name: str  # Название группы
-    group_number: str  # Номер группы
+    group_number: str = Field(index=True)  # Номер группы
+    revision: Optional[int] = Field(
+        default=None,
+        sa_column=Column(
+            BigInteger,
+            GROUP_REVISION_SEQUENCE,
+            server_default=GROUP_REVISION_SEQUENCE.next_value(),
+            nullable=False,
+        ),
+    )  # Ревизия группы для ETag, обновляется при изменении состава
+
+
+class GroupListRevisionModel(SQLModel, table=True):
+    """Версия списка групп: одна строка, ревизия которой растёт при создании и удалении групп."""
+    __tablename__ = "groups_list_revision"  # Название таблицы в базе данных
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})  # Всегда 1
+    revision: int = Field(sa_column=Column(BigInteger, nullable=False))  # Ревизия списка для ETag
 
 
 class StudentModel(SQLModel, table=True):
     """Модель студента."""
     __tablename__ = "students"  # Название таблицы в базе данных
+    __table_args__ = (
+        Index("ix_students_name_id", "name", "id"),  # Индекс для keyset-пагинации по (name, id)
+        *_name_search_indexes("students"),
+    )
 
     id: UUID = Field(primary_key=True)  # Уникальный идентификатор студента (первичный ключ)
     name: str  # Имя студента
-    student_number: str  # Номер студента
+    student_number: str = Field(index=True)  # Номер студента
+
+
+# Расширение создаётся перед каждой таблицей с триграммным индексом: и в `metadata.create_all`, и в `table.create`
+for _model in (GroupModel, StudentModel):
+    event.listen(_model.__table__, "before_create", PG_TRGM_EXTENSION)
 
 
 class GroupStudentModel(SQLModel, table=True):
     """Модель для связи студентов и групп."""
     __tablename__ = "group_students"  # Название таблицы в базе данных
+    __table_args__ = (
+        Index("ix_group_students_student_id", "student_id"),  # Обратный индекс: группы студента
+    )
 
-    id: UUID = Field(primary_key=True, default_factory=uuid4)  # Уникальный идентификатор связи (первичный ключ)
-    group_id: UUID = Field(foreign_key="groups.id")  # Внешний ключ на таблицу групп
-    student_id: UUID = Field(foreign_key="students.id")  # Внешний ключ на таблицу студентов
+    # Составной первичный ключ (group_id, student_id) исключает дубли связей и индексирует выборку по группе
+    group_id: UUID = Field(foreign_key="groups.id", primary_key=True)  # Внешний ключ на таблицу групп
+    student_id: UUID = Field(foreign_key="students.id", primary_key=True)  # Внешний ключ на таблицу студентов
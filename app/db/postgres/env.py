@@ -19,21 +19,20 @@ if config.config_file_name is not None:
 target_metadata = SQLModel.metadata
 
 
-def create_tables_if_not_exist():
-    """Создает таблицы, если они не существуют."""
-    inspector = inspect(DB_ENGINE)
-    existing_tables = inspector.get_table_names()  # Получение списка существующих таблиц
-
-    # Получение всех таблиц, определенных в моделях
-    defined_tables = SQLModel.metadata.tables
-
-    # Создание таблиц, если они отсутствуют
-    for table_name, table in defined_tables.items():
-        if table_name not in existing_tables:
-            print(f"Создание таблицы: {table_name}")
-            table.create(DB_ENGINE)
-        else:
-            print(f"Таблица {table_name} уже существует.")
+# Последняя ревизия до ревизий, приводящих таблицы приложения к моделям. Раньше таблицы создавались
+# напрямую, без миграций и без версии Alembic; такая база отмечается этой ревизией, и ревизии после неё
+# доводят её схему до текущей
+UNVERSIONED_SCHEMA_REVISION = "8cf0a56fe2c0"
+
+
+def stamp_unversioned_schema(migration_context) -> None:
+    """Отметить ревизией `UNVERSIONED_SCHEMA_REVISION` базу с таблицами приложения, но без версии Alembic."""
+    if migration_context.get_current_revision() is not None:
+        return
+    if not inspect(migration_context.connection).has_table("groups"):
+        return
+    print(f"Таблицы созданы без миграций, база отмечается ревизией {UNVERSIONED_SCHEMA_REVISION}")
+    migration_context.stamp(ScriptDirectory.from_config(config), UNVERSIONED_SCHEMA_REVISION)
 
 
 def process_revision_directives(context, revision, directives) -> None:  # type: ignore
@@ -71,28 +70,34 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def run_migrations_on(connection) -> None:
+    """Довести миграциями схему базы, к которой открыто соединение `connection`."""
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        process_revision_directives=process_revision_directives,
+        compare_type=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        stamp_unversioned_schema(context.get_context())
+        context.run_migrations()
+
+
 def run_migrations_online() -> None:
-    """Запуск миграций в онлайн-режиме."""
-    try:
-        # Сначала попытка создания таблиц напрямую
-        create_tables_if_not_exist()
-        print("Таблицы успешно созданы!")
-    except Exception as e:
-        print(f"Ошибка при создании таблиц: {e}")
-        print("Переход к выполнению миграций...")
-
-        # Если создание таблиц не удалось, выполнить стандартные миграции
-        with DB_ENGINE.connect() as connection:
-            context.configure(
-                connection=connection,
-                target_metadata=target_metadata,
-                process_revision_directives=process_revision_directives,
-                compare_type=True,
-                dialect_opts={"paramstyle": "named"},
-            )
-
-            with context.begin_transaction():
-                context.run_migrations()
+    """
+    Запуск миграций в онлайн-режиме: схема любой базы, в том числе пустой, доводится миграциями.
+
+    Соединение, переданное в `config.attributes["connection"]` (например, тестами), используется вместо
+    соединения с базой из настроек.
+    """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations_on(connection)
+        return
+    with DB_ENGINE.connect() as connection:
+        run_migrations_on(connection)
 
 
 # Запуск миграций в зависимости от режима
@@ -100,7 +105,3 @@ if context.is_offline_mode():
     run_migrations_offline()
 else:
     run_migrations_online()
-
-# Дополнительная проверка для создания таблиц при прямом запуске файла
-if __name__ == "__main__":
-    create_tables_if_not_exist()
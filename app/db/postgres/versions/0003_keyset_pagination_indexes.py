@@ -0,0 +1,66 @@
+"""keyset pagination indexes
+
+Revision ID: 0003
+Revises: 8cf0a56fe2c0
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '8cf0a56fe2c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_base_tables() -> None:
+    """
+    Создать таблицы в исходном виде, если их ещё нет.
+
+    Раньше env.py создавал таблицы напрямую, минуя миграции, поэтому предыдущие ревизии их не создают.
+    На базе, где таблицы уже есть, ничего не меняется.
+    """
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'groups' not in existing:
+        op.create_table(
+            'groups',
+            sa.Column('id', sa.Uuid(), nullable=False),
+            sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column('group_number', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if 'students' not in existing:
+        op.create_table(
+            'students',
+            sa.Column('id', sa.Uuid(), nullable=False),
+            sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.Column('student_number', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+    if 'group_students' not in existing:
+        op.create_table(
+            'group_students',
+            sa.Column('id', sa.Uuid(), nullable=False),
+            sa.Column('group_id', sa.Uuid(), nullable=False),
+            sa.Column('student_id', sa.Uuid(), nullable=False),
+            sa.ForeignKeyConstraint(['group_id'], ['groups.id']),
+            sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+
+def upgrade() -> None:
+    _create_base_tables()
+    op.create_index('ix_groups_name_id', 'groups', ['name', 'id'], if_not_exists=True)
+    op.create_index('ix_students_name_id', 'students', ['name', 'id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_students_name_id', table_name='students')
+    op.drop_index('ix_groups_name_id', table_name='groups')
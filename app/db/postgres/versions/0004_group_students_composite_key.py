@@ -0,0 +1,52 @@
+"""group_students composite key and lookup indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('group_students')}
+    # Таблица, созданная по новым моделям, уже с составным ключом
+    if 'id' in columns:
+        # Удаляем накопившиеся дубли связей, иначе составной ключ не создать
+        op.execute(
+            """
+            DELETE FROM group_students a
+            USING group_students b
+            WHERE a.group_id = b.group_id
+              AND a.student_id = b.student_id
+              AND a.id > b.id
+            """
+        )
+        op.drop_constraint('group_students_pkey', 'group_students', type_='primary')
+        op.drop_column('group_students', 'id')
+        op.create_primary_key('group_students_pkey', 'group_students', ['group_id', 'student_id'])
+    op.create_index('ix_group_students_student_id', 'group_students', ['student_id'], if_not_exists=True)
+    op.create_index('ix_groups_group_number', 'groups', ['group_number'], if_not_exists=True)
+    op.create_index('ix_students_student_number', 'students', ['student_number'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_students_student_number', table_name='students')
+    op.drop_index('ix_groups_group_number', table_name='groups')
+    op.drop_index('ix_group_students_student_id', table_name='group_students')
+    op.drop_constraint('group_students_pkey', 'group_students', type_='primary')
+    op.add_column(
+        'group_students',
+        sa.Column('id', sa.Uuid(), nullable=False, server_default=sa.text('gen_random_uuid()'))
+    )
+    op.create_primary_key('group_students_pkey', 'group_students', ['id'])
@@ -0,0 +1,38 @@
+"""group revision for conditional requests
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('groups_revision_seq'), if_not_exists=True))
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('groups')}
+    if 'revision' not in columns:
+        op.add_column(
+            'groups',
+            sa.Column(
+                'revision',
+                sa.BigInteger(),
+                server_default=sa.text("nextval('groups_revision_seq')"),
+                nullable=False,
+            )
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('groups', 'revision')
+    op.execute(sa.schema.DropSequence(sa.Sequence('groups_revision_seq')))
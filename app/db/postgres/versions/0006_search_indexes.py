@@ -0,0 +1,38 @@
+"""name search indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in ('groups', 'students'):
+        # Префикс названия: text_pattern_ops позволяет B-tree обслуживать LIKE 'abc%' при любой сортировке базы
+        op.create_index(
+            f'ix_{table}_name_pattern', table, ['name'],
+            postgresql_ops={'name': 'text_pattern_ops'}, if_not_exists=True
+        )
+        # Подстрока без учёта регистра: ILIKE '%abc%' по GIN-индексу триграмм
+        op.create_index(
+            f'ix_{table}_name_trgm', table, ['name'],
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    for table in ('groups', 'students'):
+        op.drop_index(f'ix_{table}_name_trgm', table_name=table)
+        op.drop_index(f'ix_{table}_name_pattern', table_name=table)
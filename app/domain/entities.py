@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -14,3 +14,24 @@ class Student(BaseModel):
     id: Optional[UUID]
     name: str
     number: str
+    group_ids: List[UUID] = []  # Группы студента в порядке возрастания ID
+
+
+class GroupFilter(BaseModel):
+    """Условия отбора групп; незаданное условие не ограничивает выборку."""
+    number: Optional[str] = None  # Точный номер
+    name_prefix: Optional[str] = None  # Начало названия с учётом регистра
+    search: Optional[str] = None  # Подстрока названия без учёта регистра
+
+    def matches(self, name: str, number: str) -> bool:
+        """Проверить запись по номеру, префиксу и подстроке названия."""
+        return (
+            (self.number is None or number == self.number) and
+            (self.name_prefix is None or name.startswith(self.name_prefix)) and
+            (self.search is None or self.search.casefold() in name.casefold())
+        )
+
+
+class StudentFilter(GroupFilter):
+    """Условия отбора студентов."""
+    group_id: Optional[UUID] = None  # Студент состоит в группе
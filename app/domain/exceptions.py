@@ -17,3 +17,15 @@ class StudentAlreadyInGroupException(Exception):
         super().__init__(
             f"Student {student_id} is already in group {group_id}"
         )
+
+class StudentNotInGroupException(Exception):
+    def __init__(self, student_id: UUID, group_id: UUID):
+        self.student_id = student_id
+        self.group_id = group_id
+        super().__init__(
+            f"Student {student_id} is not in group {group_id}"
+        )
+
+class ReadOnlyStorageException(Exception):
+    def __init__(self):
+        super().__init__("Storage is read-only")
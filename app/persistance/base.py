@@ -1,69 +1,181 @@
 from __future__ import annotations
 
 from uuid import UUID
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 from abc import ABC, abstractmethod
 
-from app.domain.entities import Group, Student
+from app.domain.entities import Group, GroupFilter, Student, StudentFilter
+from app.domain.exceptions import StudentNotInGroupException
+
+
+def apply_transfers(
+        memberships: Dict[UUID, Set[UUID]],
+        transfers: List[Tuple[UUID, UUID, UUID]]
+) -> Dict[UUID, Set[UUID]]:
+    """
+    Применить переводы по порядку к копии составов групп студентов, не меняя хранилище.
+
+    Каждый перевод видит результат предыдущих, поэтому цепочка `[(s, A, B), (s, B, C)]` оставляет
+    студента только в C. Хранилища вычисляют итоговые составы этой функцией до изменения данных,
+    и пакет переводов либо применяется целиком, либо не применяется вовсе.
+
+    Args:
+        memberships (Dict[UUID, Set[UUID]]): Текущие группы каждого переводимого студента.
+        transfers (List[Tuple[UUID, UUID, UUID]]): Тройки (student_id, from_group_id, to_group_id).
+
+    Returns:
+        Dict[UUID, Set[UUID]]: Группы каждого переводимого студента после всех переводов.
+
+    Raises:
+        StudentNotInGroupException: Если к моменту своего перевода студент не состоит в исходной группе.
+    """
+    result = {student_id: set(memberships.get(student_id, ())) for student_id, _, _ in transfers}
+    for student_id, from_group_id, to_group_id in transfers:
+        group_ids = result[student_id]
+        if from_group_id not in group_ids:
+            raise StudentNotInGroupException(student_id, from_group_id)
+        group_ids.discard(from_group_id)
+        group_ids.add(to_group_id)
+    return result
 
 
 class BaseGroupPersistence(ABC):
     @abstractmethod
-    def get_by_id(self, group_id: UUID) -> Group | None:
+    async def get_by_id(self, group_id: UUID) -> Group | None:
         """Получить группу по ID."""
         ...
 
     @abstractmethod
-    def get_all(self) -> List[Group]:
+    async def get_all(self) -> List[Group]:
         """Получить все группы."""
         ...
 
     @abstractmethod
-    def create_group(self, group: Group) -> Group:
+    async def get_groups_by_ids(self, group_ids: List[UUID]) -> List[Group]:
+        """Получить группы по списку ID одним обращением; отсутствующие пропускаются, порядок не гарантируется."""
+        ...
+
+    @abstractmethod
+    async def get_group_with_revision(self, group_id: UUID) -> Optional[Tuple[Group, int]]:
+        """Получить группу и её ревизию, меняющуюся при каждом изменении состава; None, если группы нет."""
+        ...
+
+    @abstractmethod
+    async def get_groups_revision(self) -> str:
+        """Получить версию списка групп, меняющуюся как минимум при каждом создании и удалении группы."""
+        ...
+
+    @abstractmethod
+    async def get_groups_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[GroupFilter] = None
+    ) -> List[Group]:
+        """Получить страницу подходящих под `filters` групп, упорядоченных по (name, id), строго после позиции `after`."""
+        ...
+
+    @abstractmethod
+    def iter_groups(self) -> AsyncIterator[Group]:
+        """Потоково перебрать все группы, не загружая их в память целиком."""
+        ...
+
+    @abstractmethod
+    async def create_group(self, group: Group) -> Group:
         """Создать новую группу."""
         ...
 
     @abstractmethod
-    def delete_group(self, group_id: UUID) -> None:
-        """Удалить группу."""
+    async def create_groups_bulk(self, groups: List[Group]) -> List[UUID]:
+        """Создать группы одной транзакцией; вернуть ID фактически созданных (существующие пропускаются)."""
+        ...
+
+    @abstractmethod
+    async def delete_group(self, group_id: UUID) -> List[UUID]:
+        """Удалить группу; вернуть ID исключённых из неё студентов."""
         ...
 
     @abstractmethod
-    def get_all_students(self) -> List[Student]:
+    async def get_all_students(self) -> List[Student]:
         """Получить всех студентов."""
         ...
 
     @abstractmethod
-    def get_student_by_id(self, student_id: UUID) -> Optional[Student]:
+    async def get_students_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[StudentFilter] = None
+    ) -> List[Student]:
+        """Получить страницу подходящих под `filters` студентов, упорядоченных по (name, id), строго после позиции `after`."""
+        ...
+
+    @abstractmethod
+    def iter_students(self) -> AsyncIterator[Student]:
+        """Потоково перебрать всех студентов, не загружая их в память целиком."""
+        ...
+
+    @abstractmethod
+    async def get_students_by_ids(self, student_ids: List[UUID]) -> List[Student]:
+        """Получить студентов по списку ID одним обращением; отсутствующие пропускаются, порядок не гарантируется."""
+        ...
+
+    @abstractmethod
+    async def get_student_by_id(self, student_id: UUID) -> Optional[Student]:
         """Получить студента по ID."""
         ...
 
     @abstractmethod
-    def create_student(self, student: Student) -> Student:
+    async def create_student(self, student: Student) -> Student:
         """Создать нового студента."""
         ...
 
     @abstractmethod
-    def delete_student(self, student_id: UUID) -> None:
-        """Удалить студента."""
+    async def create_students_bulk(self, students: List[Student]) -> List[UUID]:
+        """Создать студентов одной транзакцией; вернуть ID фактически созданных (существующие пропускаются)."""
         ...
 
     @abstractmethod
-    def get_group_students(self, group_id: UUID) -> List[Student]:
+    async def delete_student(self, student_id: UUID) -> List[UUID]:
+        """Удалить студента; вернуть ID групп, из которых он был исключён."""
+        ...
+
+    @abstractmethod
+    async def get_group_students(self, group_id: UUID) -> List[Student]:
         """Получить всех студентов в группе."""
         ...
 
     @abstractmethod
-    def assign_student_to_group(self, student_id: UUID, group_id: UUID) -> None:
+    async def assign_student_to_group(self, student_id: UUID, group_id: UUID) -> None:
         """Добавить студента в группу."""
         ...
 
     @abstractmethod
-    def remove_student_from_group(self, student_id: UUID, group_id: UUID) -> None:
+    async def remove_student_from_group(self, student_id: UUID, group_id: UUID) -> None:
         """Удалить студента из группы."""
         ...
 
     @abstractmethod
-    def transfer_student_between_groups(self, student_id: UUID, from_group_id: UUID, to_group_id: UUID) -> None:
-        """Переместить студента из одной группы в другую."""
+    async def transfer_student_between_groups(self, student_id: UUID, from_group_id: UUID, to_group_id: UUID) -> None:
+        """Атомарно переместить студента из одной группы в другую; студент должен состоять в исходной группе."""
+        ...
+
+    @abstractmethod
+    async def assign_students_to_groups(self, assignments: List[Tuple[UUID, UUID]]) -> None:
+        """Добавить студентов в группы одной транзакцией по парам (student_id, group_id)."""
+        ...
+
+    @abstractmethod
+    async def remove_students_from_groups(self, removals: List[Tuple[UUID, UUID]]) -> None:
+        """Удалить студентов из групп одной транзакцией по парам (student_id, group_id)."""
+        ...
+
+    @abstractmethod
+    async def transfer_students_between_groups(self, transfers: List[Tuple[UUID, UUID, UUID]]) -> None:
+        """
+        Перевести студентов одной транзакцией по тройкам (student_id, from_group_id, to_group_id).
+
+        Переводы применяются по порядку (см. `apply_transfers`); если студент не состоит в исходной группе
+        своего перевода, выбрасывается `StudentNotInGroupException` и ничего не меняется.
+        """
         ...
@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional, Tuple
+
+# Маркер промаха: позволяет кэшировать и None (например, «группа не найдена»)
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Счётчики работы кэша."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # Вытеснения по размеру (LRU)
+    expirations: int = 0  # Удаления устаревших по TTL записей
+    discarded: int = 0  # Значения, не сохранённые из-за удаления записей во время их загрузки
+
+
+class LRUCache:
+    """
+    Ограниченный по размеру LRU-кэш в памяти процесса с временем жизни записей.
+
+    Поколение кэша растёт при каждом удалении записей. Чтение, начатое до изменения, может вернуть
+    прежнее значение уже после того, как изменение сбросило кэш; поэтому загрузка запоминает поколение
+    до обращения к хранилищу и передаёт его в `set`, а значение из прошлого поколения не сохраняется.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Args:
+            max_size (int): Максимальное количество записей.
+            ttl (float): Время жизни записи в секундах.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self.__items: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.__generation = 0
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    @property
+    def generation(self) -> int:
+        """Текущее поколение: номер последнего удаления записей."""
+        return self.__generation
+
+    def get(self, key: Hashable) -> Any:
+        """Получить значение по ключу или `MISSING`; найденная запись становится самой свежей."""
+        item = self.__items.get(key)
+        if item is None:
+            self.stats.misses += 1
+            return MISSING
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self.__items[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return MISSING
+        self.__items.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Сохранить значение, вытеснив самую давнюю запись при переполнении.
+
+        Args:
+            key (Hashable): Ключ записи.
+            value (Any): Значение.
+            generation (Optional[int]): Поколение, прочитанное до загрузки значения; если с тех пор
+                записи удалялись, значение могло устареть и не сохраняется.
+        """
+        if generation is not None and generation != self.__generation:
+            self.stats.discarded += 1
+            return
+        self.__items[key] = (time.monotonic() + self.ttl, value)
+        self.__items.move_to_end(key)
+        while len(self.__items) > self.max_size:
+            self.__items.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """Удалить записи по ключам."""
+        self.__generation += 1
+        for key in keys:
+            self.__items.pop(key, None)
+
+    def clear(self) -> None:
+        """Удалить все записи."""
+        self.__generation += 1
+        self.__items.clear()
@@ -0,0 +1,227 @@
+from typing import AsyncIterator, Awaitable, Callable, Hashable, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from app.domain.entities import Group, GroupFilter, Student, StudentFilter
+from app.persistance.base import BaseGroupPersistence
+from app.persistance.cache import MISSING, LRUCache
+
+T = TypeVar("T")
+
+
+def _group_key(group_id: UUID) -> Hashable:
+    return "group", group_id
+
+
+def _student_key(student_id: UUID) -> Hashable:
+    return "student", student_id
+
+
+def _group_students_key(group_id: UUID) -> Hashable:
+    return "group_students", group_id
+
+
+class CachedGroupPersistence(BaseGroupPersistence):
+    """
+    Декоратор над любой реализацией `BaseGroupPersistence` с кэшированием чтений.
+
+    Кэшируются `get_by_id`, `get_student_by_id`, их пакетные варианты `get_groups_by_ids` /
+    `get_students_by_ids` и `get_group_students` в LRU-кэше процесса. Операции записи удаляют из кэша
+    ровно те записи, которые они изменяют.
+
+    Состав группы хранится списком ID студентов, а сами студенты (вместе с их группами) — под
+    своими ключами: изменение групп студента сбрасывает одну его запись, а не составы всех его групп.
+
+    Загруженное значение сохраняется, только если за время загрузки кэш не сбрасывался (см. `LRUCache`).
+    Чтения с реплики не сохраняются вовсе: отстающая реплика может вернуть значение, изменённое
+    до начала чтения, и оно пережило бы сброс кэша до истечения TTL.
+    """
+
+    def __init__(self, persistence: BaseGroupPersistence, cache: LRUCache, store_reads: bool = True):
+        """
+        Args:
+            persistence (BaseGroupPersistence): Оборачиваемая реализация.
+            cache (LRUCache): Кэш процесса, общий для всех запросов.
+            store_reads (bool): Сохранять ли в кэш загруженные значения; False — для чтений с реплики,
+                которые только пользуются уже сохранёнными.
+        """
+        self.__persistence = persistence
+        self.__cache = cache
+        self.__store_reads = store_reads
+
+    async def get_by_id(self, group_id: UUID) -> Group | None:
+        return await self.__cached(_group_key(group_id), lambda: self.__persistence.get_by_id(group_id))
+
+    async def get_all(self) -> List[Group]:
+        return await self.__persistence.get_all()
+
+    async def get_groups_by_ids(self, group_ids: List[UUID]) -> List[Group]:
+        return await self.__cached_many(_group_key, group_ids, self.__persistence.get_groups_by_ids)
+
+    async def get_group_with_revision(self, group_id: UUID) -> Optional[Tuple[Group, int]]:
+        return await self.__persistence.get_group_with_revision(group_id)
+
+    async def get_groups_revision(self) -> str:
+        return await self.__persistence.get_groups_revision()
+
+    async def get_groups_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[GroupFilter] = None
+    ) -> List[Group]:
+        return await self.__persistence.get_groups_page(limit, after, filters)
+
+    def iter_groups(self) -> AsyncIterator[Group]:
+        return self.__persistence.iter_groups()
+
+    async def create_group(self, group: Group) -> Group:
+        created_group = await self.__persistence.create_group(group)
+        self.__cache.invalidate(_group_key(group.id), _group_students_key(group.id))
+        return created_group
+
+    async def create_groups_bulk(self, groups: List[Group]) -> List[UUID]:
+        created_ids = await self.__persistence.create_groups_bulk(groups)
+        self.__cache.invalidate(
+            *(_group_key(group_id) for group_id in created_ids),
+            *(_group_students_key(group_id) for group_id in created_ids)
+        )
+        return created_ids
+
+    async def delete_group(self, group_id: UUID) -> List[UUID]:
+        student_ids = await self.__persistence.delete_group(group_id)
+        self.__cache.invalidate(
+            _group_key(group_id),
+            _group_students_key(group_id),
+            *(_student_key(student_id) for student_id in student_ids)
+        )
+        return student_ids
+
+    async def get_all_students(self) -> List[Student]:
+        return await self.__persistence.get_all_students()
+
+    async def get_students_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[StudentFilter] = None
+    ) -> List[Student]:
+        return await self.__persistence.get_students_page(limit, after, filters)
+
+    def iter_students(self) -> AsyncIterator[Student]:
+        return self.__persistence.iter_students()
+
+    async def get_students_by_ids(self, student_ids: List[UUID]) -> List[Student]:
+        return await self.__cached_many(_student_key, student_ids, self.__persistence.get_students_by_ids)
+
+    async def get_student_by_id(self, student_id: UUID) -> Optional[Student]:
+        return await self.__cached(_student_key(student_id), lambda: self.__persistence.get_student_by_id(student_id))
+
+    async def create_student(self, student: Student) -> Student:
+        created_student = await self.__persistence.create_student(student)
+        self.__cache.invalidate(_student_key(student.id))
+        return created_student
+
+    async def create_students_bulk(self, students: List[Student]) -> List[UUID]:
+        created_ids = await self.__persistence.create_students_bulk(students)
+        self.__cache.invalidate(*(_student_key(student_id) for student_id in created_ids))
+        return created_ids
+
+    async def delete_student(self, student_id: UUID) -> List[UUID]:
+        # Реализация сообщает, из каких групп исключён студент, — сбрасываем только их составы
+        group_ids = await self.__persistence.delete_student(student_id)
+        self.__cache.invalidate(
+            _student_key(student_id),
+            *(_group_students_key(group_id) for group_id in group_ids)
+        )
+        return group_ids
+
+    async def get_group_students(self, group_id: UUID) -> List[Student]:
+        student_ids = self.__cache.get(_group_students_key(group_id))
+        if student_ids is not MISSING:
+            students = [self.__cache.get(_student_key(student_id)) for student_id in student_ids]
+            # Запись студента могла быть вытеснена или сброшена изменением — тогда состав загружается заново
+            if all(student is not MISSING and student is not None for student in students):
+                return students
+        generation = self.__cache.generation
+        students = await self.__persistence.get_group_students(group_id)
+        if self.__store_reads:
+            for student in students:
+                self.__cache.set(_student_key(student.id), student, generation)
+            self.__cache.set(_group_students_key(group_id), [student.id for student in students], generation)
+        return students
+
+    async def assign_student_to_group(self, student_id: UUID, group_id: UUID) -> None:
+        await self.__persistence.assign_student_to_group(student_id, group_id)
+        self.__cache.invalidate(_student_key(student_id), _group_students_key(group_id))
+
+    async def remove_student_from_group(self, student_id: UUID, group_id: UUID) -> None:
+        await self.__persistence.remove_student_from_group(student_id, group_id)
+        self.__cache.invalidate(_student_key(student_id), _group_students_key(group_id))
+
+    async def transfer_student_between_groups(self, student_id: UUID, from_group_id: UUID, to_group_id: UUID) -> None:
+        await self.__persistence.transfer_student_between_groups(student_id, from_group_id, to_group_id)
+        self.__cache.invalidate(
+            _student_key(student_id),
+            _group_students_key(from_group_id),
+            _group_students_key(to_group_id)
+        )
+
+    async def assign_students_to_groups(self, assignments: List[Tuple[UUID, UUID]]) -> None:
+        await self.__persistence.assign_students_to_groups(assignments)
+        self.__cache.invalidate(*{
+            key
+            for student_id, group_id in assignments
+            for key in (_student_key(student_id), _group_students_key(group_id))
+        })
+
+    async def remove_students_from_groups(self, removals: List[Tuple[UUID, UUID]]) -> None:
+        await self.__persistence.remove_students_from_groups(removals)
+        self.__cache.invalidate(*{
+            key
+            for student_id, group_id in removals
+            for key in (_student_key(student_id), _group_students_key(group_id))
+        })
+
+    async def transfer_students_between_groups(self, transfers: List[Tuple[UUID, UUID, UUID]]) -> None:
+        await self.__persistence.transfer_students_between_groups(transfers)
+        self.__cache.invalidate(*{
+            key
+            for student_id, from_group_id, to_group_id in transfers
+            for key in (_student_key(student_id), _group_students_key(from_group_id), _group_students_key(to_group_id))
+        })
+
+    async def __cached(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """Прочитать значение из кэша процесса, а при промахе — из реализации."""
+        value = self.__cache.get(key)
+        if value is MISSING:
+            generation = self.__cache.generation
+            value = await load()
+            if self.__store_reads:
+                self.__cache.set(key, value, generation)
+        return value
+
+    async def __cached_many(
+            self,
+            key: Callable[[UUID], Hashable],
+            entity_ids: List[UUID],
+            load: Callable[[List[UUID]], Awaitable[List[T]]]
+    ) -> List[T]:
+        """Прочитать записи из кэша, а промахи загрузить из реализации одним пакетом."""
+        found, missed = [], []
+        for entity_id in dict.fromkeys(entity_ids):
+            value = self.__cache.get(key(entity_id))
+            if value is MISSING:
+                missed.append(entity_id)
+            elif value is not None:
+                found.append(value)
+        if missed:
+            generation = self.__cache.generation
+            loaded = {entity.id: entity for entity in await load(missed)}
+            for entity_id in missed:
+                # Отсутствие записи кэшируется так же, как в одиночных чтениях
+                entity = loaded.get(entity_id)
+                if self.__store_reads:
+                    self.__cache.set(key(entity_id), entity, generation)
+                if entity is not None:
+                    found.append(entity)
+        return found
@@ -1,138 +1,728 @@
+import gc
+import heapq
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import asynccontextmanager, contextmanager
+from itertools import count, groupby, takewhile
 from uuid import UUID
-from typing import List, Dict
-from app.domain.entities import Group, Student
-from app.persistance.base import BaseGroupPersistence
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Set, Tuple, Type, TypeVar
+from app.domain.entities import Group, GroupFilter, Student, StudentFilter
+from app.domain.exceptions import (
+    GroupNotFoundException,
+    StudentAlreadyInGroupException,
+    StudentNotFoundException,
+    StudentNotInGroupException,
+)
+from app.persistance.base import BaseGroupPersistence, apply_transfers
+from app.persistance.locking import StripedLock
+from app.persistance.snapshot import MappedSnapshot, write_snapshot
+from app.persistance.wal import WalOperation, WriteAheadLog, read_records
+
+_Entity = TypeVar("_Entity", Group, Student)
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+
+
+class _GroupRecord:
+    """
+    Компактная запись группы: без словаря атрибутов, ID хранится только в ключе.
+
+    Записи не изменяются на месте — изменение заменяет запись целиком, поэтому копия словаря
+    групп остаётся согласованной.
+    """
+    __slots__ = ("name", "number", "revision")
+
+    def __init__(self, name: str, number: str, revision: int):
+        self.name = name
+        self.number = number
+        self.revision = revision
+
+
+class _StudentRecord:
+    """Компактная запись студента."""
+    __slots__ = ("name", "number")
+
+    def __init__(self, name: str, number: str):
+        self.name = name
+        self.number = number
+
 
 # Имитация хранения данных в памяти
-groups: Dict[str, Dict] = {}  # Словарь для хранения групп
-students: Dict[str, Dict] = {}  # Словарь для хранения студентов
-group_students: Dict[str, List[str]] = {}  # Словарь для хранения связей групп и студентов {group_id: [student_id1, student_id2, ...]}
+groups: Dict[UUID, _GroupRecord] = {}  # Словарь для хранения групп
+students: Dict[UUID, _StudentRecord] = {}  # Словарь для хранения студентов
+# Двусторонний индекс связей; пустые множества не хранятся
+group_students: Dict[UUID, Set[UUID]] = {}  # {group_id: {student_id1, student_id2, ...}}
+student_groups: Dict[UUID, Set[UUID]] = {}  # {student_id: {group_id1, group_id2, ...}}
+
+# Источник возрастающих ревизий групп
+_revision_counter = count(1)
+# Последняя выданная ревизия: меняется при любом изменении списка групп
+_last_revision = 0
+
+# Журнал изменений; None, пока хранилище не восстановлено через `recover`
+_wal: Optional[WriteAheadLog] = None
+# Ревизии резервируются в журнале блоками (как кэш последовательностей в Postgres): после перезапуска
+# выдача продолжается с конца последнего блока, и ETag, выданный до сбоя, не может совпасть с новым.
+# Следующий блок дописывается в журнал на блок вперёд, и его сбрасывает на диск фоновый fsync журнала:
+# выдача ревизии не ждёт диска, пока не обгонит фоновый fsync на целый блок
+REVISION_RESERVE = 1000
+# Ревизии до `_durable_revision` включительно зарезервированы записью, которая уже на диске;
+# `_reserved_revision` — граница последней дописанной записи с номером `_reservation_record`
+_durable_revision = 0
+_reserved_revision = 0
+_reservation_record = 0
+
+# Отсортированные ключи (name, id) для keyset-пагинации и поиска по префиксу названия
+groups_order: List[Tuple[str, UUID]] = []
+students_order: List[Tuple[str, UUID]] = []
+# Индексы точного номера; пустые множества не хранятся
+groups_by_number: Dict[str, Set[UUID]] = {}
+students_by_number: Dict[str, Set[UUID]] = {}
+
+# Сколько ключей списка сортировки просматривается под блокировкой за один раз при поиске
+SCAN_CHUNK_SIZE = 1024
+_SCAN_DONE = object()
+
+# Блокировки для доступа из нескольких потоков. Изменение записи или связи выполняется под полосами
+# ID всех затронутых групп и студентов; чтение отдельных записей обходится без блокировок.
+# Методы хранилища захватывают полосы через `hold_async`: занятую полосу ждёт рабочий поток, а не цикл событий.
+# Блокировки списков сортировки (и индексов номеров) и ревизий захватываются последними и ничего не ждут внутри.
+_locks = StripedLock()
+_order_lock = threading.Lock()
+_revision_lock = threading.Lock()
+# Снимки записываются по одному: периодический и финальный при остановке не пишут один файл одновременно
+_checkpoint_lock = threading.Lock()
+
+
+def _construct(model: Type[_Entity], values: Dict[str, object]) -> _Entity:
+    """
+    Собрать сущность из уже проверенных значений без валидации.
+
+    Делает то же, что `model_construct`, но без обхода полей модели ради значений по умолчанию и
+    псевдонимов: значения записей проверены при записи, а `values` содержит все поля.
+    """
+    entity = _new_object(model)
+    _set_attribute(entity, "__dict__", values)
+    _set_attribute(entity, "__pydantic_fields_set__", set(values))
+    _set_attribute(entity, "__pydantic_extra__", None)
+    _set_attribute(entity, "__pydantic_private__", None)
+    return entity
+
+
+def _to_group(group_id: UUID, record: _GroupRecord) -> Group:
+    """Собрать сущность группы из записи."""
+    return _construct(Group, {"id": group_id, "name": record.name, "number": record.number})
+
+
+def _to_student(student_id: UUID, record: _StudentRecord) -> Student:
+    """Собрать сущность студента с его группами из обратного индекса."""
+    # sorted копирует множество целиком до первого сравнения, поэтому параллельное изменение связей не мешает
+    group_ids = sorted(student_groups.get(student_id, ()))
+    return _construct(Student, {"id": student_id, "name": record.name, "number": record.number, "group_ids": group_ids})
+
+
+def _remove_key(order: List[Tuple[str, UUID]], key: Tuple[str, UUID]) -> None:
+    """Удалить ключ из отсортированного списка бинарным поиском."""
+    index = bisect_left(order, key)
+    if index < len(order) and order[index] == key:
+        del order[index]
+
+
+def _page_keys(order: List[Tuple[str, UUID]], limit: int, after: Optional[Tuple[str, UUID]]) -> List[Tuple[str, UUID]]:
+    """Вернуть не более `limit` ключей, следующих строго после позиции `after`."""
+    with _order_lock:
+        start = 0 if after is None else bisect_right(order, after)
+        return order[start:start + limit]
+
+
+def _ensure_exist(student_ids: List[UUID], group_ids: List[UUID]) -> None:
+    """Проверить существование всех студентов и групп до изменения данных."""
+    for student_id in student_ids:
+        if student_id not in students:
+            raise StudentNotFoundException(student_id)
+    for group_id in group_ids:
+        if group_id not in groups:
+            raise GroupNotFoundException(group_id)
+
+
+def _next_revision() -> int:
+    """Выдать следующую ревизию."""
+    global _last_revision, _durable_revision, _reserved_revision, _reservation_record
+    with _revision_lock:
+        _last_revision = next(_revision_counter)
+        if _wal is not None and _last_revision > _durable_revision:
+            # Начат блок, дописанный заранее; обычно фоновый fsync давно сбросил его на диск
+            if not _wal.synced(_reservation_record):
+                _wal.sync()
+            _durable_revision = _reserved_revision
+            _reserved_revision += REVISION_RESERVE
+            _reservation_record = _wal.append(WalOperation.RESERVE_REVISIONS, _reserved_revision)
+        return _last_revision
+
+
+def _log(operation: WalOperation, *args) -> None:
+    """Записать изменение в журнал; вызывается под теми же блокировками, что и само изменение."""
+    if _wal is not None:
+        _wal.append(operation, *args)
+
+
+def _insert_order(order: List[Tuple[str, UUID]], key: Tuple[str, UUID], previous_name: Optional[str]) -> None:
+    """Поставить ключ в отсортированный список, убрав ключ с прежним именем."""
+    with _order_lock:
+        if previous_name is not None:
+            _remove_key(order, (previous_name, key[1]))
+        insort(order, key)
+
+
+def _merge_order(order: List[Tuple[str, UUID]], keys: List[Tuple[str, UUID]], records: Dict[UUID, object]) -> None:
+    """Добавить пачку новых ключей: сортировка двух упорядоченных серий — линейное слияние, а не вставка по одному."""
+    keys.sort()
+    with _order_lock:
+        # Пока ключи копились, другие потоки могли удалить или пересоздать записи: берём только актуальные
+        order.extend(key for key in keys if getattr(records.get(key[1]), "name", None) == key[0])
+        order.sort()
+        order[:] = [key for key, _ in groupby(order)]
+
+
+def _reindex_number(index: Dict[str, Set[UUID]], key: UUID, number: Optional[str], previous: Optional[str]) -> None:
+    """Перенести ID в индексе номеров с прежнего номера на новый; None — номера нет."""
+    with _order_lock:
+        if previous is not None:
+            _discard(index, previous, key)
+        if number is not None:
+            index.setdefault(number, set()).add(key)
+
+
+def _filter_page(
+        order: List[Tuple[str, UUID]],
+        records: Dict[UUID, object],
+        by_number: Dict[str, Set[UUID]],
+        limit: int,
+        after: Optional[Tuple[str, UUID]],
+        filters: GroupFilter,
+        candidates: Optional[Set[UUID]] = None
+) -> List[UUID]:
+    """
+    Вернуть ID не более `limit` подходящих под `filters` записей, следующих после `after` в порядке (name, id).
+
+    Если отбор сужен индексом (номер или состав группы в `candidates`), сортируются только кандидаты.
+    Иначе просматривается список сортировки: с префикса названия, найденного бисекцией, и до первого
+    названия без этого префикса; поиск подстроки обходит список до набора `limit` совпадений.
+    """
+    if filters.number is not None:
+        by_number_ids = by_number.get(filters.number, set())
+        candidates = by_number_ids if candidates is None else candidates & by_number_ids
+    if candidates is not None:
+        keys = []
+        for key in list(candidates):
+            record = records.get(key)
+            if record is None or (after is not None and (record.name, key) <= after):
+                continue
+            if filters.matches(record.name, record.number):
+                keys.append((record.name, key))
+        return [key for _, key in heapq.nsmallest(limit, keys)]
+
+    prefix, position, found = filters.name_prefix, after, []
+    needle = filters.search.casefold() if filters.search is not None else None
+    while len(found) < limit and position is not _SCAN_DONE:
+        with _order_lock:
+            start = 0 if position is None else bisect_right(order, position)
+            if prefix is not None:
+                start = max(start, bisect_left(order, (prefix,)))
+            chunk = order[start:start + SCAN_CHUNK_SIZE]
+        position = chunk[-1] if len(chunk) == SCAN_CHUNK_SIZE else _SCAN_DONE
+        if prefix is not None:
+            # Ключи с префиксом идут подряд: первый ключ без него завершает просмотр
+            matched = list(takewhile(lambda key: key[0].startswith(prefix), chunk))
+            if len(matched) < len(chunk):
+                position = _SCAN_DONE
+            chunk = matched
+        if needle is not None:
+            # Название проверяется по ключу списка сортировки, запись читается только для прошедших ключей
+            chunk = [key for key in chunk if needle in key[0].casefold()]
+        for name, key in chunk:
+            record = records.get(key)
+            if record is not None and record.name == name and filters.matches(name, record.number):
+                found.append(key)
+                if len(found) == limit:
+                    break
+    return found
+
+
+@asynccontextmanager
+async def _hold_with_links(key: UUID, index: Dict[UUID, Set[UUID]]) -> AsyncIterator[None]:
+    """Захватить полосы ID и всех связанных с ним ID из индекса."""
+    while True:
+        linked = set(index.get(key, ()))
+        async with _locks.hold_async(key, *linked):
+            # Под полосой ключа связи не меняются: если новых не появилось, набор полос полон
+            if index.get(key, set()) <= linked:
+                yield
+                return
+
+
+def _bump_revision(group_id: UUID) -> None:
+    """Выдать группе новую ревизию."""
+    record = groups[group_id]
+    groups[group_id] = _GroupRecord(record.name, record.number, _next_revision())
+
+
+def _bump_student_groups(student_id: UUID) -> None:
+    """
+    Выдать новые ревизии всем группам студента: состав группы отдаётся вместе с группами участников.
+
+    Вызывается под полосой студента: пока она захвачена, его группы не удаляются и не меняются.
+    """
+    for group_id in student_groups.get(student_id, ()):
+        _bump_revision(group_id)
+
+
+def _link(student_id: UUID, group_id: UUID) -> bool:
+    """Добавить связь студента с группой; вернуть False, если она уже была."""
+    member_ids = group_students.setdefault(group_id, set())
+    if student_id in member_ids:
+        return False
+    member_ids.add(student_id)
+    student_groups.setdefault(student_id, set()).add(group_id)
+    _bump_student_groups(student_id)
+    _log(WalOperation.LINK, student_id, group_id)
+    return True
+
+
+def _discard(index: Dict[UUID, Set[UUID]], key: UUID, value: UUID) -> None:
+    """Удалить значение из множества индекса, удалив опустевшее множество."""
+    values = index.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del index[key]
+
+
+def _unlink(student_id: UUID, group_id: UUID) -> None:
+    """Удалить связь студента с группой, если она есть."""
+    member_ids = group_students.get(group_id)
+    if member_ids and student_id in member_ids:
+        _discard(group_students, group_id, student_id)
+        _discard(student_groups, student_id, group_id)
+        _bump_revision(group_id)
+        _bump_student_groups(student_id)
+        _log(WalOperation.UNLINK, student_id, group_id)
+
+
+def _unlink_group(group_id: UUID) -> Set[UUID]:
+    """Удалить все связи группы через обратный индекс; вернуть бывших участников."""
+    member_ids = group_students.pop(group_id, set())
+    for student_id in member_ids:
+        _discard(student_groups, student_id, group_id)
+        _bump_student_groups(student_id)
+    return member_ids
+
+
+def _put_group(group_id: UUID, name: str, number: str, keep_order: bool = True) -> None:
+    """Записать группу; вызывается под полосами группы и её участников."""
+    previous = groups.get(group_id)
+    if previous is not None:
+        _unlink_group(group_id)  # Пересоздание группы начинается с пустого состава
+    if keep_order:
+        _insert_order(groups_order, (name, group_id), previous.name if previous is not None else None)
+    _reindex_number(groups_by_number, group_id, number, previous.number if previous is not None else None)
+    groups[group_id] = _GroupRecord(name, number, _next_revision())
+    _log(WalOperation.CREATE_GROUP, group_id, name, number)
+
+
+def _put_student(student_id: UUID, name: str, number: str, keep_order: bool = True) -> None:
+    """Записать студента; вызывается под полосой студента."""
+    previous = students.get(student_id)
+    if keep_order:
+        _insert_order(students_order, (name, student_id), previous.name if previous is not None else None)
+    _reindex_number(students_by_number, student_id, number, previous.number if previous is not None else None)
+    students[student_id] = _StudentRecord(name, number)
+    _log(WalOperation.CREATE_STUDENT, student_id, name, number)
+
+
+def _pop_group(group_id: UUID, keep_order: bool = True) -> Optional[Set[UUID]]:
+    """Удалить группу со связями; вернуть её бывших участников или None, если группы нет."""
+    record = groups.pop(group_id, None)
+    if record is None:
+        return None
+    if keep_order:
+        with _order_lock:
+            _remove_key(groups_order, (record.name, group_id))
+    _reindex_number(groups_by_number, group_id, None, record.number)
+    member_ids = _unlink_group(group_id)
+    _next_revision()
+    _log(WalOperation.DELETE_GROUP, group_id)
+    return member_ids
+
+
+def _pop_student(student_id: UUID, keep_order: bool = True) -> Optional[Set[UUID]]:
+    """Удалить студента; вернуть его бывшие группы или None, если студента нет."""
+    record = students.pop(student_id, None)
+    if record is None:
+        return None
+    if keep_order:
+        with _order_lock:
+            _remove_key(students_order, (record.name, student_id))
+    _reindex_number(students_by_number, student_id, None, record.number)
+    # Удаление студента только из его групп по обратному индексу, без обхода всех групп
+    member_of = student_groups.pop(student_id, set())
+    for group_id in member_of:
+        _discard(group_students, group_id, student_id)
+        _bump_revision(group_id)
+    _log(WalOperation.DELETE_STUDENT, student_id)
+    return member_of
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Приостановить циклический сборщик мусора.
+
+    При загрузке и сохранении создаются миллионы объектов без циклов, и сборщик, запускаясь по счётчику
+    аллокаций, многократно обходит их впустую.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _load_snapshot(snapshot: MappedSnapshot) -> None:
+    """Заполнить пустое хранилище из снимка, используя его готовые индексы и порядок сортировки."""
+    group_ids, student_ids = snapshot.all_group_ids(), snapshot.all_student_ids()
+    group_strings, student_strings = snapshot.all_group_strings(), snapshot.all_student_strings()
+    rows = zip(group_ids, group_strings, snapshot.group_revisions.tolist(), snapshot.all_group_members())
+    for group_id, (name, number), revision, members in rows:
+        groups[group_id] = _GroupRecord(name, number, revision)
+        if members:
+            group_students[group_id] = {student_ids[member] for member in members}
+    for student_id, (name, number), member_of in zip(student_ids, student_strings, snapshot.all_student_groups()):
+        students[student_id] = _StudentRecord(name, number)
+        if member_of:
+            student_groups[student_id] = {group_ids[group] for group in member_of}
+    groups_order[:] = [(group_strings[index][0], group_ids[index]) for index in snapshot.groups_order.tolist()]
+    students_order[:] = [(student_strings[index][0], student_ids[index]) for index in snapshot.students_order.tolist()]
+    for index, ids, strings in ((groups_by_number, group_ids, group_strings), (students_by_number, student_ids, student_strings)):
+        for key, (_, number) in zip(ids, strings):
+            index.setdefault(number, set()).add(key)
+
+
+def _replay(operation: WalOperation, args: tuple) -> None:
+    """
+    Повторить операцию из журнала; операции, ставшие неприменимыми, пропускаются.
+
+    Порядок сортировки при повторе не поддерживается — он перестраивается один раз в конце.
+    """
+    if operation == WalOperation.CREATE_GROUP:
+        _put_group(*args, keep_order=False)
+    elif operation == WalOperation.CREATE_STUDENT:
+        _put_student(*args, keep_order=False)
+    elif operation == WalOperation.DELETE_GROUP:
+        _pop_group(*args, keep_order=False)
+    elif operation == WalOperation.DELETE_STUDENT:
+        _pop_student(*args, keep_order=False)
+    elif operation == WalOperation.LINK:
+        student_id, group_id = args
+        if student_id in students and group_id in groups:
+            _link(student_id, group_id)
+    elif operation == WalOperation.UNLINK:
+        _unlink(*args)
+
+
+def recover(snapshot_path: str, wal_path: str, sync_interval: float = 0.05) -> None:
+    """
+    Восстановить хранилище из последнего снимка и хвоста журнала и начать журналирование изменений.
+
+    Операции журнала повторяют итоговое состояние при повторном применении, поэтому сбой между
+    записью снимка и очисткой журнала в `checkpoint` безопасен.
+
+    Args:
+        snapshot_path (str): Путь к снимку; если файла нет, восстановление начинается с пустого хранилища.
+        wal_path (str): Путь к журналу.
+        sync_interval (float): Период пакетного fsync журнала в секундах.
+    """
+    global _wal, _revision_counter, _last_revision, _durable_revision, _reserved_revision, _reservation_record
+    with _locks.hold_all(), _gc_paused():
+        if _wal is not None:
+            _wal.close()
+            _wal = None
+        for index in (groups, students, group_students, student_groups, groups_by_number, students_by_number):
+            index.clear()
+        groups_order.clear()
+        students_order.clear()
+
+        reserved = 0
+        if os.path.exists(snapshot_path):
+            snapshot = MappedSnapshot(snapshot_path)
+            _load_snapshot(snapshot)
+            reserved = snapshot.last_revision
+        records = []
+        for operation, args in read_records(wal_path):
+            if operation == WalOperation.RESERVE_REVISIONS:
+                reserved = max(reserved, args[0])
+            else:
+                records.append((operation, args))
+
+        # Все ревизии после восстановления больше любой, выданной до него
+        _revision_counter = count(reserved + 1)
+        _last_revision = reserved
+        for operation, args in records:
+            _replay(operation, args)
+        if records:
+            groups_order[:] = sorted((record.name, group_id) for group_id, record in groups.items())
+            students_order[:] = sorted((record.name, student_id) for student_id, record in students.items())
+        _wal = WriteAheadLog(wal_path, sync_interval)
+        # Первый блок после восстановления сразу попадает на диск; следующий дописывается с первой ревизией
+        _durable_revision = _last_revision
+        _reserved_revision = _last_revision + REVISION_RESERVE
+        _reservation_record = _wal.append(WalOperation.RESERVE_REVISIONS, _reserved_revision, sync=True)
+
+
+def _copy_state() -> tuple:
+    """
+    Скопировать данные для снимка в порядке аргументов `write_snapshot` после пути; вызывается под всеми полосами.
+
+    Записи групп и студентов неизменяемы, поэтому копируются только словари, изменяемые множества
+    составов и списки сортировки.
+    """
+    group_students_copy = {group_id: set(member_ids) for group_id, member_ids in group_students.items()}
+    with _order_lock:
+        orders = list(groups_order), list(students_order)
+    return dict(groups), dict(students), group_students_copy, _last_revision, *orders
+
+
+def checkpoint(snapshot_path: str) -> None:
+    """
+    Записать снимок и удалить из журнала попавшие в него записи.
+
+    Изменения блокируются только на время копирования словарей и составов групп; снимок
+    сериализуется и пишется на диск из копии, пока изменения продолжаются. Журнал сохраняет
+    записи, дописанные после копирования, — с ними снимок восстанавливает текущее состояние.
+    """
+    global _reservation_record
+    with _checkpoint_lock, _gc_paused():
+        with _locks.hold_all():
+            state = _copy_state()
+            wal, position = _wal, None
+            if wal is not None:
+                # Резерв ревизий повторяется после позиции: очистка журнала не удалит границу выданных ревизий
+                position = wal.position()
+                _reservation_record = wal.append(WalOperation.RESERVE_REVISIONS, _reserved_revision)
+        write_snapshot(snapshot_path, *state)
+        if wal is not None:
+            wal.truncate(position)
+
+
+def close() -> None:
+    """Сбросить журнал на диск и прекратить журналирование."""
+    global _wal
+    with _locks.hold_all():
+        if _wal is not None:
+            _wal.close()
+            _wal = None
 
 
 class GroupDictionaryPersistence(BaseGroupPersistence):
-    def get_by_id(self, group_id: UUID) -> Group | None:
+    async def get_by_id(self, group_id: UUID) -> Group | None:
         """Получить группу по ID."""
-        group_str_id = str(group_id)
-        if group_str_id in groups:
-            group_dict = groups[group_str_id]
-            return Group(
-                id=UUID(group_dict['id']),
-                name=group_dict['name'],
-                number=group_dict['number']
-            )
-        return None
+        record = groups.get(group_id)
+        return _to_group(group_id, record) if record is not None else None
 
-    def get_all(self) -> List[Group]:
+    async def get_all(self) -> List[Group]:
         """Получить все группы."""
-        return [
-            Group(
-                id=UUID(group_dict['id']),
-                name=group_dict['name'],
-                number=group_dict['number']
-            )
-            for group_dict in groups.values()
-        ]
-
-    def create_group(self, group: Group) -> Group:
+        return [_to_group(group_id, record) for group_id, record in list(groups.items())]
+
+    async def get_groups_by_ids(self, group_ids: List[UUID]) -> List[Group]:
+        """Получить группы по списку ID."""
+        found = ((group_id, groups.get(group_id)) for group_id in dict.fromkeys(group_ids))
+        return [_to_group(group_id, record) for group_id, record in found if record is not None]
+
+    async def get_group_with_revision(self, group_id: UUID) -> Optional[Tuple[Group, int]]:
+        """Получить группу и её ревизию; None, если группы нет."""
+        record = groups.get(group_id)
+        return (_to_group(group_id, record), record.revision) if record is not None else None
+
+    async def get_groups_revision(self) -> str:
+        """Получить версию списка групп."""
+        return f"{len(groups)}-{_last_revision}"
+
+    async def get_groups_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[GroupFilter] = None
+    ) -> List[Group]:
+        """Получить страницу подходящих под `filters` групп, упорядоченных по (name, id), строго после позиции `after`."""
+        if filters is None:
+            group_ids = [group_id for _, group_id in _page_keys(groups_order, limit, after)]
+        else:
+            group_ids = _filter_page(groups_order, groups, groups_by_number, limit, after, filters)
+        page = [(group_id, groups.get(group_id)) for group_id in group_ids]
+        return [_to_group(group_id, record) for group_id, record in page if record is not None]
+
+    async def iter_groups(self) -> AsyncIterator[Group]:
+        """Потоково перебрать все группы."""
+        # Снимок ключей защищает от изменения словаря между итерациями
+        for group_id in list(groups):
+            record = groups.get(group_id)
+            if record is not None:
+                yield _to_group(group_id, record)
+
+    async def create_group(self, group: Group) -> Group:
         """Создать новую группу."""
-        group_str_id = str(group.id)
-        groups[group_str_id] = {
-            'id': str(group.id),
-            'name': group.name,
-            'number': group.number
-        }
-        group_students[group_str_id] = []  # Инициализация пустого списка студентов
+        async with _hold_with_links(group.id, group_students):
+            _put_group(group.id, group.name, group.number)
         return group
 
-    def delete_group(self, group_id: UUID) -> None:
-        """Удалить группу."""
-        group_str_id = str(group_id)
-        if group_str_id in groups:
-            del groups[group_str_id]
-            if group_str_id in group_students:
-                del group_students[group_str_id]
+    async def create_groups_bulk(self, groups_to_create: List[Group]) -> List[UUID]:
+        """Создать группы, пропуская уже существующие."""
+        created_ids, keys = [], []
+        for group in groups_to_create:
+            async with _locks.hold_async(group.id):
+                if group.id not in groups:
+                    _put_group(group.id, group.name, group.number, keep_order=False)
+                    created_ids.append(group.id)
+                    keys.append((group.name, group.id))
+        _merge_order(groups_order, keys, groups)
+        return created_ids
+
+    async def delete_group(self, group_id: UUID) -> List[UUID]:
+        """Удалить группу; вернуть ID исключённых из неё студентов."""
+        async with _hold_with_links(group_id, group_students):
+            member_ids = _pop_group(group_id)
+        if member_ids is None:
+            raise GroupNotFoundException(group_id)
+        return list(member_ids)
 
-    def get_all_students(self) -> List[Student]:
+    async def get_all_students(self) -> List[Student]:
         """Получить всех студентов."""
-        return [
-            Student(
-                id=UUID(student_dict['id']),
-                name=student_dict['name'],
-                number=student_dict['number']
-            )
-            for student_dict in students.values()
-        ]
-
-    def get_student_by_id(self, student_id: UUID) -> Student | None:
+        return [_to_student(student_id, record) for student_id, record in list(students.items())]
+
+    async def get_students_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[StudentFilter] = None
+    ) -> List[Student]:
+        """Получить страницу подходящих под `filters` студентов, упорядоченных по (name, id), строго после позиции `after`."""
+        if filters is None:
+            student_ids = [student_id for _, student_id in _page_keys(students_order, limit, after)]
+        else:
+            # Состав группы берётся из индекса связей и сужает отбор так же, как индекс номеров
+            members = group_students.get(filters.group_id, set()) if filters.group_id is not None else None
+            student_ids = _filter_page(students_order, students, students_by_number, limit, after, filters, members)
+        page = [(student_id, students.get(student_id)) for student_id in student_ids]
+        return [_to_student(student_id, record) for student_id, record in page if record is not None]
+
+    async def iter_students(self) -> AsyncIterator[Student]:
+        """Потоково перебрать всех студентов."""
+        for student_id in list(students):
+            record = students.get(student_id)
+            if record is not None:
+                yield _to_student(student_id, record)
+
+    async def get_students_by_ids(self, student_ids: List[UUID]) -> List[Student]:
+        """Получить студентов по списку ID."""
+        found = ((student_id, students.get(student_id)) for student_id in dict.fromkeys(student_ids))
+        return [_to_student(student_id, record) for student_id, record in found if record is not None]
+
+    async def get_student_by_id(self, student_id: UUID) -> Student | None:
         """Получить студента по ID."""
-        student_str_id = str(student_id)
-        if student_str_id in students:
-            student_dict = students[student_str_id]
-            return Student(
-                id=UUID(student_dict['id']),
-                name=student_dict['name'],
-                number=student_dict['number']
-            )
-        return None
+        record = students.get(student_id)
+        return _to_student(student_id, record) if record is not None else None
 
-    def create_student(self, student: Student) -> Student:
+    async def create_student(self, student: Student) -> Student:
         """Создать нового студента."""
-        student_str_id = str(student.id)
-        students[student_str_id] = {
-            'id': str(student.id),
-            'name': student.name,
-            'number': student.number
-        }
+        async with _locks.hold_async(student.id):
+            _put_student(student.id, student.name, student.number)
         return student
 
-    def delete_student(self, student_id: UUID) -> None:
-        """Удалить студента."""
-        student_str_id = str(student_id)
-        if student_str_id in students:
-            # Удаление студента из всех групп
-            for group_student_list in group_students.values():
-                if student_str_id in group_student_list:
-                    group_student_list.remove(student_str_id)
-            del students[student_str_id]
-
-    def get_group_students(self, group_id: UUID) -> List[Student]:
+    async def create_students_bulk(self, students_to_create: List[Student]) -> List[UUID]:
+        """Создать студентов, пропуская уже существующих."""
+        created_ids, keys = [], []
+        for student in students_to_create:
+            async with _locks.hold_async(student.id):
+                if student.id not in students:
+                    _put_student(student.id, student.name, student.number, keep_order=False)
+                    created_ids.append(student.id)
+                    keys.append((student.name, student.id))
+        _merge_order(students_order, keys, students)
+        return created_ids
+
+    async def delete_student(self, student_id: UUID) -> List[UUID]:
+        """Удалить студента; вернуть ID групп, из которых он был исключён."""
+        async with _hold_with_links(student_id, student_groups):
+            member_of = _pop_student(student_id)
+        if member_of is None:
+            raise StudentNotFoundException(student_id)
+        return list(member_of)
+
+    async def get_group_students(self, group_id: UUID) -> List[Student]:
         """Получить всех студентов в группе."""
-        group_str_id = str(group_id)
-        if group_str_id in group_students:
-            student_ids = group_students[group_str_id]
-            return [
-                Student(
-                    id=UUID(students[student_id]['id']),
-                    name=students[student_id]['name'],
-                    number=students[student_id]['number']
-                )
-                for student_id in student_ids
-                if student_id in students
-            ]
-        return []
-
-    def assign_student_to_group(self, student_id: UUID, group_id: UUID) -> None:
+        # Полоса группы не даёт удалить её участников, пока собирается список
+        async with _locks.hold_async(group_id):
+            return [_to_student(student_id, students[student_id]) for student_id in group_students.get(group_id, ())]
+
+    async def assign_student_to_group(self, student_id: UUID, group_id: UUID) -> None:
         """Добавить студента в группу."""
-        group_str_id = str(group_id)
-        student_str_id = str(student_id)
+        async with _locks.hold_async(student_id, group_id):
+            _ensure_exist([student_id], [group_id])
+            if not _link(student_id, group_id):
+                raise StudentAlreadyInGroupException(student_id, group_id)
 
-        if group_str_id not in group_students:
-            group_students[group_str_id] = []
+    async def remove_student_from_group(self, student_id: UUID, group_id: UUID) -> None:
+        """Удалить студента из группы."""
+        async with _locks.hold_async(student_id, group_id):
+            _ensure_exist([student_id], [group_id])
+            _unlink(student_id, group_id)
 
-        if student_str_id not in group_students[group_str_id]:
-            group_students[group_str_id].append(student_str_id)
+    async def transfer_student_between_groups(self, student_id: UUID, from_group_id: UUID, to_group_id: UUID) -> None:
+        """Переместить студента из одной группы в другую; студент должен состоять в исходной группе."""
+        async with _locks.hold_async(student_id, from_group_id, to_group_id):
+            _ensure_exist([student_id], [from_group_id, to_group_id])
+            if student_id not in group_students.get(from_group_id, ()):
+                raise StudentNotInGroupException(student_id, from_group_id)
+            if from_group_id != to_group_id:
+                # Под полосами студента и обеих групп промежуточное состояние никому не видно
+                _unlink(student_id, from_group_id)
+                _link(student_id, to_group_id)
 
-    def remove_student_from_group(self, student_id: UUID, group_id: UUID) -> None:
-        """Удалить студента из группы."""
-        group_str_id = str(group_id)
-        student_str_id = str(student_id)
-
-        if group_str_id in group_students and student_str_id in group_students[group_str_id]:
-            group_students[group_str_id].remove(student_str_id)
-
-    def transfer_student_between_groups(self, student_id: UUID, from_group_id: UUID, to_group_id: UUID) -> None:
-        """Переместить студента из одной группы в другую."""
-        # Сначала удаляем из исходной группы
-        self.remove_student_from_group(student_id, from_group_id)
-        # Затем добавляем в новую группу
-        self.assign_student_to_group(student_id, to_group_id)
+    async def assign_students_to_groups(self, assignments: List[Tuple[UUID, UUID]]) -> None:
+        """Добавить студентов в группы; при отсутствии любого студента или группы ничего не меняется."""
+        student_ids, group_ids = [student_id for student_id, _ in assignments], [group_id for _, group_id in assignments]
+        async with _locks.hold_async(*student_ids, *group_ids):
+            _ensure_exist(student_ids, group_ids)
+            for student_id, group_id in assignments:
+                _link(student_id, group_id)
+
+    async def remove_students_from_groups(self, removals: List[Tuple[UUID, UUID]]) -> None:
+        """Удалить студентов из групп; при отсутствии любого студента или группы ничего не меняется."""
+        student_ids, group_ids = [student_id for student_id, _ in removals], [group_id for _, group_id in removals]
+        async with _locks.hold_async(*student_ids, *group_ids):
+            _ensure_exist(student_ids, group_ids)
+            for student_id, group_id in removals:
+                _unlink(student_id, group_id)
+
+    async def transfer_students_between_groups(self, transfers: List[Tuple[UUID, UUID, UUID]]) -> None:
+        """Перевести студентов между группами по порядку; при любой ошибке проверки ничего не меняется."""
+        student_ids = [student_id for student_id, _, _ in transfers]
+        group_ids = [group_id for _, from_group_id, to_group_id in transfers for group_id in (from_group_id, to_group_id)]
+        async with _locks.hold_async(*student_ids, *group_ids):
+            _ensure_exist(student_ids, group_ids)
+            # Итоговые составы вычисляются и проверяются до первого изменения
+            before = {student_id: set(student_groups.get(student_id, ())) for student_id in student_ids}
+            for student_id, after in apply_transfers(before, transfers).items():
+                for group_id in sorted(before[student_id] - after):
+                    _unlink(student_id, group_id)
+                for group_id in sorted(after - before[student_id]):
+                    _link(student_id, group_id)
+
+    def save_snapshot(self, path: str) -> None:
+        """Записать согласованный снимок данных для `MappedSnapshot`."""
+        with _locks.hold_all(), _gc_paused():
+            state = _copy_state()
+        write_snapshot(path, *state)
@@ -0,0 +1,16 @@
+import os
+
+
+def replace_durably(source_path: str, target_path: str) -> None:
+    """
+    Атомарно заменить файл и сбросить на диск запись каталога.
+
+    Сам `os.replace` меняет только запись в каталоге: пока каталог не сброшен на диск, после сбоя
+    по пути может оказаться прежний файл. Содержимое `source_path` должно быть уже сброшено на диск.
+    """
+    os.replace(source_path, target_path)
+    directory = os.open(os.path.dirname(os.path.abspath(target_path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Iterable, Iterator, List
+
+
+class StripedLock:
+    """
+    Набор блокировок, между которыми ключи распределяются по хэшу.
+
+    Операции над разными ключами почти всегда попадают в разные полосы и не мешают друг другу.
+    Несколько полос захватываются в порядке возрастания номера, поэтому взаимные блокировки исключены.
+    Блокировки не реентерабельны.
+    """
+
+    def __init__(self, stripes: int = 64):
+        """
+        Args:
+            stripes (int): Количество полос.
+        """
+        self.__locks = [threading.Lock() for _ in range(stripes)]
+
+    @contextmanager
+    def hold(self, *keys: Hashable) -> Iterator[None]:
+        """Захватить полосы всех переданных ключей."""
+        with self.__hold_stripes(self.__stripes(keys)):
+            yield
+
+    @contextmanager
+    def hold_all(self) -> Iterator[None]:
+        """Захватить все полосы, например для согласованного снимка данных."""
+        with self.__hold_stripes(range(len(self.__locks))):
+            yield
+
+    def hold_async(self, *keys: Hashable) -> "_AsyncHold":
+        """
+        Захватить полосы всех переданных ключей из цикла событий, не блокируя его (`async with`).
+
+        Свободные полосы захватываются сразу. Если какая-то занята (например, потоком, который
+        копирует данные для снимка), полосы ждёт рабочий поток, а цикл событий тем временем
+        обслуживает другие запросы.
+        """
+        return _AsyncHold([self.__locks[stripe] for stripe in self.__stripes(keys)])
+
+    def __stripes(self, keys: Iterable[Hashable]) -> List[int]:
+        return sorted({hash(key) % len(self.__locks) for key in keys})
+
+    @contextmanager
+    def __hold_stripes(self, stripes: Iterable[int]) -> Iterator[None]:
+        acquired: List[threading.Lock] = []
+        try:
+            for stripe in sorted(stripes):
+                lock = self.__locks[stripe]
+                lock.acquire()
+                acquired.append(lock)
+            yield
+        finally:
+            _release(acquired)
+
+
+class _AsyncHold:
+    """Асинхронный контекстный менеджер `StripedLock.hold_async`: без генератора, так как он на пути каждой операции."""
+    __slots__ = ("__locks",)
+
+    def __init__(self, locks: List[threading.Lock]):
+        self.__locks = locks
+
+    async def __aenter__(self) -> None:
+        if _try_acquire(self.__locks):
+            return
+        acquiring = asyncio.ensure_future(asyncio.to_thread(_acquire, self.__locks))
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # Поток всё равно дождётся полос: отпускаем их, как только он их получит
+            acquiring.add_done_callback(lambda _: _release(self.__locks))
+            raise
+
+    async def __aexit__(self, *exc_info) -> None:
+        _release(self.__locks)
+
+
+def _acquire(locks: List[threading.Lock]) -> None:
+    for lock in locks:
+        lock.acquire()
+
+
+def _try_acquire(locks: List[threading.Lock]) -> bool:
+    """Захватить все блокировки без ожидания; если какая-то занята, отпустить захваченные и вернуть False."""
+    for index, lock in enumerate(locks):
+        if not lock.acquire(blocking=False):
+            _release(locks[:index])
+            return False
+    return True
+
+
+def _release(locks: List[threading.Lock]) -> None:
+    for lock in reversed(locks):
+        lock.release()
@@ -1,17 +1,254 @@
+from functools import lru_cache
 from uuid import UUID
-from typing import List, Optional
-from sqlmodel import Session, select
-
-from app.db.models import GroupModel, StudentModel, GroupStudentModel
-from app.domain.entities import Group, Student
-from app.persistance.base import BaseGroupPersistence
-
-
-class PostgresGroupPersistence(BaseGroupPersistence):
-    def __init__(self, session: Session):
+from typing import AsyncIterator, FrozenSet, Iterable, List, Optional, Tuple
+from sqlalchemy import Uuid, any_, bindparam, delete, func, literal, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert
+from sqlalchemy.engine import CursorResult
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.models import GroupModel, GroupListRevisionModel, StudentModel, GroupStudentModel
+from app.db.models.group import GROUP_REVISION_SEQUENCE
+from app.domain.entities import Group, GroupFilter, Student, StudentFilter
+from app.domain.exceptions import (
+    GroupNotFoundException,
+    StudentAlreadyInGroupException,
+    StudentNotFoundException,
+    StudentNotInGroupException,
+)
+from app.persistance.base import BaseGroupPersistence, apply_transfers
+
+# Размер пакета строк, получаемых из серверного курсора за один раз
+STREAM_BATCH_SIZE = 1000
+
+# Количество строк в одном многострочном INSERT (ограничение asyncpg — 32767 параметров на запрос)
+INSERT_BATCH_SIZE = 5000
+
+
+def _uuid_array(ids: Iterable[UUID]):
+    """Передать список UUID одним параметром-массивом `uuid[]`."""
+    return literal(list(ids), ARRAY(Uuid))
+
+
+def _pairs_table(pairs: List[Tuple[UUID, UUID]]):
+    """Развернуть пары (student_id, group_id) в табличное выражение `unnest(...)` с двумя параметрами-массивами."""
+    return func.unnest(
+        _uuid_array(student_id for student_id, _ in pairs),
+        _uuid_array(group_id for _, group_id in pairs)
+    ).table_valued("student_id", "group_id").render_derived(name="pairs")
+
+
+def _exists(model, entity_id: UUID):
+    """Подзапрос EXISTS для записи таблицы `model` с указанным ID."""
+    return select(model.id).where(model.id == entity_id).exists()
+
+
+def _insert_relation(student_id: UUID, group_id: UUID):
+    """INSERT связи, выполняемый только если студент и группа существуют; существующая связь пропускается по первичному ключу."""
+    return (
+        insert(GroupStudentModel)
+        .from_select(
+            ["group_id", "student_id"],
+            select(literal(group_id, Uuid), literal(student_id, Uuid)).where(
+                _exists(StudentModel, student_id) & _exists(GroupModel, group_id)
+            )
+        )
+        .on_conflict_do_nothing(index_elements=[GroupStudentModel.group_id, GroupStudentModel.student_id])
+        .returning(GroupStudentModel.group_id, GroupStudentModel.student_id)
+    )
+
+
+def _exists_relation(student_id: UUID, group_id: UUID):
+    """Подзапрос EXISTS для связи студента с группой."""
+    return select(GroupStudentModel.group_id).where(
+        (GroupStudentModel.student_id == student_id) &
+        (GroupStudentModel.group_id == group_id)
+    ).exists()
+
+
+def _delete_relation(student_id: UUID, group_id: UUID):
+    """DELETE связи студента с группой."""
+    return delete(GroupStudentModel).where(
+        (GroupStudentModel.student_id == student_id) &
+        (GroupStudentModel.group_id == group_id)
+    ).returning(GroupStudentModel.group_id, GroupStudentModel.student_id)
+
+
+def _escape_like(value: str) -> str:
+    """Экранировать спецсимволы шаблона LIKE, чтобы строка пользователя совпадала буквально."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Чтения строятся по таблицам и выполняются на соединении сессии (Core): строки не проходят через
+# ORM-контекст выполнения и identity map, а сразу превращаются в сущности
+_GROUP_TABLE = GroupModel.__table__
+_STUDENT_TABLE = StudentModel.__table__
+_GROUP_STUDENT_TABLE = GroupStudentModel.__table__
+_GROUPS_LIST_TABLE = GroupListRevisionModel.__table__
+
+_GROUP_COLUMNS = (_GROUP_TABLE.c.id, _GROUP_TABLE.c.name, _GROUP_TABLE.c.group_number)
+_STUDENT_COLUMNS = (_STUDENT_TABLE.c.id, _STUDENT_TABLE.c.name, _STUDENT_TABLE.c.student_number)
+
+
+def _select_groups():
+    """SELECT колонок группы в порядке аргументов `_to_group`."""
+    return select(*_GROUP_COLUMNS)
+
+
+def _select_students():
+    """SELECT колонок студента и его групп в порядке аргументов `_to_student`."""
+    return select(*_STUDENT_COLUMNS, _student_groups())
+
+
+def _to_group(group_id: UUID, name: str, number: str) -> Group:
+    """Собрать сущность группы из строки результата."""
+    return Group(id=group_id, name=name, number=number)
+
+
+def _student_groups():
+    """
+    Коррелированный подзапрос `array_agg` с ID групп студента, упорядоченными по возрастанию.
+
+    Выбирается в одном запросе со строками студентов: состав групп для всей страницы
+    студентов загружается по индексу `ix_group_students_student_id`, без отдельного запроса на каждого студента.
+    """
+    membership = _GROUP_STUDENT_TABLE.alias("membership")
+    return (
+        select(func.array_agg(aggregate_order_by(membership.c.group_id, membership.c.group_id)))
+        .where(membership.c.student_id == _STUDENT_TABLE.c.id)
+        .correlate(_STUDENT_TABLE)
+        .scalar_subquery()
+    )
+
+
+def _to_student(student_id: UUID, name: str, number: str, group_ids: Optional[List[UUID]]) -> Student:
+    """Собрать сущность студента из строки результата; у студента без групп `array_agg` возвращает NULL."""
+    return Student(id=student_id, name=name, number=number, group_ids=group_ids or [])
+
+
+# Запросы чтения собираются один раз, значения передаются параметрами при выполнении. Построение
+# конструкции и вычисление её ключа кэша компиляции стоит сотни микросекунд на каждый вызов, а у готового
+# объекта ключ запоминается: остаётся найти скомпилированный SQL в кэше движка
+_GROUP_BY_ID = _select_groups().where(_GROUP_TABLE.c.id == bindparam("group_id", type_=Uuid))
+# ID передаются одним параметром-массивом: текст запроса не зависит от их количества
+_GROUPS_BY_IDS = _select_groups().where(_GROUP_TABLE.c.id == any_(bindparam("group_ids", type_=ARRAY(Uuid))))
+_ALL_GROUPS = _select_groups()
+_STREAM_GROUPS = _select_groups().execution_options(yield_per=STREAM_BATCH_SIZE)
+_GROUP_WITH_REVISION = select(*_GROUP_COLUMNS, _GROUP_TABLE.c.revision).where(
+    _GROUP_TABLE.c.id == bindparam("group_id", type_=Uuid)
+)
+_GROUPS_REVISION = select(_GROUPS_LIST_TABLE.c.revision).where(_GROUPS_LIST_TABLE.c.id == 1)
+_STUDENT_BY_ID = _select_students().where(_STUDENT_TABLE.c.id == bindparam("student_id", type_=Uuid))
+_STUDENTS_BY_IDS = _select_students().where(
+    _STUDENT_TABLE.c.id == any_(bindparam("student_ids", type_=ARRAY(Uuid)))
+)
+_ALL_STUDENTS = _select_students()
+_STREAM_STUDENTS = _select_students().execution_options(yield_per=STREAM_BATCH_SIZE)
+# JOIN по связям группы и подзапрос для всех групп каждого студента
+_GROUP_STUDENTS = (
+    _select_students()
+    .select_from(_STUDENT_TABLE.join(_GROUP_STUDENT_TABLE))
+    .where(_GROUP_STUDENT_TABLE.c.group_id == bindparam("group_id", type_=Uuid))
+)
+
+
+def _page_params(
+        limit: int,
+        after: Optional[Tuple[str, UUID]],
+        filters: Optional[GroupFilter]
+) -> dict:
+    """
+    Параметры запроса страницы; набор заданных ключей определяет форму запроса (см. `_page_query`).
+
+    Строка пользователя экранируется и передаётся в шаблоне LIKE одним параметром.
+    """
+    params = {"limit": limit}
+    if filters is not None:
+        if filters.number is not None:
+            params["number"] = filters.number
+        if filters.name_prefix is not None:
+            params["name_prefix"] = f"{_escape_like(filters.name_prefix)}%"
+        if filters.search is not None:
+            params["search"] = f"%{_escape_like(filters.search)}%"
+        if isinstance(filters, StudentFilter) and filters.group_id is not None:
+            params["group_id"] = filters.group_id
+    if after is not None:
+        params["after_name"], params["after_id"] = after
+    return params
+
+
+@lru_cache(maxsize=None)
+def _page_query(table, conditions: FrozenSet[str]):
+    """
+    Запрос страницы групп или студентов с keyset-пагинацией по (name, id) для набора условий `conditions`.
+
+    Форм запроса немного — по одной на сочетание заданных фильтров и позиции, — поэтому каждая
+    собирается один раз. Номер сравнивается по B-tree индексу номера, префикс — через LIKE 'abc%'
+    по индексу `text_pattern_ops`, подстрока — через ILIKE '%abc%' по триграммному индексу.
+    """
+    if table is _GROUP_TABLE:
+        query, number_column = _select_groups(), table.c.group_number
+    else:
+        query, number_column = _select_students(), table.c.student_number
+    query = query.order_by(table.c.name, table.c.id).limit(bindparam("limit"))
+    if "number" in conditions:
+        query = query.where(number_column == bindparam("number", type_=number_column.type))
+    if "name_prefix" in conditions:
+        query = query.where(table.c.name.like(bindparam("name_prefix", type_=table.c.name.type), escape="\\"))
+    if "search" in conditions:
+        query = query.where(table.c.name.ilike(bindparam("search", type_=table.c.name.type), escape="\\"))
+    if "group_id" in conditions:
+        # Выборка по группе идёт по первичному ключу связей (group_id, student_id)
+        query = query.where(table.c.id.in_(
+            select(_GROUP_STUDENT_TABLE.c.student_id)
+            .where(_GROUP_STUDENT_TABLE.c.group_id == bindparam("group_id", type_=Uuid))
+        ))
+    if "after_name" in conditions:
+        # Сравнение кортежей использует индекс (name, id), поэтому глубокие страницы не дороже первой
+        query = query.where(tuple_(table.c.name, table.c.id) > tuple_(
+            bindparam("after_name", type_=table.c.name.type), bindparam("after_id", type_=Uuid)
+        ))
+    return query
+
+
+# Версия списка групп растёт при создании и удалении групп; строку создаёт первое изменение. Блокировка строки
+# держится до фиксации, поэтому транзакции увеличивают версию в порядке фиксации и прочитанная версия
+# никогда не отстаёт от зафиксированного списка
+_BUMP_GROUPS_REVISION = insert(_GROUPS_LIST_TABLE).values(id=1, revision=1).on_conflict_do_update(
+    index_elements=[_GROUPS_LIST_TABLE.c.id],
+    set_={"revision": _GROUPS_LIST_TABLE.c.revision + 1},
+)
+
+
+def _bump_revisions(changed):
+    """
+    UPDATE, выдающий новую ревизию группам из колонки `group_id` CTE `changed` (группам с изменённым составом)
+    и всем группам студентов из колонки `student_id`: состав группы отдаётся вместе с группами участников.
+
+    Подзапрос к связям видит их состояние до запроса, поэтому группы, из которых студента исключает
+    этот же запрос, тоже попадают в выборку.
+    """
+    member_of = select(GroupStudentModel.group_id).where(GroupStudentModel.student_id.in_(select(changed.c.student_id)))
+    return (
+        update(GroupModel)
+        .where(GroupModel.id.in_(select(changed.c.group_id)) | GroupModel.id.in_(member_of))
+        .values(revision=GROUP_REVISION_SEQUENCE.next_value())
+        .execution_options(synchronize_session=False)
+    )
+
+
+class AsyncPostgresGroupPersistence(BaseGroupPersistence):
+    def __init__(self, session: AsyncSession, read_session: Optional[AsyncSession] = None):
+        """
+        Args:
+            session (AsyncSession): Сессия основного сервера для записи и проверок перед записью.
+            read_session (Optional[AsyncSession]): Сессия для методов чтения, например на реплике;
+                по умолчанию чтение идёт через `session`.
+        """
         self.__session = session
+        self.__read_session = read_session if read_session is not None else session
 
-    def get_by_id(self, group_id: UUID) -> Optional[Group]:
+    async def get_by_id(self, group_id: UUID) -> Optional[Group]:
         """
         Получить группу по её ID.
 
@@ -21,27 +258,96 @@ class PostgresGroupPersistence(BaseGroupPersistence):
         Returns:
             Optional[Group]: Объект группы, если она найдена, иначе None.
         """
-        query = select(GroupModel).where(GroupModel.id == group_id)
-        group = self.__session.exec(query).first()
-        if group:
-            return Group(id=group.id, name=group.name, number=group.group_number)
+        row = (await self.__read(_GROUP_BY_ID, group_id=group_id)).first()
+        if row:
+            return _to_group(*row)
         return None
 
-    def get_all(self) -> List[Group]:
+    async def get_all(self) -> List[Group]:
         """
         Получить список всех групп.
 
         Returns:
             List[Group]: Список всех групп.
         """
-        query = select(GroupModel)
-        groups = self.__session.exec(query).all()
-        return [
-            Group(id=group.id, name=group.name, number=group.group_number)
-            for group in groups
-        ]
+        rows = (await self.__read(_ALL_GROUPS)).all()
+        return [_to_group(*row) for row in rows]
+
+    async def get_groups_by_ids(self, group_ids: List[UUID]) -> List[Group]:
+        """
+        Получить группы по списку ID одним запросом.
+
+        Args:
+            group_ids (List[UUID]): Идентификаторы групп; повторы допускаются.
+
+        Returns:
+            List[Group]: Найденные группы в порядке, возвращённом базой; отсутствующие ID пропускаются.
+        """
+        if not group_ids:
+            return []
+        rows = (await self.__read(_GROUPS_BY_IDS, group_ids=list(set(group_ids)))).all()
+        return [_to_group(*row) for row in rows]
+
+    async def get_group_with_revision(self, group_id: UUID) -> Optional[Tuple[Group, int]]:
+        """
+        Получить группу и её ревизию одним запросом, без загрузки состава.
+
+        Args:
+            group_id (UUID): Идентификатор группы.
+
+        Returns:
+            Optional[Tuple[Group, int]]: Группа и её ревизия или None, если группа не найдена.
+        """
+        row = (await self.__read(_GROUP_WITH_REVISION, group_id=group_id)).first()
+        if row:
+            *group, revision = row
+            return _to_group(*group), revision
+        return None
+
+    async def get_groups_revision(self) -> str:
+        """
+        Получить версию списка групп одним чтением по первичному ключу.
+
+        Returns:
+            str: Версия списка групп.
+        """
+        return str((await self.__read(_GROUPS_REVISION)).scalar() or 0)
+
+    async def get_groups_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[GroupFilter] = None
+    ) -> List[Group]:
+        """
+        Получить страницу групп с keyset-пагинацией по (name, id).
+
+        Args:
+            limit (int): Максимальное количество групп на странице.
+            after (Optional[Tuple[str, UUID]]): Позиция (name, id) последней группы предыдущей страницы.
+            filters (Optional[GroupFilter]): Условия отбора групп.
+
+        Returns:
+            List[Group]: Группы, следующие за позицией `after`.
+        """
+        params = _page_params(limit, after, filters)
+        rows = (await self.__read(_page_query(_GROUP_TABLE, frozenset(params)), **params)).all()
+        return [_to_group(*row) for row in rows]
+
+    async def iter_groups(self) -> AsyncIterator[Group]:
+        """
+        Потоково перебрать все группы через серверный курсор.
+
+        Yields:
+            Group: Очередная группа.
+        """
+        # Поток читается уже после закрытия сессии запроса, поэтому курсор живёт в собственном соединении
+        async with self.__read_session.bind.connect() as connection:
+            rows = await connection.stream(_STREAM_GROUPS)
+            async for row in rows:
+                yield _to_group(*row)
 
-    def create_group(self, group: Group) -> Group:
+    async def create_group(self, group: Group) -> Group:
         """
         Создать новую группу.
 
@@ -57,45 +363,126 @@ class PostgresGroupPersistence(BaseGroupPersistence):
             group_number=group.number,
         )
         self.__session.add(db_group)
-        self.__session.commit()
-        self.__session.refresh(db_group)
+        await self.__session.flush()
+        await self.__session.exec(_BUMP_GROUPS_REVISION)
+        await self.__session.commit()
+        await self.__session.refresh(db_group)
         return Group(id=db_group.id, name=db_group.name, number=db_group.group_number)
 
-    def delete_group(self, group_id: UUID) -> None:
+    async def create_groups_bulk(self, groups: List[Group]) -> List[UUID]:
+        """
+        Создать группы многострочными INSERT ... ON CONFLICT DO NOTHING в одной транзакции.
+
+        Args:
+            groups (List[Group]): Группы для создания.
+
+        Returns:
+            List[UUID]: Идентификаторы созданных групп; уже существующие группы пропускаются.
+        """
+        rows = [
+            {"id": group.id, "name": group.name, "group_number": group.number}
+            for group in groups
+        ]
+        created_ids = await self.__insert_ignoring_conflicts(GroupModel, rows)
+        if created_ids:
+            await self.__session.exec(_BUMP_GROUPS_REVISION)
+        await self.__session.commit()
+        return created_ids
+
+    async def delete_group(self, group_id: UUID) -> List[UUID]:
         """
         Удалить группу по её ID.
 
         Args:
             group_id (UUID): Идентификатор группы для удаления.
-        """
-        # Сначала удаляем связи группы со студентами
-        query = select(GroupStudentModel).where(GroupStudentModel.group_id == group_id)
-        relations = self.__session.exec(query).all()
-        for relation in relations:
-            self.__session.delete(relation)
 
-        # Затем удаляем саму группу
-        query = select(GroupModel).where(GroupModel.id == group_id)
-        group = self.__session.exec(query).first()
-        if group:
-            self.__session.delete(group)
-            self.__session.commit()
+        Returns:
+            List[UUID]: Идентификаторы студентов, исключённых из группы.
 
-    def get_all_students(self) -> List[Student]:
+        Raises:
+            GroupNotFoundException: Если группа не существует.
+        """
+        # Связи и сама группа удаляются одним запросом; RETURNING сообщает, существовала ли группа и кто в ней был
+        relations = (
+            delete(GroupStudentModel)
+            .where(GroupStudentModel.group_id == group_id)
+            .returning(GroupStudentModel.student_id)
+            .cte("relations")
+        )
+        deleted = delete(GroupModel).where(GroupModel.id == group_id).returning(GroupModel.id).cte("deleted")
+        query = select(
+            select(deleted.c.id).exists(),
+            select(func.array_agg(relations.c.student_id)).scalar_subquery()
+        )
+        group_found, student_ids = (await self.__session.exec(query)).one()
+        await self.__check_found(groups=[(group_id, group_found)])
+        await self.__session.exec(_BUMP_GROUPS_REVISION)
+        if student_ids:
+            # Бывшие участники остаются в других группах, а их группы отдаются в составе этих групп
+            await self.__session.exec(_bump_revisions(_pairs_table([(student_id, group_id) for student_id in student_ids])))
+        await self.__session.commit()
+        return student_ids or []
+
+    async def get_all_students(self) -> List[Student]:
         """
         Получить список всех студентов.
 
         Returns:
             List[Student]: Список всех студентов.
         """
-        query = select(StudentModel)
-        students = self.__session.exec(query).all()
-        return [
-            Student(id=student.id, name=student.name, number=student.student_number)
-            for student in students
-        ]
+        rows = (await self.__read(_ALL_STUDENTS)).all()
+        return [_to_student(*row) for row in rows]
+
+    async def get_students_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[StudentFilter] = None
+    ) -> List[Student]:
+        """
+        Получить страницу студентов с keyset-пагинацией по (name, id).
+
+        Args:
+            limit (int): Максимальное количество студентов на странице.
+            after (Optional[Tuple[str, UUID]]): Позиция (name, id) последнего студента предыдущей страницы.
+            filters (Optional[StudentFilter]): Условия отбора студентов.
+
+        Returns:
+            List[Student]: Студенты, следующие за позицией `after`.
+        """
+        # Группы всей страницы выбираются тем же запросом: подзапрос выполняется только для отобранных LIMIT строк
+        params = _page_params(limit, after, filters)
+        rows = (await self.__read(_page_query(_STUDENT_TABLE, frozenset(params)), **params)).all()
+        return [_to_student(*row) for row in rows]
+
+    async def iter_students(self) -> AsyncIterator[Student]:
+        """
+        Потоково перебрать всех студентов через серверный курсор.
+
+        Yields:
+            Student: Очередной студент.
+        """
+        async with self.__read_session.bind.connect() as connection:
+            rows = await connection.stream(_STREAM_STUDENTS)
+            async for row in rows:
+                yield _to_student(*row)
+
+    async def get_students_by_ids(self, student_ids: List[UUID]) -> List[Student]:
+        """
+        Получить студентов вместе с их группами по списку ID одним запросом.
+
+        Args:
+            student_ids (List[UUID]): Идентификаторы студентов; повторы допускаются.
+
+        Returns:
+            List[Student]: Найденные студенты в порядке, возвращённом базой; отсутствующие ID пропускаются.
+        """
+        if not student_ids:
+            return []
+        rows = (await self.__read(_STUDENTS_BY_IDS, student_ids=list(set(student_ids)))).all()
+        return [_to_student(*row) for row in rows]
 
-    def get_student_by_id(self, student_id: UUID) -> Optional[Student]:
+    async def get_student_by_id(self, student_id: UUID) -> Optional[Student]:
         """
         Получить студента по его ID.
 
@@ -105,13 +492,12 @@ class PostgresGroupPersistence(BaseGroupPersistence):
         Returns:
             Optional[Student]: Объект студента, если он найден, иначе None.
         """
-        query = select(StudentModel).where(StudentModel.id == student_id)
-        student = self.__session.exec(query).first()
-        if student:
-            return Student(id=student.id, name=student.name, number=student.student_number)
+        row = (await self.__read(_STUDENT_BY_ID, student_id=student_id)).first()
+        if row:
+            return _to_student(*row)
         return None
 
-    def create_student(self, student: Student) -> Student:
+    async def create_student(self, student: Student) -> Student:
         """
         Создать нового студента.
 
@@ -127,31 +513,59 @@ class PostgresGroupPersistence(BaseGroupPersistence):
             student_number=student.number
         )
         self.__session.add(db_student)
-        self.__session.commit()
-        self.__session.refresh(db_student)
+        await self.__session.commit()
+        await self.__session.refresh(db_student)
         return Student(id=db_student.id, name=db_student.name, number=db_student.student_number)
 
-    def delete_student(self, student_id: UUID) -> None:
+    async def create_students_bulk(self, students: List[Student]) -> List[UUID]:
+        """
+        Создать студентов многострочными INSERT ... ON CONFLICT DO NOTHING в одной транзакции.
+
+        Args:
+            students (List[Student]): Студенты для создания.
+
+        Returns:
+            List[UUID]: Идентификаторы созданных студентов; уже существующие студенты пропускаются.
+        """
+        rows = [
+            {"id": student.id, "name": student.name, "student_number": student.number}
+            for student in students
+        ]
+        created_ids = await self.__insert_ignoring_conflicts(StudentModel, rows)
+        await self.__session.commit()
+        return created_ids
+
+    async def delete_student(self, student_id: UUID) -> List[UUID]:
         """
         Удалить студента по его ID.
 
         Args:
             student_id (UUID): Идентификатор студента для удаления.
-        """
-        # Сначала удаляем связи студента с группами
-        query = select(GroupStudentModel).where(GroupStudentModel.student_id == student_id)
-        relations = self.__session.exec(query).all()
-        for relation in relations:
-            self.__session.delete(relation)
 
-        # Затем удаляем самого студента
-        query = select(StudentModel).where(StudentModel.id == student_id)
-        student = self.__session.exec(query).first()
-        if student:
-            self.__session.delete(student)
-            self.__session.commit()
+        Returns:
+            List[UUID]: Идентификаторы групп, из которых студент был исключён.
 
-    def get_group_students(self, group_id: UUID) -> List[Student]:
+        Raises:
+            StudentNotFoundException: Если студент не существует.
+        """
+        # Связи и сам студент удаляются одним запросом; RETURNING сообщает, существовал ли студент и в каких группах он был
+        relations = (
+            delete(GroupStudentModel)
+            .where(GroupStudentModel.student_id == student_id)
+            .returning(GroupStudentModel.group_id, GroupStudentModel.student_id)
+            .cte("relations")
+        )
+        deleted = delete(StudentModel).where(StudentModel.id == student_id).returning(StudentModel.id).cte("deleted")
+        query = select(
+            select(deleted.c.id).exists(),
+            select(func.array_agg(relations.c.group_id)).scalar_subquery()
+        ).add_cte(_bump_revisions(relations).cte("bumped"))
+        student_found, group_ids = (await self.__session.exec(query)).one()
+        await self.__check_found(student_id, student_found)
+        await self.__session.commit()
+        return group_ids or []
+
+    async def get_group_students(self, group_id: UUID) -> List[Student]:
         """
         Получить список всех студентов в группе.
 
@@ -161,66 +575,306 @@ class PostgresGroupPersistence(BaseGroupPersistence):
         Returns:
             List[Student]: Список студентов в группе.
         """
-        # Используем JOIN для получения студентов, связанных с группой
-        query = (
-            select(StudentModel)
-            .join(GroupStudentModel)
-            .where(GroupStudentModel.group_id == group_id)
-        )
-        students = self.__session.exec(query).all()
-        return [
-            Student(id=student.id, name=student.name, number=student.student_number)
-            for student in students
-        ]
+        rows = (await self.__read(_GROUP_STUDENTS, group_id=group_id)).all()
+        return [_to_student(*row) for row in rows]
 
-    def assign_student_to_group(self, student_id: UUID, group_id: UUID) -> None:
+    async def assign_student_to_group(self, student_id: UUID, group_id: UUID) -> None:
         """
-        Назначить студента в группу.
+        Назначить студента в группу одним запросом с проверкой существования.
 
         Args:
             student_id (UUID): Идентификатор студента.
             group_id (UUID): Идентификатор группы.
-        """
-        # Проверяем, существует ли уже связь
-        query = select(GroupStudentModel).where(
-            (GroupStudentModel.student_id == student_id) &
-            (GroupStudentModel.group_id == group_id)
-        )
-        existing = self.__session.exec(query).first()
-
-        if not existing:
-            # Создаем новую связь
-            relation = GroupStudentModel(student_id=student_id, group_id=group_id)
-            self.__session.add(relation)
-            self.__session.commit()
 
-    def remove_student_from_group(self, student_id: UUID, group_id: UUID) -> None:
+        Raises:
+            StudentNotFoundException: Если студент не существует.
+            GroupNotFoundException: Если группа не существует.
+            StudentAlreadyInGroupException: Если студент уже состоит в группе.
+        """
+        # INSERT ... SELECT ... WHERE EXISTS выполняется в CTE, а проверки читаются из того же запроса
+        inserted = _insert_relation(student_id, group_id).cte("inserted")
+        query = select(
+            _exists(StudentModel, student_id),
+            _exists(GroupModel, group_id),
+            select(inserted.c.group_id).exists()
+        ).add_cte(_bump_revisions(inserted).cte("bumped"))
+        student_found, group_found, assigned = (await self.__session.exec(query)).one()
+        await self.__check_found(student_id, student_found, [(group_id, group_found)])
+        if not assigned:
+            raise StudentAlreadyInGroupException(student_id, group_id)
+        await self.__session.commit()
+
+    async def remove_student_from_group(self, student_id: UUID, group_id: UUID) -> None:
         """
-        Удалить студента из группы.
+        Удалить студента из группы одним запросом с проверкой существования.
 
         Args:
             student_id (UUID): Идентификатор студента.
             group_id (UUID): Идентификатор группы.
-        """
-        query = select(GroupStudentModel).where(
-            (GroupStudentModel.student_id == student_id) &
-            (GroupStudentModel.group_id == group_id)
-        )
-        relation = self.__session.exec(query).first()
-        if relation:
-            self.__session.delete(relation)
-            self.__session.commit()
 
-    def transfer_student_between_groups(self, student_id: UUID, from_group_id: UUID, to_group_id: UUID) -> None:
+        Raises:
+            StudentNotFoundException: Если студент не существует.
+            GroupNotFoundException: Если группа не существует.
         """
-        Перевести студента из одной группы в другую.
+        deleted = _delete_relation(student_id, group_id).cte("deleted")
+        query = select(
+            _exists(StudentModel, student_id),
+            _exists(GroupModel, group_id),
+            select(deleted.c.group_id).exists()
+        ).add_cte(_bump_revisions(deleted).cte("bumped"))
+        student_found, group_found, _ = (await self.__session.exec(query)).one()
+        await self.__check_found(student_id, student_found, [(group_id, group_found)])
+        await self.__session.commit()
+
+    async def transfer_student_between_groups(self, student_id: UUID, from_group_id: UUID, to_group_id: UUID) -> None:
+        """
+        Перевести студента из одной группы в другую одним запросом в одной транзакции.
+
+        Связь с исходной группой удаляется, и только удалённая строка порождает связь с целевой группой
+        (`INSERT ... SELECT FROM deleted ON CONFLICT DO NOTHING`). Поэтому студент не может остаться
+        без групп или сразу в обеих, а из двух одновременных переводов срабатывает ровно один.
 
         Args:
             student_id (UUID): Идентификатор студента.
             from_group_id (UUID): Идентификатор исходной группы.
             to_group_id (UUID): Идентификатор целевой группы.
+
+        Raises:
+            StudentNotFoundException: Если студент не существует.
+            GroupNotFoundException: Если исходная или целевая группа не существует.
+            StudentNotInGroupException: Если студент не состоит в исходной группе.
+        """
+        ctes = []
+        if from_group_id == to_group_id:
+            # Перевод в ту же группу ничего не меняет, но требует членства, как и любой перевод
+            moved = _exists_relation(student_id, from_group_id)
+        else:
+            # UPDATE связи на месте нарушил бы первичный ключ, если студент уже в целевой группе
+            # (например, после параллельного назначения): удаление с вставкой без конфликта этого не боится
+            deleted = (
+                delete(GroupStudentModel)
+                .where(
+                    (GroupStudentModel.student_id == student_id) &
+                    (GroupStudentModel.group_id == from_group_id) &
+                    _exists(GroupModel, to_group_id)
+                )
+                .returning(GroupStudentModel.group_id, GroupStudentModel.student_id)
+                .cte("deleted")
+            )
+            inserted = (
+                insert(GroupStudentModel)
+                .from_select(["group_id", "student_id"], select(literal(to_group_id, Uuid), deleted.c.student_id))
+                .on_conflict_do_nothing(index_elements=[GroupStudentModel.group_id, GroupStudentModel.student_id])
+                .returning(GroupStudentModel.group_id, GroupStudentModel.student_id)
+                .cte("inserted")
+            )
+            moved = select(deleted.c.student_id).exists()
+            # Одна ревизия на группу: два UPDATE одной строки в одном запросе Postgres не поддерживает
+            changed = select(deleted.c.group_id, deleted.c.student_id).union_all(
+                select(inserted.c.group_id, inserted.c.student_id)
+            ).cte("changed")
+            ctes = [changed, _bump_revisions(changed).cte("bumped")]
+        query = select(
+            _exists(StudentModel, student_id),
+            _exists(GroupModel, from_group_id),
+            _exists(GroupModel, to_group_id),
+            moved,
+        ).add_cte(*ctes)
+        student_found, from_group_found, to_group_found, was_moved = (await self.__session.exec(query)).one()
+        await self.__check_found(student_id, student_found, [(from_group_id, from_group_found), (to_group_id, to_group_found)])
+        if not was_moved:
+            await self.__session.rollback()
+            raise StudentNotInGroupException(student_id, from_group_id)
+        await self.__session.commit()
+
+    async def assign_students_to_groups(self, assignments: List[Tuple[UUID, UUID]]) -> None:
+        """
+        Добавить студентов в группы одной транзакцией.
+
+        Args:
+            assignments (List[Tuple[UUID, UUID]]): Пары (student_id, group_id).
+
+        Raises:
+            StudentNotFoundException: Если хотя бы один студент не существует.
+            GroupNotFoundException: Если хотя бы одна группа не существует.
+        """
+        await self.__ensure_exist(
+            [student_id for student_id, _ in assignments],
+            [group_id for _, group_id in assignments]
+        )
+        await self.__insert_relations(assignments)
+        await self.__session.commit()
+
+    async def remove_students_from_groups(self, removals: List[Tuple[UUID, UUID]]) -> None:
+        """
+        Удалить студентов из групп одной транзакцией.
+
+        Args:
+            removals (List[Tuple[UUID, UUID]]): Пары (student_id, group_id).
+
+        Raises:
+            StudentNotFoundException: Если хотя бы один студент не существует.
+            GroupNotFoundException: Если хотя бы одна группа не существует.
+        """
+        await self.__ensure_exist(
+            [student_id for student_id, _ in removals],
+            [group_id for _, group_id in removals]
+        )
+        await self.__delete_relations(removals)
+        await self.__session.commit()
+
+    async def transfer_students_between_groups(self, transfers: List[Tuple[UUID, UUID, UUID]]) -> None:
+        """
+        Перевести студентов между группами по порядку одной транзакцией.
+
+        Args:
+            transfers (List[Tuple[UUID, UUID, UUID]]): Тройки (student_id, from_group_id, to_group_id).
+
+        Raises:
+            StudentNotFoundException: Если хотя бы один студент не существует.
+            GroupNotFoundException: Если хотя бы одна группа не существует.
+            StudentNotInGroupException: Если к моменту своего перевода студент не состоит в исходной группе.
+        """
+        student_ids = [student_id for student_id, _, _ in transfers]
+        await self.__ensure_exist(
+            student_ids,
+            [group_id for _, from_group_id, to_group_id in transfers for group_id in (from_group_id, to_group_id)]
+        )
+        # Связи переводимых студентов блокируются до конца транзакции: между проверкой составов
+        # и записью их не изменит параллельный перевод или исключение из группы
+        query = (
+            select(GroupStudentModel.student_id, GroupStudentModel.group_id)
+            .where(GroupStudentModel.student_id == any_(_uuid_array(set(student_ids))))
+            .with_for_update()
+        )
+        before = {}
+        for student_id, group_id in (await self.__session.exec(query)).all():
+            before.setdefault(student_id, set()).add(group_id)
+        try:
+            after = apply_transfers(before, transfers)
+        except StudentNotInGroupException:
+            await self.__session.rollback()
+            raise
+        # Записывается только итоговая разница: цепочки переводов одного студента сворачиваются
+        await self.__delete_relations([
+            (student_id, group_id)
+            for student_id, group_ids in after.items()
+            for group_id in before.get(student_id, set()) - group_ids
+        ])
+        await self.__insert_relations([
+            (student_id, group_id)
+            for student_id, group_ids in after.items()
+            for group_id in group_ids - before.get(student_id, set())
+        ])
+        await self.__session.commit()
+
+    async def __read(self, statement, **params) -> CursorResult:
+        """
+        Выполнить запрос чтения на соединении сессии чтения, минуя ORM-выполнение сессии.
+
+        Args:
+            statement: Готовый запрос из констант модуля или `_page_query`.
+            **params: Значения его параметров.
+
+        Returns:
+            CursorResult: Полностью прочитанный результат.
+        """
+        connection = await self.__read_session.connection()
+        return await connection.execute(statement, params)
+
+    async def __check_found(
+            self,
+            student_id: Optional[UUID] = None,
+            student_found: bool = True,
+            groups: List[Tuple[UUID, bool]] = ()
+    ) -> None:
+        """
+        Откатить транзакцию и выбросить исключение, если студент или одна из групп не найдены.
+
+        Raises:
+            StudentNotFoundException: Если студент не найден.
+            GroupNotFoundException: Если группа не найдена.
+        """
+        if not student_found:
+            await self.__session.rollback()
+            raise StudentNotFoundException(student_id)
+        for group_id, group_found in groups:
+            if not group_found:
+                await self.__session.rollback()
+                raise GroupNotFoundException(group_id)
+
+    async def __ensure_exist(self, student_ids: List[UUID], group_ids: List[UUID]) -> None:
+        """
+        Проверить существование студентов и групп — по одному запросу `id = ANY(...)` на таблицу;
+        если кого-то нет, откатить транзакцию.
+
+        Raises:
+            StudentNotFoundException: Если хотя бы один студент не существует.
+            GroupNotFoundException: Если хотя бы одна группа не существует.
+        """
+        for model, ids, exception in (
+                (StudentModel, student_ids, StudentNotFoundException),
+                (GroupModel, group_ids, GroupNotFoundException),
+        ):
+            unique_ids = list(dict.fromkeys(ids))
+            if not unique_ids:
+                continue
+            query = select(model.id).where(model.id == any_(_uuid_array(unique_ids)))
+            found_ids = set((await self.__session.exec(query)).all())
+            for entity_id in unique_ids:
+                if entity_id not in found_ids:
+                    await self.__session.rollback()
+                    raise exception(entity_id)
+
+    async def __insert_relations(self, pairs: List[Tuple[UUID, UUID]]) -> None:
+        """
+        Добавить связи (student_id, group_id) одним INSERT ... ON CONFLICT DO NOTHING и обновить
+        ревизии изменённых групп в том же запросе (без фиксации транзакции).
+        """
+        if not pairs:
+            return
+        values = _pairs_table(pairs)
+        inserted = (
+            insert(GroupStudentModel)
+            .from_select(["group_id", "student_id"], select(values.c.group_id, values.c.student_id))
+            .on_conflict_do_nothing(index_elements=[GroupStudentModel.group_id, GroupStudentModel.student_id])
+            .returning(GroupStudentModel.group_id, GroupStudentModel.student_id)
+            .cte("inserted")
+        )
+        await self.__session.exec(_bump_revisions(inserted))
+
+    async def __delete_relations(self, pairs: List[Tuple[UUID, UUID]]) -> None:
+        """
+        Удалить связи (student_id, group_id) одним DELETE ... USING и обновить
+        ревизии изменённых групп в том же запросе (без фиксации транзакции).
+        """
+        if not pairs:
+            return
+        values = _pairs_table(pairs)
+        deleted = delete(GroupStudentModel).where(
+            (GroupStudentModel.group_id == values.c.group_id) &
+            (GroupStudentModel.student_id == values.c.student_id)
+        ).returning(GroupStudentModel.group_id, GroupStudentModel.student_id).cte("deleted")
+        await self.__session.exec(_bump_revisions(deleted))
+
+    async def __insert_ignoring_conflicts(self, model, rows: List[dict]) -> List[UUID]:
+        """
+        Вставить строки пакетами, пропуская конфликты по первичному ключу (без фиксации транзакции).
+
+        Args:
+            model: Модель таблицы, в которую выполняется вставка.
+            rows (List[dict]): Значения столбцов для каждой строки.
+
+        Returns:
+            List[UUID]: Идентификаторы фактически вставленных строк.
         """
-        # Удаляем студента из исходной группы
-        self.remove_student_from_group(student_id, from_group_id)
-        # Добавляем студента в целевую группу
-        self.assign_student_to_group(student_id, to_group_id)
\ No newline at end of file
+        created_ids = []
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            query = (
+                insert(model)
+                .values(rows[start:start + INSERT_BATCH_SIZE])
+                .on_conflict_do_nothing(index_elements=[model.id])
+                .returning(model.id)
+            )
+            created_ids.extend((await self.__session.exec(query)).scalars().all())
+        return created_ids
\ No newline at end of file
@@ -0,0 +1,484 @@
+"""
+Снимок данных в памяти в компактном двоичном формате, пригодном для отображения в память.
+
+Формат снимка (порядок байтов платформы):
+
+    заголовок: magic, последняя ревизия, число групп, студентов и связей
+    таблица смещений секций (uint64)
+    секции, выровненные по 8 байт:
+        group_ids / student_ids          — UUID по 16 байт, отсортированы для бинарного поиска
+        group_revisions                  — uint64 на группу
+        group_strings / student_strings  — смещения (uint64) имени и номера в куче строк
+        group_members[_offsets]          — состав групп в формате CSR: индексы студентов (uint32)
+        student_groups[_offsets]         — обратный индекс в том же формате
+        groups_order / students_order    — индексы (uint32), отсортированные по (name, id)
+        heap                             — строки в UTF-8
+"""
+import heapq
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from uuid import UUID
+
+from app.domain.entities import Group, GroupFilter, Student, StudentFilter
+from app.domain.exceptions import ReadOnlyStorageException
+from app.persistance.base import BaseGroupPersistence
+from app.persistance.files import replace_durably
+
+
+SNAPSHOT_MAGIC = b"STUDSNP1"
+_HEADER = struct.Struct("=8sQQQQ")
+_SECTIONS = (
+    "group_ids", "group_revisions", "group_strings", "group_members_offsets", "group_members", "groups_order",
+    "student_ids", "student_strings", "student_groups_offsets", "student_groups", "students_order", "heap",
+)
+_SECTION_TABLE = struct.Struct(f"={len(_SECTIONS)}Q")
+_UUID_SIZE = 16
+_uuid_int = attrgetter("int")
+
+
+def _csr(rows: List[List[int]]) -> Tuple[array, array]:
+    """Упаковать списки индексов в пару (смещения, значения)."""
+    offsets, values = array("Q", [0]), array("I")
+    for row in rows:
+        values.extend(row)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def _strings(records: List[Any], heap: bytearray) -> array:
+    """Дописать имена и номера в кучу строк и вернуть их смещения."""
+    offsets = array("Q", [len(heap)])
+    for record in records:
+        heap += record.name.encode()
+        offsets.append(len(heap))
+        heap += record.number.encode()
+        offsets.append(len(heap))
+    return offsets
+
+
+def _order(
+        ids: List[UUID],
+        records: List[Any],
+        index: Dict[int, int],
+        order: Optional[List[Tuple[str, UUID]]]
+) -> array:
+    """
+    Вернуть индексы записей в порядке (name, id).
+
+    Сравнения при сортировке выполняются в C и держат GIL, поэтому готовый порядок `order` используется
+    как начальная последовательность: сортировка уже упорядоченного списка делает лишь линейное число
+    сравнений. Порядок может расходиться с записями (например, во время пакетной вставки): ключи с другим
+    названием отбрасываются, а недостающие записи добавляются в конец.
+    """
+    positions: Iterable[int] = range(len(ids))
+    if order is not None:
+        hinted: Dict[int, None] = {}  # Словарь сохраняет порядок и убирает повторы
+        for name, key in order:
+            position = index.get(key.int)
+            if position is not None and records[position].name == name:
+                hinted[position] = None
+        positions = list(hinted)
+        positions.extend(position for position in range(len(ids)) if position not in hinted)
+    return array("I", sorted(positions, key=lambda position: (records[position].name, ids[position].int)))
+
+
+def write_snapshot(
+        path: str,
+        groups: Mapping[UUID, Any],
+        students: Mapping[UUID, Any],
+        group_students: Mapping[UUID, Set[UUID]],
+        last_revision: int,
+        groups_order: Optional[List[Tuple[str, UUID]]] = None,
+        students_order: Optional[List[Tuple[str, UUID]]] = None
+) -> None:
+    """
+    Атомарно записать снимок данных в файл.
+
+    Args:
+        path (str): Путь к файлу снимка.
+        groups (Mapping[UUID, Any]): Записи групп с полями `name`, `number` и `revision`.
+        students (Mapping[UUID, Any]): Записи студентов с полями `name` и `number`.
+        group_students (Mapping[UUID, Set[UUID]]): Состав групп.
+        last_revision (int): Последняя выданная ревизия.
+        groups_order (Optional[List[Tuple[str, UUID]]]): Ключи (name, id) групп по возрастанию, если они
+            уже поддерживаются, — ускоряют сортировку (см. `_order`).
+        students_order (Optional[List[Tuple[str, UUID]]]): То же для студентов.
+    """
+    # Сортировка и индексы строятся по целочисленному значению UUID: его сравнение и хэш выполняются в C
+    group_ids, student_ids = sorted(groups, key=_uuid_int), sorted(students, key=_uuid_int)
+    group_index = {group_id.int: index for index, group_id in enumerate(group_ids)}
+    student_index = {student_id.int: index for index, student_id in enumerate(student_ids)}
+    group_records = [groups[group_id] for group_id in group_ids]
+    student_records = [students[student_id] for student_id in student_ids]
+
+    members: List[List[int]] = [[] for _ in group_ids]
+    member_of: List[List[int]] = [[] for _ in student_ids]
+    for group_id, member_ids in group_students.items():
+        index = group_index[group_id.int]
+        for student_id in member_ids:
+            members[index].append(student_index[student_id.int])
+            member_of[student_index[student_id.int]].append(index)
+    group_members_offsets, group_members = _csr(members)
+    student_groups_offsets, student_groups = _csr(member_of)
+
+    heap = bytearray()
+    sections: Dict[str, bytes] = {
+        "group_ids": b"".join(group_id.bytes for group_id in group_ids),
+        "group_revisions": array("Q", (record.revision for record in group_records)).tobytes(),
+        "group_strings": _strings(group_records, heap).tobytes(),
+        "group_members_offsets": group_members_offsets.tobytes(),
+        "group_members": group_members.tobytes(),
+        "groups_order": _order(group_ids, group_records, group_index, groups_order).tobytes(),
+        "student_ids": b"".join(student_id.bytes for student_id in student_ids),
+        "student_strings": _strings(student_records, heap).tobytes(),
+        "student_groups_offsets": student_groups_offsets.tobytes(),
+        "student_groups": student_groups.tobytes(),
+        "students_order": _order(student_ids, student_records, student_index, students_order).tobytes(),
+        "heap": bytes(heap),
+    }
+
+    offsets, position = [], _HEADER.size + _SECTION_TABLE.size
+    for name in _SECTIONS:
+        position += -position % 8
+        offsets.append(position)
+        position += len(sections[name])
+
+    # Запись во временный файл и замена гарантируют, что читатели не увидят недописанный снимок
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(_HEADER.pack(SNAPSHOT_MAGIC, last_revision, len(group_ids), len(student_ids), len(group_members)))
+        file.write(_SECTION_TABLE.pack(*offsets))
+        for name, offset in zip(_SECTIONS, offsets):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(sections[name])
+        file.flush()
+        os.fsync(file.fileno())
+    # Журнал очищается сразу после записи снимка, поэтому замена должна пережить сбой
+    replace_durably(temporary_path, path)
+
+
+class _IdColumn:
+    """Последовательность UUID-байтов поверх отображённой памяти для бинарного поиска."""
+
+    def __init__(self, view: memoryview):
+        self.__view = view
+
+    def __len__(self) -> int:
+        return len(self.__view) // _UUID_SIZE
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.__view[index * _UUID_SIZE:(index + 1) * _UUID_SIZE].tobytes()
+
+    def tobytes(self) -> bytes:
+        return self.__view.tobytes()
+
+
+class MappedSnapshot:
+    """
+    Снимок, отображённый в память только для чтения.
+
+    Страницы файла разделяются через страничный кэш ОС, поэтому несколько процессов,
+    открывших один снимок, не дублируют данные.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Путь к файлу снимка, записанному `write_snapshot`.
+        """
+        with open(path, "rb") as file:
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.__mmap)
+        magic, self.last_revision, groups_count, students_count, links_count = _HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        offsets = dict(zip(_SECTIONS, _SECTION_TABLE.unpack_from(view, _HEADER.size)))
+
+        def section(name: str, item_format: str, count: int) -> memoryview:
+            start = offsets[name]
+            return view[start:start + count * struct.calcsize(item_format)].cast(item_format)
+
+        self.group_ids = _IdColumn(section("group_ids", "B", groups_count * _UUID_SIZE))
+        self.group_revisions = section("group_revisions", "Q", groups_count)
+        self.__group_strings = section("group_strings", "Q", 2 * groups_count + 1)
+        self.__group_members_offsets = section("group_members_offsets", "Q", groups_count + 1)
+        self.__group_members = section("group_members", "I", links_count)
+        self.groups_order = section("groups_order", "I", groups_count)
+        self.student_ids = _IdColumn(section("student_ids", "B", students_count * _UUID_SIZE))
+        self.__student_strings = section("student_strings", "Q", 2 * students_count + 1)
+        self.__student_groups_offsets = section("student_groups_offsets", "Q", students_count + 1)
+        self.__student_groups = section("student_groups", "I", links_count)
+        self.students_order = section("students_order", "I", students_count)
+        self.__heap = view[offsets["heap"]:]
+
+    def find_group(self, group_id: UUID) -> Optional[int]:
+        """Найти индекс группы бинарным поиском; None, если группы нет."""
+        return self.__find(self.group_ids, group_id)
+
+    def find_student(self, student_id: UUID) -> Optional[int]:
+        """Найти индекс студента бинарным поиском; None, если студента нет."""
+        return self.__find(self.student_ids, student_id)
+
+    def group_id(self, index: int) -> UUID:
+        return UUID(bytes=self.group_ids[index])
+
+    def student_id(self, index: int) -> UUID:
+        return UUID(bytes=self.student_ids[index])
+
+    def group_strings(self, index: int) -> Tuple[str, str]:
+        """Получить имя и номер группы."""
+        return self.__pair(self.__group_strings, index)
+
+    def student_strings(self, index: int) -> Tuple[str, str]:
+        """Получить имя и номер студента."""
+        return self.__pair(self.__student_strings, index)
+
+    def all_group_ids(self) -> List[UUID]:
+        """Получить ID всех групп по порядку индексов."""
+        return self.__all_ids(self.group_ids)
+
+    def all_student_ids(self) -> List[UUID]:
+        """Получить ID всех студентов по порядку индексов."""
+        return self.__all_ids(self.student_ids)
+
+    def all_group_strings(self) -> List[Tuple[str, str]]:
+        """Получить имена и номера всех групп по порядку индексов."""
+        return self.__all_pairs(self.__group_strings)
+
+    def all_student_strings(self) -> List[Tuple[str, str]]:
+        """Получить имена и номера всех студентов по порядку индексов."""
+        return self.__all_pairs(self.__student_strings)
+
+    def all_group_members(self) -> List[List[int]]:
+        """Получить индексы студентов каждой группы."""
+        return self.__all_rows(self.__group_members_offsets, self.__group_members)
+
+    def all_student_groups(self) -> List[List[int]]:
+        """Получить индексы групп каждого студента."""
+        return self.__all_rows(self.__student_groups_offsets, self.__student_groups)
+
+    def group_members(self, index: int) -> memoryview:
+        """Получить индексы студентов группы."""
+        return self.__group_members[self.__group_members_offsets[index]:self.__group_members_offsets[index + 1]]
+
+    def student_groups(self, index: int) -> memoryview:
+        """Получить индексы групп студента."""
+        return self.__student_groups[self.__student_groups_offsets[index]:self.__student_groups_offsets[index + 1]]
+
+    def __pair(self, offsets: memoryview, index: int) -> Tuple[str, str]:
+        start, middle, end = offsets[2 * index], offsets[2 * index + 1], offsets[2 * index + 2]
+        return str(self.__heap[start:middle], "utf-8"), str(self.__heap[middle:end], "utf-8")
+
+    @staticmethod
+    def __all_ids(ids: _IdColumn) -> List[UUID]:
+        # Один проход по байтам колонки быстрее, чем обращение к отображённой памяти на каждый ID
+        raw = ids.tobytes()
+        return [UUID(bytes=raw[start:start + _UUID_SIZE]) for start in range(0, len(raw), _UUID_SIZE)]
+
+    @staticmethod
+    def __all_rows(offsets: memoryview, values: memoryview) -> List[List[int]]:
+        bounds, items = offsets.tolist(), values.tolist()
+        return [items[bounds[index]:bounds[index + 1]] for index in range(len(bounds) - 1)]
+
+    def __all_pairs(self, offsets: memoryview) -> List[Tuple[str, str]]:
+        heap, bounds = self.__heap[offsets[0]:offsets[-1]].tobytes(), [offset - offsets[0] for offset in offsets]
+        return [
+            (heap[bounds[index]:bounds[index + 1]].decode(), heap[bounds[index + 1]:bounds[index + 2]].decode())
+            for index in range(0, len(bounds) - 1, 2)
+        ]
+
+    @staticmethod
+    def __find(ids: _IdColumn, entity_id: UUID) -> Optional[int]:
+        index = bisect_left(ids, entity_id.bytes)
+        if index < len(ids) and ids[index] == entity_id.bytes:
+            return index
+        return None
+
+
+class SnapshotGroupPersistence(BaseGroupPersistence):
+    """Реализация только для чтения поверх отображённого в память снимка."""
+
+    def __init__(self, snapshot: MappedSnapshot):
+        """
+        Args:
+            snapshot (MappedSnapshot): Открытый снимок; может разделяться всеми запросами процесса.
+        """
+        self.__snapshot = snapshot
+
+    async def get_by_id(self, group_id: UUID) -> Group | None:
+        """Получить группу по ID."""
+        index = self.__snapshot.find_group(group_id)
+        return self.__group(index) if index is not None else None
+
+    async def get_all(self) -> List[Group]:
+        """Получить все группы."""
+        return [self.__group(index) for index in range(len(self.__snapshot.group_ids))]
+
+    async def get_groups_by_ids(self, group_ids: List[UUID]) -> List[Group]:
+        """Получить группы по списку ID."""
+        indexes = (self.__snapshot.find_group(group_id) for group_id in dict.fromkeys(group_ids))
+        return [self.__group(index) for index in indexes if index is not None]
+
+    async def get_group_with_revision(self, group_id: UUID) -> Optional[Tuple[Group, int]]:
+        """Получить группу и её ревизию; None, если группы нет."""
+        index = self.__snapshot.find_group(group_id)
+        return (self.__group(index), self.__snapshot.group_revisions[index]) if index is not None else None
+
+    async def get_groups_revision(self) -> str:
+        """Получить версию списка групп."""
+        return f"{len(self.__snapshot.group_ids)}-{self.__snapshot.last_revision}"
+
+    async def get_groups_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[GroupFilter] = None
+    ) -> List[Group]:
+        """Получить страницу подходящих под `filters` групп, упорядоченных по (name, id), строго после позиции `after`."""
+        order = self.__snapshot.groups_order
+        sort_key = lambda index: (self.__snapshot.group_strings(index)[0], self.__snapshot.group_id(index))
+        if filters is not None:
+            indexes = self.__filter_page(order, sort_key, self.__snapshot.group_strings, limit, after, filters)
+            return [self.__group(index) for index in indexes]
+        start = 0 if after is None else bisect_right(order, after, key=sort_key)
+        return [self.__group(index) for index in order[start:start + limit]]
+
+    async def iter_groups(self) -> AsyncIterator[Group]:
+        """Потоково перебрать все группы."""
+        for index in range(len(self.__snapshot.group_ids)):
+            yield self.__group(index)
+
+    async def create_group(self, group: Group) -> Group:
+        raise ReadOnlyStorageException()
+
+    async def create_groups_bulk(self, groups: List[Group]) -> List[UUID]:
+        raise ReadOnlyStorageException()
+
+    async def delete_group(self, group_id: UUID) -> List[UUID]:
+        raise ReadOnlyStorageException()
+
+    async def get_all_students(self) -> List[Student]:
+        """Получить всех студентов."""
+        return [self.__student(index) for index in range(len(self.__snapshot.student_ids))]
+
+    async def get_students_page(
+            self,
+            limit: int,
+            after: Optional[Tuple[str, UUID]] = None,
+            filters: Optional[StudentFilter] = None
+    ) -> List[Student]:
+        """Получить страницу подходящих под `filters` студентов, упорядоченных по (name, id), строго после позиции `after`."""
+        order = self.__snapshot.students_order
+        sort_key = lambda index: (self.__snapshot.student_strings(index)[0], self.__snapshot.student_id(index))
+        if filters is not None:
+            members = None
+            if filters.group_id is not None:
+                group_index = self.__snapshot.find_group(filters.group_id)
+                members = self.__snapshot.group_members(group_index) if group_index is not None else ()
+            indexes = self.__filter_page(order, sort_key, self.__snapshot.student_strings, limit, after, filters, members)
+            return [self.__student(index) for index in indexes]
+        start = 0 if after is None else bisect_right(order, after, key=sort_key)
+        return [self.__student(index) for index in order[start:start + limit]]
+
+    async def iter_students(self) -> AsyncIterator[Student]:
+        """Потоково перебрать всех студентов."""
+        for index in range(len(self.__snapshot.student_ids)):
+            yield self.__student(index)
+
+    async def get_students_by_ids(self, student_ids: List[UUID]) -> List[Student]:
+        """Получить студентов по списку ID."""
+        indexes = (self.__snapshot.find_student(student_id) for student_id in dict.fromkeys(student_ids))
+        return [self.__student(index) for index in indexes if index is not None]
+
+    async def get_student_by_id(self, student_id: UUID) -> Student | None:
+        """Получить студента по ID."""
+        index = self.__snapshot.find_student(student_id)
+        return self.__student(index) if index is not None else None
+
+    async def create_student(self, student: Student) -> Student:
+        raise ReadOnlyStorageException()
+
+    async def create_students_bulk(self, students: List[Student]) -> List[UUID]:
+        raise ReadOnlyStorageException()
+
+    async def delete_student(self, student_id: UUID) -> List[UUID]:
+        raise ReadOnlyStorageException()
+
+    async def get_group_students(self, group_id: UUID) -> List[Student]:
+        """Получить всех студентов в группе."""
+        index = self.__snapshot.find_group(group_id)
+        if index is None:
+            return []
+        return [self.__student(student_index) for student_index in self.__snapshot.group_members(index)]
+
+    async def assign_student_to_group(self, student_id: UUID, group_id: UUID) -> None:
+        raise ReadOnlyStorageException()
+
+    async def remove_student_from_group(self, student_id: UUID, group_id: UUID) -> None:
+        raise ReadOnlyStorageException()
+
+    async def transfer_student_between_groups(self, student_id: UUID, from_group_id: UUID, to_group_id: UUID) -> None:
+        raise ReadOnlyStorageException()
+
+    async def assign_students_to_groups(self, assignments: List[Tuple[UUID, UUID]]) -> None:
+        raise ReadOnlyStorageException()
+
+    async def remove_students_from_groups(self, removals: List[Tuple[UUID, UUID]]) -> None:
+        raise ReadOnlyStorageException()
+
+    async def transfer_students_between_groups(self, transfers: List[Tuple[UUID, UUID, UUID]]) -> None:
+        raise ReadOnlyStorageException()
+
+    @staticmethod
+    def __filter_page(
+            order: memoryview,
+            sort_key: Callable[[int], Tuple[str, UUID]],
+            strings: Callable[[int], Tuple[str, str]],
+            limit: int,
+            after: Optional[Tuple[str, UUID]],
+            filters: GroupFilter,
+            candidates: Optional[Iterable[int]] = None
+    ) -> List[int]:
+        """
+        Вернуть индексы не более `limit` подходящих записей, следующих после `after` в порядке (name, id).
+
+        Состав группы сортируется целиком; иначе порядок просматривается с префикса названия, найденного
+        бисекцией. Индекса номеров в снимке нет, поэтому отбор только по номеру просматривает весь порядок.
+        """
+        if candidates is not None:
+            keys = []
+            for index in candidates:
+                key = sort_key(index)
+                if (after is None or key > after) and filters.matches(key[0], strings(index)[1]):
+                    keys.append((key, index))
+            return [index for _, index in heapq.nsmallest(limit, keys)]
+
+        start = 0 if after is None else bisect_right(order, after, key=sort_key)
+        if filters.name_prefix is not None:
+            start = max(start, bisect_left(order, (filters.name_prefix,), key=sort_key))
+        found = []
+        for index in order[start:]:
+            name, number = strings(index)
+            if filters.name_prefix is not None and not name.startswith(filters.name_prefix):
+                break
+            if filters.matches(name, number):
+                found.append(index)
+                if len(found) == limit:
+                    break
+        return found
+
+    def __group(self, index: int) -> Group:
+        name, number = self.__snapshot.group_strings(index)
+        return Group(id=self.__snapshot.group_id(index), name=name, number=number)
+
+    def __student(self, index: int) -> Student:
+        name, number = self.__snapshot.student_strings(index)
+        # Индексы групп в снимке возрастают вместе с ID, поэтому сортировка индексов упорядочивает и ID
+        group_indexes = sorted(self.__snapshot.student_groups(index))
+        group_ids = [self.__snapshot.group_id(group_index) for group_index in group_indexes]
+        return Student(id=self.__snapshot.student_id(index), name=name, number=number, group_ids=group_ids)
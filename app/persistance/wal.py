@@ -0,0 +1,204 @@
+"""
+Журнал упреждающей записи (WAL) для хранилища в памяти.
+
+Каждая запись — кадр `длина, crc32, данные`, где данные начинаются с кода операции.
+Запись в файл идёт через буфер, а fsync выполняется фоновым потоком пачками раз в `sync_interval`
+секунд: операция подтверждается сразу, а при сбое теряется не более последнего интервала.
+Оборванный или повреждённый хвост журнала при чтении отбрасывается.
+"""
+import os
+import struct
+import threading
+import zlib
+from enum import IntEnum
+from typing import Iterator, Tuple
+from uuid import UUID
+
+from app.persistance.files import replace_durably
+
+_FRAME = struct.Struct("=II")
+_LENGTH = struct.Struct("=I")
+_REVISION = struct.Struct("=Q")
+_UUID_SIZE = 16
+
+
+class WalOperation(IntEnum):
+    CREATE_GROUP = 1  # (group_id, name, number)
+    CREATE_STUDENT = 2  # (student_id, name, number)
+    DELETE_GROUP = 3  # (group_id,)
+    DELETE_STUDENT = 4  # (student_id,)
+    LINK = 5  # (student_id, group_id)
+    UNLINK = 6  # (student_id, group_id)
+    RESERVE_REVISIONS = 7  # (revision,) — ревизии до этой включительно могли быть выданы
+
+
+def _encode(operation: WalOperation, args: tuple) -> bytes:
+    parts = [bytes((operation,))]
+    for arg in args:
+        if isinstance(arg, UUID):
+            parts.append(arg.bytes)
+        elif isinstance(arg, str):
+            encoded = arg.encode()
+            parts.append(_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+        else:
+            parts.append(_REVISION.pack(arg))
+    return b"".join(parts)
+
+
+def _decode(payload: bytes) -> Tuple[WalOperation, tuple]:
+    operation, position = WalOperation(payload[0]), 1
+
+    def read_uuid() -> UUID:
+        nonlocal position
+        position += _UUID_SIZE
+        return UUID(bytes=payload[position - _UUID_SIZE:position])
+
+    def read_str() -> str:
+        nonlocal position
+        (length,) = _LENGTH.unpack_from(payload, position)
+        position += _LENGTH.size + length
+        return payload[position - length:position].decode()
+
+    if operation in (WalOperation.CREATE_GROUP, WalOperation.CREATE_STUDENT):
+        return operation, (read_uuid(), read_str(), read_str())
+    if operation in (WalOperation.DELETE_GROUP, WalOperation.DELETE_STUDENT):
+        return operation, (read_uuid(),)
+    if operation in (WalOperation.LINK, WalOperation.UNLINK):
+        return operation, (read_uuid(), read_uuid())
+    return operation, _REVISION.unpack_from(payload, position)
+
+
+def read_records(path: str) -> Iterator[Tuple[WalOperation, tuple]]:
+    """
+    Прочитать записи журнала по порядку.
+
+    Чтение останавливается на первой неполной или повреждённой записи, и файл обрезается до неё,
+    чтобы новые записи не оказались после мусора.
+
+    Args:
+        path (str): Путь к журналу; отсутствующий файл считается пустым.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as file:
+        data = file.read()
+    position = 0
+    while position + _FRAME.size <= len(data):
+        length, checksum = _FRAME.unpack_from(data, position)
+        payload = data[position + _FRAME.size:position + _FRAME.size + length]
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            break
+        yield _decode(payload)
+        position += _FRAME.size + length
+    if position != len(data):
+        with open(path, "r+b") as file:
+            file.truncate(position)
+
+
+class WriteAheadLog:
+    """Журнал только для дозаписи с пакетным fsync в фоновом потоке."""
+
+    def __init__(self, path: str, sync_interval: float = 0.05):
+        """
+        Args:
+            path (str): Путь к журналу; существующий файл дописывается.
+            sync_interval (float): Период пакетного fsync в секундах.
+        """
+        self.__path = path
+        self.__file = open(path, "ab")
+        self.__lock = threading.Lock()
+        # fsync выполняются по одному: вернувшийся `sync` означает, что на диске всё дописанное до него
+        self.__sync_lock = threading.Lock()
+        self.__dirty = False
+        # Номера записей: сколько дописано и сколько из них гарантированно на диске
+        self.__appended = 0
+        self.__synced = 0
+        self.__closed = threading.Event()
+        self.__sync_interval = sync_interval
+        self.__syncer = threading.Thread(target=self.__sync_periodically, name="wal-sync", daemon=True)
+        self.__syncer.start()
+
+    def append(self, operation: WalOperation, *args, sync: bool = False) -> int:
+        """
+        Дописать запись в журнал.
+
+        Args:
+            operation (WalOperation): Код операции.
+            *args: UUID, строки и целые числа в порядке, указанном в `WalOperation`.
+            sync (bool): Дождаться fsync этой и всех предыдущих записей.
+
+        Returns:
+            int: Номер записи для проверки через `synced`.
+        """
+        payload = _encode(operation, args)
+        with self.__lock:
+            self.__file.write(_FRAME.pack(len(payload), zlib.crc32(payload)))
+            self.__file.write(payload)
+            self.__dirty = True
+            self.__appended += 1
+            number = self.__appended
+        if sync:
+            self.sync()
+        return number
+
+    def synced(self, number: int) -> bool:
+        """Попала ли запись с этим номером на диск — фоновым fsync или явным `sync`."""
+        return self.__synced >= number
+
+    def sync(self) -> None:
+        """Сбросить буфер и выполнить fsync."""
+        with self.__sync_lock:
+            with self.__lock:
+                if not self.__dirty:
+                    return
+                self.__file.flush()
+                self.__dirty = False
+                number = self.__appended
+            # fsync вне блокировки записи: запись новых операций в буфер не ждёт диска
+            os.fsync(self.__file.fileno())
+            self.__synced = number
+
+    def position(self) -> int:
+        """Позиция конца журнала: все записи, дописанные до вызова, лежат до неё."""
+        with self.__lock:
+            self.__file.flush()
+            return self.__file.tell()
+
+    def truncate(self, position: int) -> None:
+        """
+        Удалить записи до `position` после того, как они попали в снимок.
+
+        Записи после позиции переписываются в новый файл, который заменяет журнал, поэтому при сбое
+        на диске остаётся либо прежний журнал, либо новый целиком. Запись в журнал на это время
+        приостанавливается, но переписывается только то, что дописано после `position`.
+
+        Args:
+            position (int): Позиция из `position`, полученная до снятия данных для снимка.
+        """
+        with self.__sync_lock, self.__lock:
+            self.__file.flush()
+            with open(self.__path, "rb") as source:
+                source.seek(position)
+                tail = source.read()
+            temporary_path = f"{self.__path}.tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(tail)
+                file.flush()
+                os.fsync(file.fileno())
+            replace_durably(temporary_path, self.__path)
+            self.__file.close()
+            self.__file = open(self.__path, "ab")
+            self.__dirty = False
+            self.__synced = self.__appended
+
+    def close(self) -> None:
+        """Остановить фоновый fsync, сбросить оставшиеся записи и закрыть файл."""
+        self.__closed.set()
+        self.__syncer.join()
+        self.sync()
+        self.__file.close()
+
+    def __sync_periodically(self) -> None:
+        while not self.__closed.wait(self.__sync_interval):
+            self.sync()
@@ -0,0 +1,10 @@
+"""
+Нагрузочные замеры хранилищ и API; запускаются как модули: `python -m benchmarks.<имя>`.
+
+- `persistence` — микрозамеры каждого метода `BaseGroupPersistence` в памяти и в Postgres;
+- `scenarios` — сценарии нагрузки на приложение через ASGI (чтение, запись, переводы);
+- `serialization`, `transfer` — точечные замеры сериализации ответов и переводов студентов;
+- `compare` — сравнение двух JSON-отчётов и поиск регрессий.
+
+Данные генерирует `dataset` с фиксированным зерном, отчёты пишет `report`.
+"""
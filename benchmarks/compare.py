@@ -0,0 +1,80 @@
+"""
+Сравнение двух файлов результатов замеров (`benchmarks.persistence`, `benchmarks.scenarios`).
+
+Для каждого результата, который есть в обоих файлах, печатается изменение перцентилей задержки
+и пропускной способности. Ухудшение больше `--threshold` процентов помечается как регрессия,
+и тогда команда завершается с кодом 1 — её можно ставить в CI после замера.
+
+Пример запуска: `python -m benchmarks.compare baseline.json current.json --threshold 10`
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+# Метрика и направление: для задержки рост — ухудшение, для пропускной способности — падение
+METRICS: List[Tuple[str, int]] = [
+    ("latency_ms_p50", 1),
+    ("latency_ms_p95", 1),
+    ("latency_ms_p99", 1),
+    ("ops_per_second", -1),
+]
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """
+    Сравнить результаты двух прогонов.
+
+    Args:
+        baseline (dict): Отчёт базового прогона.
+        current (dict): Отчёт проверяемого прогона.
+        threshold (float): Допустимое ухудшение метрики в процентах.
+
+    Returns:
+        List[str]: Описания регрессий; пустой список, если их нет.
+    """
+    before: Dict[str, dict] = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        previous = before.get(result["name"])
+        if previous is None:
+            continue
+        changes = []
+        for metric, direction in METRICS:
+            if not previous.get(metric) or metric not in result:
+                continue
+            change = (result[metric] - previous[metric]) / previous[metric] * 100
+            changes.append(f"{metric} {previous[metric]} -> {result[metric]} ({change:+.1f}%)")
+            if change * direction > threshold:
+                regressions.append(f"{result['name']}: {metric} {change:+.1f}%")
+        print(f"{result['name']}: " + "; ".join(changes))
+    return regressions
+
+
+def main(arguments: argparse.Namespace) -> int:
+    baseline, current = _load(arguments.baseline), _load(arguments.current)
+    if baseline["benchmark"] != current["benchmark"]:
+        print(f"Разные замеры: {baseline['benchmark']} и {current['benchmark']}", file=sys.stderr)
+        return 2
+    if baseline["parameters"] != current["parameters"]:
+        print("Внимание: параметры прогонов различаются, сравнение может быть некорректным", file=sys.stderr)
+    regressions = compare(baseline, current, arguments.threshold)
+    if regressions:
+        print(f"\nРегрессии (ухудшение больше {arguments.threshold}%):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Допустимое ухудшение в процентах")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+"""
+Генератор синтетических групп, студентов и их связей для замеров.
+
+Популярность групп распределена по Ципфу с показателем `skew`: при 0 студенты распределяются по группам
+равномерно, при 1 и выше первые группы собирают заметную долю всех связей, как крупные потоки.
+Одинаковые параметры и `seed` дают одинаковые ID, названия и связи, поэтому прогоны сравнимы между собой.
+"""
+import argparse
+import random
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Dict, List, Sequence, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Uuid, any_, delete, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.models import GroupModel, GroupStudentModel, StudentModel
+from app.domain.entities import Group, Student
+from app.persistance.base import BaseGroupPersistence
+
+# Слоги имён: названия не совпадают с порядком создания, и страницы по (name, id) перемешивают записи
+SYLLABLES = ("ан", "бо", "ве", "ги", "да", "ев", "жу", "зо", "ил", "ка", "ли", "мо", "ни", "ор", "пе", "ру")
+
+
+@dataclass
+class Dataset:
+    """Сгенерированные данные и индексы, которыми пользуются сценарии замеров."""
+    seed: int
+    groups: List[Group]
+    students: List[Student]
+    memberships: List[Tuple[UUID, UUID]]  # (student_id, group_id)
+    group_weights: List[float]  # Кумулятивные веса популярности групп для `pick_group`
+    student_groups: Dict[UUID, Set[UUID]] = field(default_factory=dict)
+
+    def pick_group(self, rng: random.Random) -> Group:
+        """Выбрать группу с учётом её популярности."""
+        return rng.choices(self.groups, cum_weights=self.group_weights)[0]
+
+
+def new_id(rng: random.Random) -> UUID:
+    """UUID4 из генератора замера: воспроизводится при том же `seed`."""
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def _name(rng: random.Random, kind: str, index: int) -> str:
+    word = "".join(rng.choice(SYLLABLES) for _ in range(3)).capitalize()
+    return f"bench {kind} {word} {index}"
+
+
+def generate(
+        groups: int = 100,
+        students: int = 5000,
+        groups_per_student: int = 2,
+        skew: float = 1.0,
+        seed: int = 0
+) -> Dataset:
+    """
+    Сгенерировать набор данных.
+
+    Args:
+        groups (int): Количество групп.
+        students (int): Количество студентов.
+        groups_per_student (int): Сколько различных групп выбирается каждому студенту.
+        skew (float): Показатель распределения Ципфа для популярности групп.
+        seed (int): Зерно генератора.
+
+    Returns:
+        Dataset: Группы, студенты и связи между ними.
+    """
+    rng = random.Random(seed)
+    group_list = [Group(id=new_id(rng), name=_name(rng, "group", index), number=str(index)) for index in range(groups)]
+    student_list = [
+        Student(id=new_id(rng), name=_name(rng, "student", index), number=str(index)) for index in range(students)
+    ]
+    weights = list(accumulate(1 / (rank + 1) ** skew for rank in range(groups)))
+    dataset = Dataset(seed=seed, groups=group_list, students=student_list, memberships=[], group_weights=weights)
+    per_student = min(groups_per_student, groups)
+    for student in student_list:
+        chosen: Set[UUID] = set()
+        while len(chosen) < per_student:
+            chosen.add(dataset.pick_group(rng).id)
+        dataset.student_groups[student.id] = chosen
+        dataset.memberships.extend((student.id, group_id) for group_id in sorted(chosen))
+    return dataset
+
+
+def argument_parser(description: str) -> argparse.ArgumentParser:
+    """Парсер аргументов с параметрами набора данных и файлом результатов, общими для всех замеров."""
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--groups-per-student", type=int, default=2)
+    parser.add_argument("--skew", type=float, default=1.0, help="Показатель Ципфа для популярности групп")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Файл для результатов в JSON; по умолчанию — stdout")
+    return parser
+
+
+def from_arguments(arguments: argparse.Namespace) -> Dataset:
+    """Сгенерировать набор данных по аргументам из `argument_parser`."""
+    return generate(arguments.groups, arguments.students, arguments.groups_per_student, arguments.skew, arguments.seed)
+
+
+def parameters(arguments: argparse.Namespace) -> dict:
+    """Параметры прогона для отчёта: все аргументы, кроме пути к файлу результатов."""
+    return {name: value for name, value in vars(arguments).items() if name != "output"}
+
+
+async def load(persistence: BaseGroupPersistence, dataset: Dataset) -> None:
+    """Записать набор данных в хранилище пакетными операциями."""
+    await persistence.create_groups_bulk(dataset.groups)
+    await persistence.create_students_bulk(dataset.students)
+    await persistence.assign_students_to_groups(dataset.memberships)
+
+
+async def unload_postgres(session: AsyncSession, group_ids: Sequence[UUID], student_ids: Sequence[UUID]) -> None:
+    """Удалить из Postgres группы и студентов замера вместе со связями тремя запросами."""
+    groups, students = literal(list(group_ids), ARRAY(Uuid)), literal(list(student_ids), ARRAY(Uuid))
+    await session.exec(delete(GroupStudentModel).where(
+        (GroupStudentModel.group_id == any_(groups)) | (GroupStudentModel.student_id == any_(students))
+    ))
+    await session.exec(delete(StudentModel).where(StudentModel.id == any_(students)))
+    await session.exec(delete(GroupModel).where(GroupModel.id == any_(groups)))
+    await session.commit()
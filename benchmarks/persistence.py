@@ -0,0 +1,281 @@
+"""
+Микрозамеры каждого метода `BaseGroupPersistence` на хранилище в памяти и в Postgres.
+
+Каждый метод вызывается `--iterations` раз подряд на наборе данных из `benchmarks.dataset`; для Postgres
+каждый вызов идёт в собственной сессии, как запрос API. Методы записи работают с временными группами
+и студентами: создающие методы пополняют их запас, а удаляющие и меняющие связи — расходуют его,
+поэтому набор данных между прогонами не меняется. Результат — перцентили задержки и число вызовов
+в секунду для каждого метода в JSON.
+
+Пример запуска: `python -m benchmarks.persistence --backend postgres --iterations 200 --output persistence.json`
+"""
+import argparse
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from itertools import count
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, List, Tuple
+from uuid import UUID
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.v1.pagination import DEFAULT_PAGE_LIMIT
+from app.core.db_config import ASYNC_DB_ENGINE
+from app.domain.entities import Group, Student, StudentFilter
+from app.persistance.base import BaseGroupPersistence
+from app.persistance.dictionary import GroupDictionaryPersistence
+from app.persistance.postgres import AsyncPostgresGroupPersistence
+from benchmarks import dataset as datasets
+from benchmarks.report import save, summarize
+
+Factory = Callable[[], AsyncContextManager[BaseGroupPersistence]]
+
+
+@asynccontextmanager
+async def _memory() -> AsyncIterator[BaseGroupPersistence]:
+    yield GroupDictionaryPersistence()
+
+
+@asynccontextmanager
+async def _postgres() -> AsyncIterator[BaseGroupPersistence]:
+    async with AsyncSession(ASYNC_DB_ENGINE) as session:
+        yield AsyncPostgresGroupPersistence(session)
+
+
+BACKENDS = {"memory": _memory, "postgres": _postgres}
+
+
+class _Context:
+    """Набор данных замера и запас временных записей для методов записи."""
+
+    def __init__(self, dataset: datasets.Dataset, batch: int):
+        self.dataset = dataset
+        self.batch = batch
+        # Отдельная последовательность: ID временных записей не должны повторять ID набора данных
+        self.rng = random.Random(f"scratch-{dataset.seed}")
+        self.__serial = count()
+        # Созданные временные записи: свободные для следующих методов и все — для удаления после замера
+        self.free_groups: List[UUID] = []
+        self.free_students: List[UUID] = []
+        self.created_group_ids: List[UUID] = []
+        self.created_student_ids: List[UUID] = []
+        # Связи временных студентов с группами набора данных: по одной и пакетами
+        self.links: List[Tuple[UUID, UUID]] = []
+        self.link_batches: List[List[Tuple[UUID, UUID]]] = []
+
+    def group(self) -> Group:
+        return self.rng.choice(self.dataset.groups)
+
+    def student(self) -> Student:
+        return self.rng.choice(self.dataset.students)
+
+    def new_group(self) -> Group:
+        serial = next(self.__serial)
+        group = Group(id=datasets.new_id(self.rng), name=f"bench scratch {serial}", number=str(serial))
+        self.created_group_ids.append(group.id)
+        return group
+
+    def new_student(self) -> Student:
+        serial = next(self.__serial)
+        student = Student(id=datasets.new_id(self.rng), name=f"bench scratch {serial}", number=str(serial))
+        self.created_student_ids.append(student.id)
+        return student
+
+    def other_group(self, group_id: UUID) -> UUID:
+        """Случайная группа набора данных, отличная от `group_id`."""
+        while True:
+            other = self.group().id
+            if other != group_id:
+                return other
+
+
+Case = Callable[[BaseGroupPersistence, _Context], Awaitable[None]]
+
+
+async def _get_students_page(persistence: BaseGroupPersistence, context: _Context) -> None:
+    after = context.student()
+    await persistence.get_students_page(DEFAULT_PAGE_LIMIT, (after.name, after.id))
+
+
+async def _get_groups_page(persistence: BaseGroupPersistence, context: _Context) -> None:
+    after = context.group()
+    await persistence.get_groups_page(DEFAULT_PAGE_LIMIT, (after.name, after.id))
+
+
+async def _iter_groups(persistence: BaseGroupPersistence, context: _Context) -> None:
+    async for _ in persistence.iter_groups():
+        pass
+
+
+async def _iter_students(persistence: BaseGroupPersistence, context: _Context) -> None:
+    async for _ in persistence.iter_students():
+        pass
+
+
+async def _create_group(persistence: BaseGroupPersistence, context: _Context) -> None:
+    group = context.new_group()
+    await persistence.create_group(group)
+    context.free_groups.append(group.id)
+
+
+async def _create_groups_bulk(persistence: BaseGroupPersistence, context: _Context) -> None:
+    groups = [context.new_group() for _ in range(context.batch)]
+    await persistence.create_groups_bulk(groups)
+    context.free_groups.extend(group.id for group in groups)
+
+
+async def _delete_group(persistence: BaseGroupPersistence, context: _Context) -> None:
+    await persistence.delete_group(context.free_groups.pop())
+
+
+async def _create_student(persistence: BaseGroupPersistence, context: _Context) -> None:
+    student = context.new_student()
+    await persistence.create_student(student)
+    context.free_students.append(student.id)
+
+
+async def _create_students_bulk(persistence: BaseGroupPersistence, context: _Context) -> None:
+    students = [context.new_student() for _ in range(context.batch)]
+    await persistence.create_students_bulk(students)
+    context.free_students.extend(student.id for student in students)
+
+
+async def _delete_student(persistence: BaseGroupPersistence, context: _Context) -> None:
+    await persistence.delete_student(context.free_students.pop())
+
+
+async def _assign_student_to_group(persistence: BaseGroupPersistence, context: _Context) -> None:
+    link = (context.free_students.pop(), context.group().id)
+    await persistence.assign_student_to_group(*link)
+    context.links.append(link)
+
+
+async def _transfer_student_between_groups(persistence: BaseGroupPersistence, context: _Context) -> None:
+    # Связь переводится и остаётся в списке: следующий перевод той же связи уйдёт в другую группу
+    index = context.rng.randrange(len(context.links))
+    student_id, from_group_id = context.links[index]
+    to_group_id = context.other_group(from_group_id)
+    await persistence.transfer_student_between_groups(student_id, from_group_id, to_group_id)
+    context.links[index] = (student_id, to_group_id)
+
+
+async def _remove_student_from_group(persistence: BaseGroupPersistence, context: _Context) -> None:
+    student_id, group_id = context.links.pop()
+    await persistence.remove_student_from_group(student_id, group_id)
+    context.free_students.append(student_id)
+
+
+async def _assign_students_to_groups(persistence: BaseGroupPersistence, context: _Context) -> None:
+    links = [(context.free_students.pop(), context.group().id) for _ in range(context.batch)]
+    await persistence.assign_students_to_groups(links)
+    context.link_batches.append(links)
+
+
+async def _transfer_students_between_groups(persistence: BaseGroupPersistence, context: _Context) -> None:
+    links = context.rng.choice(context.link_batches)
+    transfers = [(student_id, group_id, context.other_group(group_id)) for student_id, group_id in links]
+    await persistence.transfer_students_between_groups(transfers)
+    links[:] = [(student_id, to_group_id) for student_id, _, to_group_id in transfers]
+
+
+async def _remove_students_from_groups(persistence: BaseGroupPersistence, context: _Context) -> None:
+    links = context.link_batches.pop()
+    await persistence.remove_students_from_groups(links)
+    context.free_students.extend(student_id for student_id, _ in links)
+
+
+READ_CASES: List[Tuple[str, Case]] = [
+    ("get_by_id", lambda persistence, context: persistence.get_by_id(context.group().id)),
+    ("get_groups_by_ids", lambda persistence, context: persistence.get_groups_by_ids(
+        [context.group().id for _ in range(context.batch)]
+    )),
+    ("get_all", lambda persistence, context: persistence.get_all()),
+    ("get_group_with_revision", lambda persistence, context: persistence.get_group_with_revision(context.group().id)),
+    ("get_groups_revision", lambda persistence, context: persistence.get_groups_revision()),
+    ("get_groups_page", _get_groups_page),
+    ("iter_groups", _iter_groups),
+    ("get_student_by_id", lambda persistence, context: persistence.get_student_by_id(context.student().id)),
+    ("get_students_by_ids", lambda persistence, context: persistence.get_students_by_ids(
+        [context.student().id for _ in range(context.batch)]
+    )),
+    ("get_all_students", lambda persistence, context: persistence.get_all_students()),
+    ("get_students_page", _get_students_page),
+    ("get_students_page[group_id]", lambda persistence, context: persistence.get_students_page(
+        DEFAULT_PAGE_LIMIT, None, StudentFilter(group_id=context.dataset.pick_group(context.rng).id)
+    )),
+    ("iter_students", _iter_students),
+    ("get_group_students", lambda persistence, context: persistence.get_group_students(
+        context.dataset.pick_group(context.rng).id
+    )),
+]
+
+# Порядок важен: каждый метод расходует временные записи, созданные предыдущими
+WRITE_CASES: List[Tuple[str, Case]] = [
+    ("create_group", _create_group),
+    ("create_groups_bulk", _create_groups_bulk),
+    ("delete_group", _delete_group),
+    ("create_student", _create_student),
+    ("create_students_bulk", _create_students_bulk),
+    ("assign_student_to_group", _assign_student_to_group),
+    ("transfer_student_between_groups", _transfer_student_between_groups),
+    ("remove_student_from_group", _remove_student_from_group),
+    ("assign_students_to_groups", _assign_students_to_groups),
+    ("transfer_students_between_groups", _transfer_students_between_groups),
+    ("remove_students_from_groups", _remove_students_from_groups),
+    ("delete_student", _delete_student),
+]
+
+
+def _check_coverage() -> None:
+    """Новый метод интерфейса без замера — ошибка, а не молчаливый пропуск."""
+    measured = {name.split("[")[0] for name, _ in READ_CASES + WRITE_CASES}
+    missing = BaseGroupPersistence.__abstractmethods__ - measured
+    if missing:
+        raise SystemExit(f"Нет замеров для методов: {', '.join(sorted(missing))}")
+
+
+async def _measure(factory: Factory, name: str, case: Case, context: _Context, iterations: int) -> dict:
+    latencies = []
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        call_started_at = time.perf_counter()
+        async with factory() as persistence:
+            await case(persistence, context)
+        latencies.append(time.perf_counter() - call_started_at)
+    return {"name": name, **summarize(latencies, time.perf_counter() - started_at)}
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    _check_coverage()
+    factory = BACKENDS[arguments.backend]
+    dataset = datasets.from_arguments(arguments)
+    context = _Context(dataset, arguments.batch)
+    async with factory() as persistence:
+        await datasets.load(persistence, dataset)
+    try:
+        results = []
+        for name, case in READ_CASES:
+            # Прогрев: первые вызовы платят за подготовку запросов и заполнение пула соединений
+            await _measure(factory, name, case, context, min(arguments.iterations, 5))
+            results.append(await _measure(factory, name, case, context, arguments.iterations))
+        for name, case in WRITE_CASES:
+            results.append(await _measure(factory, name, case, context, arguments.iterations))
+    finally:
+        if arguments.backend == "postgres":
+            async with AsyncSession(ASYNC_DB_ENGINE) as session:
+                await datasets.unload_postgres(
+                    session,
+                    [group.id for group in dataset.groups] + context.created_group_ids,
+                    [student.id for student in dataset.students] + context.created_student_ids
+                )
+            await ASYNC_DB_ENGINE.dispose()
+    save("persistence", datasets.parameters(arguments), results, arguments.output)
+
+
+if __name__ == "__main__":
+    parser = datasets.argument_parser(__doc__)
+    parser.add_argument("--backend", choices=tuple(BACKENDS), default="memory")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=100, help="Размер пакета для пакетных методов")
+    asyncio.run(main(parser.parse_args()))
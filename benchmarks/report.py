@@ -0,0 +1,73 @@
+"""Сводка задержек и сохранение результатов замеров в JSON для сравнения прогонов (`benchmarks.compare`)."""
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import List, Optional
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Перцентиль по ближайшему рангу из отсортированных значений."""
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize(latencies: List[float], elapsed: float) -> dict:
+    """
+    Свести задержки операций.
+
+    Args:
+        latencies (List[float]): Задержки в секундах.
+        elapsed (float): Общее время прогона в секундах.
+
+    Returns:
+        dict: Количество операций, пропускная способность и перцентили задержки в миллисекундах.
+    """
+    if not latencies:
+        return {"operations": 0, "ops_per_second": 0.0}
+    ordered = sorted(latencies)
+    return {
+        "operations": len(ordered),
+        "ops_per_second": round(len(ordered) / elapsed, 1),
+        "latency_ms_p50": round(percentile(ordered, 0.50) * 1000, 3),
+        "latency_ms_p95": round(percentile(ordered, 0.95) * 1000, 3),
+        "latency_ms_p99": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(benchmark: str, parameters: dict, results: List[dict], output: Optional[str]) -> None:
+    """
+    Записать результаты вместе с параметрами и окружением прогона.
+
+    Args:
+        benchmark (str): Название замера.
+        parameters (dict): Параметры запуска; сравнивать имеет смысл только прогоны с одинаковыми параметрами.
+        results (List[dict]): Результаты; поле `name` однозначно определяет результат внутри замера.
+        output (Optional[str]): Путь к файлу; если не задан, JSON печатается в stdout.
+    """
+    report = {
+        "benchmark": benchmark,
+        "parameters": parameters,
+        "environment": {
+            "commit": _commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output is None:
+        print(text)
+        return
+    with open(output, "w", encoding="utf-8") as file:
+        file.write(text + "\n")
@@ -0,0 +1,268 @@
+"""
+Нагрузочные сценарии против приложения FastAPI из `main.py` через ASGI-транспорт, без сети.
+
+Сценарии:
+- `read-heavy` — списки, карточки, состав групп и пакетное чтение с небольшой долей записей;
+- `write-heavy` — создание и удаление студентов, назначение и исключение из групп;
+- `transfer-storm` — переводы студентов между группами, выбранными по популярности: самые
+  крупные группы получают большую часть переводов, а их составы при этом читаются.
+
+`--concurrency` виртуальных клиентов работают в одном цикле событий с приложением, поэтому задержки
+включают и стоимость клиента. Каждый клиент распоряжается своей долей студентов набора данных и своими
+созданными студентами: клиенты не мешают друг другу, и ответы 4xx означают ошибку, а не гонку.
+Хранилище — `GroupDictionaryPersistence` или Postgres из настроек (с кэшем и пакетированием чтений,
+как в работающем сервисе). Результат — перцентили задержки и пропускная способность по сценарию
+и по каждой операции в JSON.
+
+Пример запуска: `python -m benchmarks.scenarios --backend postgres --concurrency 16 --seconds 10 --output load.json`
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+import httpx
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.v1.pagination import encode_cursor
+from app.core.db_config import ASYNC_DB_ENGINE
+from app.core.dependencies.group import group_persistence_dependency
+from app.persistance.dictionary import GroupDictionaryPersistence
+from app.persistance.postgres import AsyncPostgresGroupPersistence
+from benchmarks import dataset as datasets
+from benchmarks.report import save, summarize
+from main import app
+
+BASE_URL = "/api/v1/group"
+PAGE_SIZE = 50
+BATCH_GET_SIZE = 20
+
+
+class _Client:
+    """Виртуальный клиент: свой генератор, свои студенты и их текущие группы."""
+
+    def __init__(self, http: httpx.AsyncClient, dataset: datasets.Dataset, index: int, concurrency: int):
+        self.http = http
+        self.dataset = dataset
+        self.rng = random.Random(f"client-{dataset.seed}-{index}")
+        self.memberships: Dict[UUID, Set[UUID]] = {
+            student.id: set(dataset.student_groups[student.id])
+            for student in dataset.students[index::concurrency]
+        }
+        self.owned: List[UUID] = list(self.memberships)
+        self.created: List[UUID] = []  # Созданные клиентом студенты, которых ещё не удалили
+        self.created_ids: List[UUID] = []  # Все созданные клиентом студенты — для удаления после замера
+
+    def member_student(self) -> Optional[UUID]:
+        """Случайный свой студент хотя бы в одной группе; None, если за несколько попыток такой не нашёлся."""
+        for _ in range(10):
+            student_id = self.rng.choice(self.owned)
+            if self.memberships[student_id]:
+                return student_id
+        return None
+
+    def other_group(self, student_id: UUID) -> UUID:
+        """Группа по популярности, в которой студента ещё нет."""
+        while True:
+            group_id = self.dataset.pick_group(self.rng).id
+            if group_id not in self.memberships[student_id]:
+                return group_id
+
+
+# Операция выполняет один запрос и возвращает ответ; None — подходящих данных нет, запрос не выполнялся
+Operation = Callable[[_Client], Awaitable[Optional[httpx.Response]]]
+
+
+async def _list_students(client: _Client) -> httpx.Response:
+    after = client.rng.choice(client.dataset.students)
+    return await client.http.get(
+        f"{BASE_URL}/students", params={"limit": PAGE_SIZE, "after": encode_cursor(after.name, after.id)}
+    )
+
+
+async def _search_students(client: _Client) -> httpx.Response:
+    word = "".join(client.rng.choice(datasets.SYLLABLES) for _ in range(2))
+    return await client.http.get(f"{BASE_URL}/students", params={"limit": PAGE_SIZE, "search": word})
+
+
+async def _list_groups(client: _Client) -> httpx.Response:
+    return await client.http.get(f"{BASE_URL}/groups", params={"limit": PAGE_SIZE})
+
+
+async def _get_student(client: _Client) -> httpx.Response:
+    return await client.http.get(f"{BASE_URL}/students/{client.rng.choice(client.dataset.students).id}")
+
+
+async def _get_group(client: _Client) -> httpx.Response:
+    return await client.http.get(f"{BASE_URL}/groups/{client.dataset.pick_group(client.rng).id}")
+
+
+async def _group_students(client: _Client) -> httpx.Response:
+    return await client.http.get(f"{BASE_URL}/groups/{client.dataset.pick_group(client.rng).id}/students")
+
+
+async def _batch_get_students(client: _Client) -> httpx.Response:
+    ids = [str(student.id) for student in client.rng.sample(client.dataset.students, BATCH_GET_SIZE)]
+    return await client.http.post(f"{BASE_URL}/students/batch-get", json={"ids": ids})
+
+
+async def _create_student(client: _Client) -> httpx.Response:
+    student_id = datasets.new_id(client.rng)
+    response = await client.http.post(
+        f"{BASE_URL}/students", json={"id": str(student_id), "name": f"bench load {student_id}", "number": "0"}
+    )
+    client.created.append(student_id)
+    client.created_ids.append(student_id)
+    client.owned.append(student_id)
+    client.memberships[student_id] = set()
+    return response
+
+
+async def _delete_student(client: _Client) -> Optional[httpx.Response]:
+    if not client.created:
+        return None
+    student_id = client.created.pop(client.rng.randrange(len(client.created)))
+    client.owned.remove(student_id)
+    del client.memberships[student_id]
+    return await client.http.delete(f"{BASE_URL}/students/{student_id}")
+
+
+async def _assign_student(client: _Client) -> httpx.Response:
+    student_id = client.rng.choice(client.owned)
+    group_id = client.other_group(student_id)
+    client.memberships[student_id].add(group_id)
+    return await client.http.post(
+        f"{BASE_URL}/groups/assign-student", json={"student_id": str(student_id), "group_id": str(group_id)}
+    )
+
+
+async def _remove_student(client: _Client) -> Optional[httpx.Response]:
+    student_id = client.member_student()
+    if student_id is None:
+        return None
+    group_id = client.rng.choice(sorted(client.memberships[student_id]))
+    client.memberships[student_id].discard(group_id)
+    return await client.http.post(
+        f"{BASE_URL}/groups/remove-student", json={"student_id": str(student_id), "group_id": str(group_id)}
+    )
+
+
+async def _transfer_student(client: _Client) -> Optional[httpx.Response]:
+    student_id = client.member_student()
+    if student_id is None:
+        return None
+    from_group_id = client.rng.choice(sorted(client.memberships[student_id]))
+    to_group_id = client.other_group(student_id)
+    client.memberships[student_id].discard(from_group_id)
+    client.memberships[student_id].add(to_group_id)
+    return await client.http.post(f"{BASE_URL}/groups/transfer-student", json={
+        "student_id": str(student_id), "from_group_id": str(from_group_id), "to_group_id": str(to_group_id)
+    })
+
+
+# Сценарий — операции с весами, пропорционально которым клиенты их выбирают
+SCENARIOS: Dict[str, List[Tuple[str, Operation, int]]] = {
+    "read-heavy": [
+        ("list_students", _list_students, 20),
+        ("search_students", _search_students, 5),
+        ("list_groups", _list_groups, 10),
+        ("get_student", _get_student, 25),
+        ("get_group", _get_group, 10),
+        ("group_students", _group_students, 10),
+        ("batch_get_students", _batch_get_students, 10),
+        ("assign_student", _assign_student, 5),
+        ("remove_student", _remove_student, 5),
+    ],
+    "write-heavy": [
+        ("create_student", _create_student, 25),
+        ("assign_student", _assign_student, 25),
+        ("remove_student", _remove_student, 20),
+        ("delete_student", _delete_student, 10),
+        ("get_student", _get_student, 20),
+    ],
+    "transfer-storm": [
+        ("transfer_student", _transfer_student, 90),
+        ("group_students", _group_students, 10),
+    ],
+}
+
+
+async def _work(
+        client: _Client,
+        operations: List[Tuple[str, Operation, int]],
+        deadline: float,
+        latencies: Dict[str, List[float]],
+        errors: Dict[str, int]
+) -> None:
+    names = [name for name, _, _ in operations]
+    calls = {name: operation for name, operation, _ in operations}
+    weights = [weight for _, _, weight in operations]
+    while time.perf_counter() < deadline:
+        name = client.rng.choices(names, weights)[0]
+        started_at = time.perf_counter()
+        response = await calls[name](client)
+        if response is None:
+            continue
+        latencies[name].append(time.perf_counter() - started_at)
+        if response.status_code >= 400:
+            errors[name] += 1
+
+
+async def _run(scenario: str, clients: List[_Client], seconds: float) -> List[dict]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    started_at = time.perf_counter()
+    deadline = started_at + seconds
+    await asyncio.gather(*(_work(client, SCENARIOS[scenario], deadline, latencies, errors) for client in clients))
+    elapsed = time.perf_counter() - started_at
+    everything = [latency for values in latencies.values() for latency in values]
+    results = [{"name": scenario, **summarize(everything, elapsed), "errors": sum(errors.values())}]
+    for name in sorted(latencies):
+        results.append({"name": f"{scenario}/{name}", **summarize(latencies[name], elapsed), "errors": errors[name]})
+    return results
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    dataset = datasets.from_arguments(arguments)
+    if arguments.backend == "memory":
+        persistence = GroupDictionaryPersistence()
+        app.dependency_overrides[group_persistence_dependency] = lambda: persistence
+        await datasets.load(persistence, dataset)
+    else:
+        async with AsyncSession(ASYNC_DB_ENGINE) as session:
+            await datasets.load(AsyncPostgresGroupPersistence(session), dataset)
+
+    scenarios = list(SCENARIOS) if arguments.scenario == "all" else [arguments.scenario]
+    transport = httpx.ASGITransport(app=app)
+    clients: List[_Client] = []
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            clients = [_Client(http, dataset, index, arguments.concurrency) for index in range(arguments.concurrency)]
+            results = []
+            for scenario in scenarios:
+                # Прогрев: пул соединений, подготовленные запросы и кэш
+                await _run(scenario, clients, min(arguments.seconds, 1.0))
+                results.extend(await _run(scenario, clients, arguments.seconds))
+    finally:
+        if arguments.backend != "memory":
+            async with AsyncSession(ASYNC_DB_ENGINE) as session:
+                await datasets.unload_postgres(
+                    session,
+                    [group.id for group in dataset.groups],
+                    [student.id for student in dataset.students] +
+                    [student_id for client in clients for student_id in client.created_ids]
+                )
+            await ASYNC_DB_ENGINE.dispose()
+    save("scenarios", datasets.parameters(arguments), results, arguments.output)
+
+
+if __name__ == "__main__":
+    parser = datasets.argument_parser(__doc__)
+    parser.add_argument("--backend", choices=("memory", "postgres"), default="memory")
+    parser.add_argument("--scenario", choices=("all", *SCENARIOS), default="all")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
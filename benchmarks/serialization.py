@@ -0,0 +1,97 @@
+"""
+Замер затрат процессора на строку ответа в эндпоинтах списков и карточек.
+
+Запросы выполняются через ASGI-транспорт без сети. Хранилище — `GroupDictionaryPersistence`
+(чистая стоимость API-слоя) или Postgres из настроек (вместе с разбором строк результата).
+Результат печатается в JSON: процессорное время на строку и на запрос для каждого эндпоинта.
+
+Пример запуска: `python -m benchmarks.serialization --backend memory --rows 1000 --requests 200`
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+from uuid import uuid4
+
+import httpx
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db_config import ASYNC_DB_ENGINE
+from app.core.dependencies.group import group_persistence_dependency
+from app.domain.entities import Group, Student
+from app.persistance.base import BaseGroupPersistence
+from app.persistance.dictionary import GroupDictionaryPersistence
+from app.persistance.postgres import AsyncPostgresGroupPersistence
+from main import app
+
+
+async def _populate(persistence: BaseGroupPersistence, rows: int) -> tuple:
+    groups = [Group(id=uuid4(), name=f"bench-serialization-{index}", number=str(index)) for index in range(rows)]
+    students = [Student(id=uuid4(), name=f"bench-serialization-{index}", number=str(index)) for index in range(rows)]
+    await persistence.create_groups_bulk(groups)
+    await persistence.create_students_bulk(students)
+    # Все студенты в первой группе, каждый второй — ещё и во второй: в ответах есть списки групп
+    await persistence.assign_students_to_groups(
+        [(student.id, groups[0].id) for student in students] +
+        [(student.id, groups[1].id) for student in students[::2]]
+    )
+    return groups, students
+
+
+async def _cleanup(persistence: BaseGroupPersistence, groups: List[Group], students: List[Student]) -> None:
+    for student in students:
+        await persistence.delete_student(student.id)
+    for group in groups:
+        await persistence.delete_group(group.id)
+
+
+async def _measure(client: httpx.AsyncClient, url: str, params: dict, rows: int, requests: int) -> dict:
+    for _ in range(min(requests, 10)):
+        (await client.get(url, params=params)).raise_for_status()
+    cpu_started_at, wall_started_at = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        await client.get(url, params=params)
+    cpu, wall = time.process_time() - cpu_started_at, time.perf_counter() - wall_started_at
+    return {
+        "endpoint": url.replace("/api/v1/group", ""),
+        "rows": rows,
+        "cpu_us_per_request": round(cpu / requests * 1e6, 1),
+        "cpu_us_per_row": round(cpu / requests / rows * 1e6, 2),
+        "wall_ms_per_request": round(wall / requests * 1000, 3),
+    }
+
+
+async def main(backend: str, rows: int, requests: int) -> None:
+    if backend == "memory":
+        persistence = GroupDictionaryPersistence()
+        app.dependency_overrides[group_persistence_dependency] = lambda: persistence
+        groups, students = await _populate(persistence, rows)
+    else:
+        async with AsyncSession(ASYNC_DB_ENGINE) as session:
+            groups, students = await _populate(AsyncPostgresGroupPersistence(session), rows)
+
+    base = "/api/v1/group"
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            results = [
+                await _measure(client, f"{base}/students", {"limit": rows}, rows, requests),
+                await _measure(client, f"{base}/groups", {"limit": rows}, rows, requests),
+                await _measure(client, f"{base}/groups/{groups[0].id}/students", {}, rows, requests),
+                await _measure(client, f"{base}/students/{students[0].id}", {}, 1, requests * 10),
+            ]
+    finally:
+        if backend != "memory":
+            async with AsyncSession(ASYNC_DB_ENGINE) as session:
+                await _cleanup(AsyncPostgresGroupPersistence(session), groups, students)
+            await ASYNC_DB_ENGINE.dispose()
+    print(json.dumps({"backend": backend, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("memory", "postgres"), default="memory")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.backend, arguments.rows, arguments.requests))
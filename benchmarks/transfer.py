@@ -0,0 +1,131 @@
+"""
+Замер перевода студентов между группами в Postgres.
+
+Сравниваются два способа:
+- `two-step` — исключение из группы и назначение в новую двумя отдельными операциями (две транзакции);
+- `transfer` — `transfer_student_between_groups`, один запрос в одной транзакции.
+
+Каждый поток переводит своих студентов между своими двумя группами туда и обратно, поэтому потоки
+не конкурируют за одни и те же строки связей, но делят ревизии групп. Результат печатается в JSON.
+
+Пример запуска: `python -m benchmarks.transfer --students 200 --concurrency 8 --seconds 10`
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+from uuid import UUID, uuid4
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db_config import ASYNC_DB_ENGINE
+from app.domain.entities import Group, Student
+from app.persistance.postgres import AsyncPostgresGroupPersistence
+
+Operation = Callable[[AsyncPostgresGroupPersistence, UUID, UUID, UUID], Awaitable[None]]
+
+
+async def _two_step(persistence: AsyncPostgresGroupPersistence, student_id: UUID, from_id: UUID, to_id: UUID) -> None:
+    await persistence.remove_student_from_group(student_id, from_id)
+    await persistence.assign_student_to_group(student_id, to_id)
+
+
+async def _transfer(persistence: AsyncPostgresGroupPersistence, student_id: UUID, from_id: UUID, to_id: UUID) -> None:
+    await persistence.transfer_student_between_groups(student_id, from_id, to_id)
+
+
+SCENARIOS: Dict[str, Operation] = {"two-step": _two_step, "transfer": _transfer}
+
+
+class _Worker:
+    """Пара групп потока и текущая группа каждого его студента."""
+
+    def __init__(self, group_ids: Tuple[UUID, UUID], student_ids: List[UUID]):
+        self.group_ids = group_ids
+        self.location = {student_id: group_ids[0] for student_id in student_ids}
+
+    def other(self, group_id: UUID) -> UUID:
+        return self.group_ids[1] if group_id == self.group_ids[0] else self.group_ids[0]
+
+
+async def _setup(students: int, concurrency: int) -> List[_Worker]:
+    """Создать по паре групп на поток и студентов потока в первой группе пары."""
+    workers = []
+    async with AsyncSession(ASYNC_DB_ENGINE) as session:
+        persistence = AsyncPostgresGroupPersistence(session)
+        for worker in range(concurrency):
+            groups = [Group(id=uuid4(), name=f"bench-transfer-{worker}-{side}", number=side) for side in "AB"]
+            members = [
+                Student(id=uuid4(), name=f"bench-transfer-{worker}-{index}", number=str(index))
+                for index in range(max(students // concurrency, 1))
+            ]
+            await persistence.create_groups_bulk(groups)
+            await persistence.create_students_bulk(members)
+            await persistence.assign_students_to_groups([(student.id, groups[0].id) for student in members])
+            workers.append(_Worker((groups[0].id, groups[1].id), [student.id for student in members]))
+    return workers
+
+
+async def _teardown(workers: List[_Worker]) -> None:
+    async with AsyncSession(ASYNC_DB_ENGINE) as session:
+        persistence = AsyncPostgresGroupPersistence(session)
+        for worker in workers:
+            for student_id in worker.location:
+                await persistence.delete_student(student_id)
+            for group_id in worker.group_ids:
+                await persistence.delete_group(group_id)
+
+
+async def _work(operation: Operation, worker: _Worker, deadline: float, latencies: List[float]) -> None:
+    while True:
+        for student_id, from_id in list(worker.location.items()):
+            if time.perf_counter() >= deadline:
+                return
+            to_id = worker.other(from_id)
+            started_at = time.perf_counter()
+            # Как и в API, каждая операция выполняется в сессии отдельного запроса
+            async with AsyncSession(ASYNC_DB_ENGINE) as session:
+                await operation(AsyncPostgresGroupPersistence(session), student_id, from_id, to_id)
+            latencies.append(time.perf_counter() - started_at)
+            worker.location[student_id] = to_id
+
+
+async def _run(scenario: str, workers: List[_Worker], seconds: float) -> dict:
+    latencies: List[float] = []
+    deadline = time.perf_counter() + seconds
+    started_at = time.perf_counter()
+    await asyncio.gather(*(_work(SCENARIOS[scenario], worker, deadline, latencies) for worker in workers))
+    elapsed = time.perf_counter() - started_at
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "transfers": len(latencies),
+        "transfers_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms_p50": round(statistics.median(latencies) * 1000, 3),
+        "latency_ms_p99": round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+    }
+
+
+async def main(students: int, concurrency: int, seconds: float) -> None:
+    workers = await _setup(students, concurrency)
+    try:
+        results = []
+        for scenario in SCENARIOS:
+            # Прогрев пула соединений и кэша подготовленных запросов
+            await _run(scenario, workers, min(seconds, 1.0))
+            results.append(await _run(scenario, workers, seconds))
+    finally:
+        await _teardown(workers)
+        await ASYNC_DB_ENGINE.dispose()
+    print(json.dumps({"students": students, "concurrency": concurrency, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.students, arguments.concurrency, arguments.seconds))
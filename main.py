@@ -1,11 +1,30 @@
 import uvicorn
 from fastapi import FastAPI
-from app.api.v1 import group
+from app.api.exception_handlers import register_exception_handlers
+from app.api import metrics
+from app.api.v1 import diagnostics, group
+from app.core.config import SETTINGS
+from app.core.instrumentation import InstrumentationMiddleware
+from app.core.lifespan import lifespan
+from app.core.profiling import ProfilingMiddleware
 app = FastAPI(
-    docs_url="/api/docs"
+    docs_url="/api/docs",
+    lifespan=lifespan
 )
 
+register_exception_handlers(app)
+if SETTINGS.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        header=SETTINGS.PROFILING_HEADER,
+        output_dir=SETTINGS.PROFILING_OUTPUT_DIR,
+        sample_interval_seconds=SETTINGS.PROFILING_SAMPLE_INTERVAL_MS / 1000
+    )
+app.add_middleware(InstrumentationMiddleware, server_timing=SETTINGS.SERVER_TIMING_ENABLED)
+
 app.include_router(group.router, prefix="/api/v1/group")
+app.include_router(diagnostics.router, prefix="/api/v1/diagnostics")
+app.include_router(metrics.router)
 
 if __name__ == '__main__':
     uvicorn.run(
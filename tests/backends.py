@@ -0,0 +1,75 @@
+"""
+Хранилища, на которых выполняются тесты: в памяти и Postgres.
+
+Тесты Postgres пропускаются, если база из настроек (`DB_*`) недоступна или в ней нет схемы приложения.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+
+from app.persistance.base import BaseGroupPersistence
+from app.persistance.dictionary import GroupDictionaryPersistence
+
+
+@asynccontextmanager
+async def memory() -> AsyncIterator[BaseGroupPersistence]:
+    yield GroupDictionaryPersistence()
+
+
+@asynccontextmanager
+async def postgres() -> AsyncIterator[BaseGroupPersistence]:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.core.db_config import ASYNC_DB_ENGINE
+    from app.persistance.postgres import AsyncPostgresGroupPersistence
+
+    async with AsyncSession(ASYNC_DB_ENGINE) as session:
+        yield AsyncPostgresGroupPersistence(session)
+
+
+def postgres_available() -> bool:
+    try:
+        from sqlalchemy import inspect
+
+        from app.core.db_config import DB_ENGINE
+        with DB_ENGINE.connect() as connection:
+            return inspect(connection).has_table("group_students")
+    except Exception:
+        return False
+
+
+requires_postgres = pytest.mark.skipif(not postgres_available(), reason="Postgres со схемой приложения недоступен")
+
+BACKENDS = [
+    pytest.param(memory, id="memory"),
+    pytest.param(postgres, id="postgres", marks=requires_postgres),
+]
+
+
+async def dispose(backend) -> None:
+    """Закрыть соединения Postgres: пул движка привязан к циклу событий, который завершает `asyncio.run`."""
+    if backend is postgres:
+        from app.core.db_config import ASYNC_DB_ENGINE
+        await ASYNC_DB_ENGINE.dispose()
+
+
+@asynccontextmanager
+async def api_client(backend) -> AsyncIterator["httpx.AsyncClient"]:
+    """Клиент HTTP API групп, в котором обработчики работают с хранилищем `backend` без кэша и реплик."""
+    import httpx
+
+    from app.core.dependencies.group import group_persistence_dependency
+    from main import app
+
+    async def persistence_override() -> AsyncIterator[BaseGroupPersistence]:
+        async with backend() as persistence:
+            yield persistence
+
+    app.dependency_overrides[group_persistence_dependency] = persistence_override
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api/v1/group") as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(group_persistence_dependency, None)
@@ -0,0 +1,117 @@
+"""
+Кэш чтений: изменения сбрасывают затронутые записи, значение, прочитанное до изменения, не возвращается
+в кэш после сброса, а чтения с реплики пользуются кэшем, но не пополняют его.
+"""
+import asyncio
+from typing import List
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.domain.entities import Group, Student
+from app.persistance.cache import LRUCache
+from app.persistance.cached import CachedGroupPersistence
+from backends import BACKENDS, dispose
+
+
+class _PausedReads:
+    """Обёртка, которая задерживает возврат прочитанного студента до сигнала `resume`."""
+
+    def __init__(self, persistence):
+        self.persistence = persistence
+        self.loaded = asyncio.Event()
+        self.resume = asyncio.Event()
+
+    def __getattr__(self, name):
+        return getattr(self.persistence, name)
+
+    async def get_student_by_id(self, student_id: UUID):
+        student = await self.persistence.get_student_by_id(student_id)
+        self.loaded.set()
+        await self.resume.wait()
+        return student
+
+
+def _run(backend, scenario) -> None:
+    """Создать две группы и студента в группе 0 и выполнить сценарий с новым кэшем."""
+
+    async def main() -> None:
+        group_ids, student_id = [uuid4() for _ in range(2)], uuid4()
+        async with backend() as persistence:
+            await persistence.create_groups_bulk(
+                [Group(id=group_id, name=f"test {group_id}", number=str(index)) for index, group_id in enumerate(group_ids)]
+            )
+            await persistence.create_student(Student(id=student_id, name=f"test {student_id}", number="1"))
+            await persistence.assign_student_to_group(student_id, group_ids[0])
+        try:
+            await scenario(backend, LRUCache(max_size=100, ttl=60), group_ids, student_id)
+        finally:
+            async with backend() as persistence:
+                await persistence.delete_student(student_id)
+                for group_id in group_ids:
+                    if await persistence.get_by_id(group_id) is not None:
+                        await persistence.delete_group(group_id)
+            await dispose(backend)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_writes_invalidate_cached_reads(backend):
+    async def scenario(backend, cache, group_ids, student_id):
+        async def group_ids_of_students(group_id: UUID) -> List[List[UUID]]:
+            async with backend() as persistence:
+                students = await CachedGroupPersistence(persistence, cache).get_group_students(group_id)
+            return [student.group_ids for student in students]
+
+        assert await group_ids_of_students(group_ids[0]) == [[group_ids[0]]]
+        async with backend() as persistence:
+            cached = CachedGroupPersistence(persistence, cache)
+            assert (await cached.get_student_by_id(student_id)).group_ids == [group_ids[0]]
+            await cached.assign_student_to_group(student_id, group_ids[1])
+            assert (await cached.get_student_by_id(student_id)).group_ids == sorted(group_ids)
+        # Участник сброшен под своим ключом, поэтому состав группы 0 показывает его новую группу
+        assert await group_ids_of_students(group_ids[0]) == [sorted(group_ids)]
+
+        async with backend() as persistence:
+            await CachedGroupPersistence(persistence, cache).delete_group(group_ids[1])
+        assert await group_ids_of_students(group_ids[0]) == [[group_ids[0]]]
+
+    _run(backend, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_read_started_before_write_is_not_cached(backend):
+    async def scenario(backend, cache, group_ids, student_id):
+        async with backend() as reader_persistence, backend() as writer_persistence:
+            paused = _PausedReads(reader_persistence)
+            read = asyncio.create_task(CachedGroupPersistence(paused, cache).get_student_by_id(student_id))
+            await paused.loaded.wait()
+            await CachedGroupPersistence(writer_persistence, cache).assign_student_to_group(student_id, group_ids[1])
+            paused.resume.set()
+            assert (await read).group_ids == [group_ids[0]]
+
+        assert len(cache) == 0
+        assert cache.stats.discarded == 1
+        async with backend() as persistence:
+            assert (await CachedGroupPersistence(persistence, cache).get_student_by_id(student_id)).group_ids == sorted(group_ids)
+
+    _run(backend, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_replica_reads_use_cache_without_filling_it(backend):
+    async def scenario(backend, cache, group_ids, student_id):
+        async with backend() as persistence:
+            replica = CachedGroupPersistence(persistence, cache, store_reads=False)
+            assert (await replica.get_student_by_id(student_id)).group_ids == [group_ids[0]]
+            assert await replica.get_groups_by_ids(group_ids) != []
+            await replica.get_group_students(group_ids[0])
+            assert len(cache) == 0
+
+            await CachedGroupPersistence(persistence, cache).get_student_by_id(student_id)
+            hits = cache.stats.hits
+            await replica.get_student_by_id(student_id)
+            assert cache.stats.hits == hits + 1
+
+    _run(backend, scenario)
@@ -0,0 +1,190 @@
+"""
+Хранилище в памяти при параллельных изменениях составов: полосы блокировок сохраняют согласованность
+двустороннего индекса связей, а ожидание занятой полосы не блокирует цикл событий.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import List
+from uuid import UUID, uuid4
+
+from app.domain.entities import Group, Student
+from app.domain.exceptions import StudentAlreadyInGroupException, StudentNotInGroupException
+from app.persistance import dictionary
+from app.persistance.dictionary import GroupDictionaryPersistence
+
+WORKERS = 4
+OPERATIONS = 400
+
+
+async def _create(group_ids: List[UUID], student_ids: List[UUID]) -> None:
+    persistence = GroupDictionaryPersistence()
+    await persistence.create_groups_bulk([Group(id=group_id, name=f"test {group_id}", number="1") for group_id in group_ids])
+    await persistence.create_students_bulk(
+        [Student(id=student_id, name=f"test {student_id}", number="1") for student_id in student_ids]
+    )
+
+
+async def _delete(group_ids: List[UUID], student_ids: List[UUID]) -> None:
+    persistence = GroupDictionaryPersistence()
+    for student_id in student_ids:
+        await persistence.delete_student(student_id)
+    for group_id in group_ids:
+        if await persistence.get_by_id(group_id) is not None:
+            await persistence.delete_group(group_id)
+
+
+def _run_in_threads(worker) -> None:
+    """Выполнить `worker(seed)` в нескольких потоках, каждый со своим циклом событий."""
+    errors = []
+
+    def run(seed: int) -> None:
+        try:
+            asyncio.run(worker(seed))
+        except BaseException as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(seed,)) for seed in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def _assert_links_mirrored(group_ids: List[UUID], student_ids: List[UUID]) -> None:
+    """Прямой и обратный индексы связей совпадают, и пустые множества не хранятся."""
+    links = {(student_id, group_id) for group_id in group_ids for student_id in dictionary.group_students.get(group_id, ())}
+    reverse = {(student_id, group_id) for student_id in student_ids for group_id in dictionary.student_groups.get(student_id, ())}
+    assert links == reverse
+    for index, keys in ((dictionary.group_students, group_ids), (dictionary.student_groups, student_ids)):
+        assert all(index[key] for key in keys if key in index)
+    assert all(group_id in dictionary.groups for _, group_id in links)
+
+
+def test_concurrent_membership_changes_keep_links_mirrored():
+    group_ids, student_ids = [uuid4() for _ in range(6)], [uuid4() for _ in range(20)]
+    asyncio.run(_create(group_ids, student_ids))
+
+    async def worker(seed: int) -> None:
+        persistence, rng = GroupDictionaryPersistence(), random.Random(seed)
+        for _ in range(OPERATIONS):
+            student_id, group_id, other_id = rng.choice(student_ids), rng.choice(group_ids), rng.choice(group_ids)
+            operation = rng.random()
+            try:
+                if operation < 0.35:
+                    await persistence.assign_student_to_group(student_id, group_id)
+                elif operation < 0.55:
+                    await persistence.remove_student_from_group(student_id, group_id)
+                elif operation < 0.75:
+                    await persistence.transfer_student_between_groups(student_id, group_id, other_id)
+                elif operation < 0.9:
+                    await persistence.transfer_students_between_groups([(student_id, group_id, other_id)])
+                else:
+                    # Пересоздание группы очищает её состав под полосами всех участников
+                    await persistence.create_group(Group(id=group_id, name=f"test {group_id}", number="2"))
+            except (StudentAlreadyInGroupException, StudentNotInGroupException):
+                pass
+
+    try:
+        _run_in_threads(worker)
+        _assert_links_mirrored(group_ids, student_ids)
+    finally:
+        asyncio.run(_delete(group_ids, student_ids))
+
+
+def test_concurrent_transfers_keep_each_student_in_one_group():
+    group_ids, student_ids = [uuid4() for _ in range(4)], [uuid4() for _ in range(10)]
+
+    async def setup() -> None:
+        await _create(group_ids, student_ids)
+        await GroupDictionaryPersistence().assign_students_to_groups(
+            [(student_id, group_ids[index % len(group_ids)]) for index, student_id in enumerate(student_ids)]
+        )
+
+    async def worker(seed: int) -> None:
+        persistence, rng = GroupDictionaryPersistence(), random.Random(seed)
+        for _ in range(OPERATIONS):
+            # Исходная группа не читается заранее: чтение без блокировок может застать перевод другого потока
+            student_id, from_group_id, to_group_id = rng.choice(student_ids), rng.choice(group_ids), rng.choice(group_ids)
+            try:
+                if rng.random() < 0.5:
+                    await persistence.transfer_student_between_groups(student_id, from_group_id, to_group_id)
+                else:
+                    await persistence.transfer_students_between_groups([(student_id, from_group_id, to_group_id)])
+            except StudentNotInGroupException:
+                pass
+
+    asyncio.run(setup())
+    try:
+        _run_in_threads(worker)
+        for student_id in student_ids:
+            assert len(dictionary.student_groups[student_id]) == 1
+        _assert_links_mirrored(group_ids, student_ids)
+    finally:
+        asyncio.run(_delete(group_ids, student_ids))
+
+
+def test_waiting_for_a_held_stripe_does_not_block_the_event_loop():
+    group_ids, student_ids = [uuid4()], [uuid4()]
+    asyncio.run(_create(group_ids, student_ids))
+    held, release = threading.Event(), threading.Event()
+
+    def hold_all_stripes() -> None:
+        with dictionary._locks.hold_all():
+            held.set()
+            release.wait(timeout=5)  # Не зависнуть, если ожидание всё же заблокирует цикл событий
+
+    async def main() -> None:
+        holder = threading.Thread(target=hold_all_stripes)
+        holder.start()
+        held.wait()
+        assign = asyncio.create_task(GroupDictionaryPersistence().assign_student_to_group(student_ids[0], group_ids[0]))
+        started_at = time.monotonic()
+        # Цикл событий продолжает работать, пока операция ждёт полос
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+        assert not assign.done()
+        assert time.monotonic() - started_at < 1
+        release.set()
+        await assign
+        holder.join()
+        assert dictionary.student_groups[student_ids[0]] == {group_ids[0]}
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+        asyncio.run(_delete(group_ids, student_ids))
+
+
+def test_cancelled_wait_releases_stripes():
+    group_ids, student_ids = [uuid4()], [uuid4()]
+    asyncio.run(_create(group_ids, student_ids))
+    held, release = threading.Event(), threading.Event()
+
+    def hold_stripes() -> None:
+        with dictionary._locks.hold(student_ids[0], group_ids[0]):
+            held.set()
+            release.wait(timeout=5)
+
+    async def main() -> None:
+        holder = threading.Thread(target=hold_stripes)
+        holder.start()
+        held.wait()
+        persistence = GroupDictionaryPersistence()
+        assign = asyncio.create_task(persistence.assign_student_to_group(student_ids[0], group_ids[0]))
+        await asyncio.sleep(0.01)
+        assign.cancel()
+        release.set()
+        holder.join()
+        await asyncio.gather(assign, return_exceptions=True)
+        # Полосы, полученные потоком уже после отмены, отпущены: следующая операция не ждёт вечно
+        await asyncio.wait_for(persistence.assign_student_to_group(student_ids[0], group_ids[0]), timeout=5)
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+        asyncio.run(_delete(group_ids, student_ids))
@@ -0,0 +1,145 @@
+"""
+Потоковая выгрузка групп и студентов: CSV с заголовком и экранированием, NDJSON по строке на запись,
+выгрузка содержит каждую запись хранилища ровно один раз и отдаётся фрагментами по `EXPORT_CHUNK_SIZE` строк.
+"""
+import asyncio
+import csv
+import io
+import json
+from typing import AsyncIterator, List
+from uuid import uuid4
+
+import pytest
+
+from app.api.v1.export import EXPORT_CHUNK_SIZE, export_chunks
+from app.domain.entities import Group, Student
+from backends import BACKENDS, api_client, dispose, memory
+
+pytest.importorskip("httpx")
+
+# Названия, которые CSV должен экранировать
+NAMES = ["plain", 'comma, "quotes"', "line\nbreak", "юникод"]
+
+ENTITIES = [
+    pytest.param(Group, "groups", id="groups"),
+    pytest.param(Student, "students", id="students"),
+]
+
+
+def _run(backend, entity, scenario) -> None:
+    """Создать записи с названиями из `NAMES` и выполнить сценарий в одном цикле событий."""
+
+    async def main() -> None:
+        entities = [entity(id=uuid4(), name=name, number=str(index)) for index, name in enumerate(NAMES)]
+        async with backend() as persistence:
+            if entity is Group:
+                await persistence.create_groups_bulk(entities)
+            else:
+                await persistence.create_students_bulk(entities)
+        try:
+            await scenario(entities)
+        finally:
+            async with backend() as persistence:
+                for created in entities:
+                    if entity is Group:
+                        await persistence.delete_group(created.id)
+                    else:
+                        await persistence.delete_student(created.id)
+            await dispose(backend)
+
+    asyncio.run(main())
+
+
+async def _stored_count(backend, entity) -> int:
+    async with backend() as persistence:
+        entities = persistence.iter_groups() if entity is Group else persistence.iter_students()
+        return sum([1 async for _ in entities])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("entity,path", ENTITIES)
+def test_csv_export(backend, entity, path):
+    async def scenario(entities):
+        async with api_client(backend) as client:
+            response = await client.get(f"/{path}/export", params={"format": "csv"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+
+        header, *rows = list(csv.reader(io.StringIO(response.text)))
+        assert header == ["id", "name", "number"]
+        # В базе Postgres могут быть и другие записи: каждая запись выгружается ровно один раз
+        assert len(rows) == len({row[0] for row in rows}) == await _stored_count(backend, entity)
+        exported = {row[0]: row for row in rows}
+        for created in entities:
+            assert exported[str(created.id)] == [str(created.id), created.name, created.number]
+
+    _run(backend, entity, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("entity,path", ENTITIES)
+def test_ndjson_export(backend, entity, path):
+    async def scenario(entities):
+        group_id = None
+        if entity is Student:
+            group_id = uuid4()
+            async with backend() as persistence:
+                await persistence.create_group(Group(id=group_id, name="export", number="1"))
+                await persistence.assign_student_to_group(entities[0].id, group_id)
+        try:
+            async with api_client(backend) as client:
+                response = await client.get(f"/{path}/export")
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+
+            lines = response.text.split("\n")
+            assert lines[-1] == ""
+            records = [json.loads(line) for line in lines[:-1]]
+            assert len(records) == len({record["id"] for record in records}) == await _stored_count(backend, entity)
+            exported = {record["id"]: record for record in records}
+            for created in entities:
+                record = exported[str(created.id)]
+                assert (record["name"], record["number"]) == (created.name, created.number)
+            if entity is Student:
+                assert exported[str(entities[0].id)]["group_ids"] == [str(group_id)]
+                assert exported[str(entities[1].id)]["group_ids"] == []
+        finally:
+            if group_id is not None:
+                async with backend() as persistence:
+                    await persistence.delete_group(group_id)
+
+    _run(backend, entity, scenario)
+
+
+@pytest.mark.parametrize("path", ["groups", "students"])
+def test_unknown_format_is_rejected(path):
+    async def main() -> None:
+        async with api_client(memory) as client:
+            response = await client.get(f"/{path}/export", params={"format": "xml"})
+        assert response.status_code == 422
+
+    asyncio.run(main())
+
+
+async def _collect(count: int, export_format: str) -> List[str]:
+    async def groups() -> AsyncIterator[Group]:
+        for index in range(count):
+            yield Group(id=uuid4(), name=f"group {index}", number=str(index))
+
+    return [chunk async for chunk in export_chunks(groups(), export_format)]
+
+
+@pytest.mark.parametrize("export_format,extra_lines", [("csv", 1), ("ndjson", 0)])
+@pytest.mark.parametrize("count", [0, 1, EXPORT_CHUNK_SIZE, 2 * EXPORT_CHUNK_SIZE + 1])
+def test_export_is_chunked(export_format, extra_lines, count):
+    chunks = asyncio.run(_collect(count, export_format))
+
+    # Полные фрагменты по EXPORT_CHUNK_SIZE строк и остаток; пустых фрагментов нет
+    assert all(chunks)
+    sizes = [chunk.count("\n") for chunk in chunks]
+    expected = [EXPORT_CHUNK_SIZE] * (count // EXPORT_CHUNK_SIZE) + ([count % EXPORT_CHUNK_SIZE] if count % EXPORT_CHUNK_SIZE else [])
+    if extra_lines:
+        # Заголовок CSV уходит с первым фрагментом
+        expected = [expected[0] + extra_lines, *expected[1:]] if expected else [extra_lines]
+    assert sizes == expected
+    assert "".join(chunks).count("\n") == count + extra_lines
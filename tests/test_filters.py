@@ -0,0 +1,163 @@
+"""
+Отбор в списках групп и студентов: номер совпадает точно, префикс названия учитывает регистр,
+подстрока названия ищется без учёта регистра, символы `%` и `_` в условиях — обычные символы,
+студенты отбираются по группе; отбор сочетается с постраничной выдачей.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Set
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.domain.entities import Group, Student
+from backends import BACKENDS, api_client, dispose
+
+pytest.importorskip("httpx")
+
+# Окончания названий и номера записей; перед окончанием стоит уникальный префикс теста
+ROWS = [("Alpha", "1"), ("alpha beta", "1"), ("Beta", "2"), ("_x", "2"), ("ax", "3"), ("%y", "3"), ("zzy", "3")]
+
+ENTITIES = [
+    pytest.param(Group, "groups", id="groups"),
+    pytest.param(Student, "students", id="students"),
+]
+
+
+def _run(backend, entity, scenario: Callable[[str, Dict[str, UUID]], Awaitable[None]]) -> None:
+    """
+    Создать записи из `ROWS` и выполнить сценарий в одном цикле событий.
+
+    Названия и номера начинаются с уникального префикса, чтобы остальные данные базы не попадали в отбор.
+    Сценарий получает префикс и ID записей по окончанию названия.
+    """
+
+    async def main() -> None:
+        prefix = f"flt{uuid4().hex}"
+        entities = [entity(id=uuid4(), name=f"{prefix}{suffix}", number=f"{prefix}-{number}") for suffix, number in ROWS]
+        async with backend() as persistence:
+            if entity is Group:
+                await persistence.create_groups_bulk(entities)
+            else:
+                await persistence.create_students_bulk(entities)
+        try:
+            await scenario(prefix, {suffix: created.id for (suffix, _), created in zip(ROWS, entities)})
+        finally:
+            async with backend() as persistence:
+                for created in entities:
+                    if entity is Group:
+                        await persistence.delete_group(created.id)
+                    else:
+                        await persistence.delete_student(created.id)
+            await dispose(backend)
+
+    asyncio.run(main())
+
+
+async def _ids(client, path: str, **params) -> List[UUID]:
+    response = await client.get(f"/{path}", params=params)
+    assert response.status_code == 200
+    return [UUID(item["id"]) for item in response.json()[path]]
+
+
+def _select(ids: Dict[str, UUID], *suffixes: str) -> Set[UUID]:
+    return {ids[suffix] for suffix in suffixes}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("entity,path", ENTITIES)
+def test_name_prefix_is_case_sensitive(backend, entity, path):
+    async def scenario(prefix, ids):
+        async with api_client(backend) as client:
+            assert set(await _ids(client, path, name_prefix=prefix)) == set(ids.values())
+            assert set(await _ids(client, path, name_prefix=f"{prefix}Al")) == _select(ids, "Alpha")
+            assert set(await _ids(client, path, name_prefix=f"{prefix}al")) == _select(ids, "alpha beta")
+            assert await _ids(client, path, name_prefix=f"{prefix}ALPHA") == []
+
+    _run(backend, entity, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("entity,path", ENTITIES)
+def test_search_is_case_insensitive_substring(backend, entity, path):
+    async def scenario(prefix, ids):
+        async with api_client(backend) as client:
+            # Подстрока из середины названия в другом регистре
+            assert set(await _ids(client, path, search=prefix[3:].upper())) == set(ids.values())
+            assert set(await _ids(client, path, name_prefix=prefix, search="ALPHA")) == _select(ids, "Alpha", "alpha beta")
+            assert set(await _ids(client, path, name_prefix=prefix, search="eTa")) == _select(ids, "alpha beta", "Beta")
+            assert await _ids(client, path, name_prefix=prefix, search="gamma") == []
+
+    _run(backend, entity, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("entity,path", ENTITIES)
+def test_wildcards_are_literal(backend, entity, path):
+    async def scenario(prefix, ids):
+        async with api_client(backend) as client:
+            assert set(await _ids(client, path, name_prefix=f"{prefix}_")) == _select(ids, "_x")
+            assert set(await _ids(client, path, name_prefix=f"{prefix}%")) == _select(ids, "%y")
+            assert set(await _ids(client, path, name_prefix=prefix, search="_")) == _select(ids, "_x")
+            assert set(await _ids(client, path, name_prefix=prefix, search="%")) == _select(ids, "%y")
+
+    _run(backend, entity, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("entity,path", ENTITIES)
+def test_number_matches_exactly(backend, entity, path):
+    async def scenario(prefix, ids):
+        async with api_client(backend) as client:
+            assert set(await _ids(client, path, number=f"{prefix}-1")) == _select(ids, "Alpha", "alpha beta")
+            assert set(await _ids(client, path, number=f"{prefix}-3", search="Y")) == _select(ids, "%y", "zzy")
+            assert await _ids(client, path, number=f"{prefix}-") == []
+
+    _run(backend, entity, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("entity,path", ENTITIES)
+def test_filtered_pages_cover_filtered_list(backend, entity, path):
+    async def scenario(prefix, ids):
+        async with api_client(backend) as client:
+            expected = await _ids(client, path, name_prefix=prefix, number=f"{prefix}-3")
+            assert set(expected) == _select(ids, "ax", "%y", "zzy")
+
+            collected, after = [], None
+            while True:
+                params = {"name_prefix": prefix, "number": f"{prefix}-3", "limit": 1}
+                if after is not None:
+                    params["after"] = after
+                body = (await client.get(f"/{path}", params=params)).json()
+                collected += [UUID(item["id"]) for item in body[path]]
+                after = body["next_cursor"]
+                if after is None:
+                    break
+            assert collected == expected
+
+    _run(backend, entity, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_students_by_group(backend):
+    async def scenario(prefix, ids):
+        group_ids = [uuid4(), uuid4()]
+        async with backend() as persistence:
+            await persistence.create_groups_bulk(
+                [Group(id=group_id, name=f"{prefix} group", number="1") for group_id in group_ids]
+            )
+            await persistence.assign_students_to_groups(
+                [(ids["Alpha"], group_ids[0]), (ids["Beta"], group_ids[0]), (ids["Beta"], group_ids[1])]
+            )
+        try:
+            async with api_client(backend) as client:
+                assert set(await _ids(client, "students", group_id=str(group_ids[0]))) == _select(ids, "Alpha", "Beta")
+                assert await _ids(client, "students", group_id=str(group_ids[1])) == [ids["Beta"]]
+                assert await _ids(client, "students", group_id=str(group_ids[0]), search="alpha") == [ids["Alpha"]]
+                assert await _ids(client, "students", group_id=str(uuid4())) == []
+        finally:
+            async with backend() as persistence:
+                for group_id in group_ids:
+                    await persistence.delete_group(group_id)
+
+    _run(backend, Student, scenario)
@@ -0,0 +1,66 @@
+"""
+ETag состава группы: ответ содержит группы каждого участника, поэтому ETag меняется не только при изменении
+состава самой группы, но и когда её участник вступает в другие группы или покидает их.
+"""
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.domain.entities import Group, Student
+from backends import BACKENDS, api_client, dispose
+
+pytest.importorskip("httpx")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_etag_follows_memberships_in_other_groups(backend):
+    async def main() -> None:
+        group_ids, student_id = [uuid4() for _ in range(4)], uuid4()
+        watched = group_ids[0]
+        async with backend() as persistence:
+            await persistence.create_groups_bulk(
+                [Group(id=group_id, name=f"test {group_id}", number=str(index)) for index, group_id in enumerate(group_ids)]
+            )
+            await persistence.create_student(Student(id=student_id, name=f"test {student_id}", number="1"))
+            await persistence.assign_students_to_groups([(student_id, watched), (student_id, group_ids[1])])
+        try:
+            async with api_client(backend) as client:
+                response = await client.get(f"/groups/{watched}/students")
+                etag = response.headers["ETag"]
+
+                async def assert_refreshed(expected_group_ids) -> None:
+                    nonlocal etag
+                    refreshed = await client.get(f"/groups/{watched}/students", headers={"If-None-Match": etag})
+                    assert refreshed.status_code == 200
+                    [student] = refreshed.json()["students"]
+                    assert sorted(map(UUID, student["group_ids"])) == sorted(expected_group_ids)
+                    assert refreshed.headers["ETag"] != etag
+                    etag = refreshed.headers["ETag"]
+
+                unchanged = await client.get(f"/groups/{watched}/students", headers={"If-None-Match": etag})
+                assert unchanged.status_code == 304
+
+                async with backend() as persistence:
+                    await persistence.assign_student_to_group(student_id, group_ids[2])
+                await assert_refreshed([watched, group_ids[1], group_ids[2]])
+
+                async with backend() as persistence:
+                    await persistence.remove_student_from_group(student_id, group_ids[1])
+                await assert_refreshed([watched, group_ids[2]])
+
+                async with backend() as persistence:
+                    await persistence.transfer_student_between_groups(student_id, group_ids[2], group_ids[3])
+                await assert_refreshed([watched, group_ids[3]])
+
+                async with backend() as persistence:
+                    await persistence.delete_group(group_ids[3])
+                await assert_refreshed([watched])
+        finally:
+            async with backend() as persistence:
+                await persistence.delete_student(student_id)
+                for group_id in group_ids[:3]:
+                    await persistence.delete_group(group_id)
+            await dispose(backend)
+
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+"""
+Миграции Alembic на отдельной временной базе: пустая база доводится до последней ревизии, база с таблицами,
+созданными раньше напрямую без версии Alembic, отмечается ревизией `UNVERSIONED_SCHEMA_REVISION` и доводится
+с сохранением данных, откат и повторное применение ревизий проходят без ошибок.
+
+Ревизия 0006 требует расширения pg_trgm; если его нет на сервере, проверяются ревизии до 0005.
+"""
+from pathlib import Path
+from typing import Iterator, Set
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Column, Engine, ForeignKey, MetaData, String, Table, Uuid, create_engine, inspect, make_url, text
+from sqlalchemy.exc import DBAPIError
+
+from backends import requires_postgres
+
+pytestmark = requires_postgres
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / "app" / "db" / "postgres"
+
+# Ревизия, которой env.py отмечает базу с таблицами без версии Alembic
+UNVERSIONED_SCHEMA_REVISION = "8cf0a56fe2c0"
+
+# Последняя ревизия, которая не требует pg_trgm
+WITHOUT_TRGM_REVISION = "0005"
+
+
+def _legacy_metadata() -> MetaData:
+    """Таблицы в том виде, в котором их создавал прежний env.py по моделям, минуя миграции."""
+    metadata = MetaData()
+    Table("groups", metadata, Column("id", Uuid, primary_key=True), Column("name", String, nullable=False),
+          Column("group_number", String, nullable=False))
+    Table("students", metadata, Column("id", Uuid, primary_key=True), Column("name", String, nullable=False),
+          Column("student_number", String, nullable=False))
+    Table("group_students", metadata, Column("id", Uuid, primary_key=True),
+          Column("group_id", Uuid, ForeignKey("groups.id"), nullable=False),
+          Column("student_id", Uuid, ForeignKey("students.id"), nullable=False))
+    return metadata
+
+
+@pytest.fixture
+def engine() -> Iterator[Engine]:
+    """Движок временной базы, удаляемой после теста; база приложения не затрагивается."""
+    from app.core.db_config import DB_ENGINE, DB_URI
+
+    name = f"migrations_{uuid4().hex}"
+    admin = DB_ENGINE.execution_options(isolation_level="AUTOCOMMIT")
+    with admin.connect() as connection:
+        try:
+            connection.execute(text(f'CREATE DATABASE "{name}"'))
+        except DBAPIError as error:
+            pytest.skip(f"Не удалось создать временную базу: {error}")
+    scratch = create_engine(make_url(DB_URI).set(database=name))
+    try:
+        yield scratch
+    finally:
+        scratch.dispose()
+        with admin.connect() as connection:
+            connection.execute(text(f'DROP DATABASE "{name}"'))
+
+
+def _config():
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS))
+    return config
+
+
+def _migrate(engine: Engine, command_name: str, revision: str) -> None:
+    """Выполнить команду Alembic на соединении с временной базой (env.py берёт его из `config.attributes`)."""
+    from alembic import command
+
+    config = _config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        getattr(command, command_name)(config, revision)
+
+
+def _head() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_config()).get_current_head()
+
+
+def _has_trgm(engine: Engine) -> bool:
+    with engine.connect() as connection:
+        return connection.scalar(text("SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'")) > 0
+
+
+def _target(engine: Engine) -> str:
+    return _head() if _has_trgm(engine) else WITHOUT_TRGM_REVISION
+
+
+def _version(engine: Engine) -> str:
+    with engine.connect() as connection:
+        return connection.scalar(text("SELECT version_num FROM alembic_version"))
+
+
+def _indexes(engine: Engine, table: str) -> Set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def _assert_schema(engine: Engine, revision: str) -> None:
+    """Проверить схему, которую дают ревизии 0003–0007 (до `revision` включительно)."""
+    schema = inspect(engine)
+    assert {"groups", "students", "group_students"} <= set(schema.get_table_names())
+    assert schema.get_pk_constraint("group_students")["constrained_columns"] == ["group_id", "student_id"]
+    assert {"ix_groups_name_id", "ix_groups_group_number"} <= _indexes(engine, "groups")
+    assert {"ix_students_name_id", "ix_students_student_number"} <= _indexes(engine, "students")
+    assert "ix_group_students_student_id" in _indexes(engine, "group_students")
+    assert "revision" in {column["name"] for column in schema.get_columns("groups")}
+    if revision == _head():
+        for table in ("groups", "students"):
+            assert {f"ix_{table}_name_pattern", f"ix_{table}_name_trgm"} <= _indexes(engine, table)
+        assert schema.has_table("groups_list_revision")
+
+
+def test_empty_database_is_upgraded(engine):
+    target = _target(engine)
+    _migrate(engine, "upgrade", target)
+
+    assert _version(engine) == target
+    _assert_schema(engine, target)
+    # Пустая база не отмечается: применяются и ранние ревизии
+    assert inspect(engine).has_table("group")
+
+    # Ревизия группы заполняется из последовательности
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO groups (id, name, group_number) VALUES (:id, 'g', '1')"), {"id": uuid4()})
+        assert connection.scalar(text("SELECT revision FROM groups")) is not None
+
+
+def test_legacy_schema_is_stamped_and_upgraded(engine):
+    group_id, student_id = uuid4(), uuid4()
+    _legacy_metadata().create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO groups VALUES (:id, 'group', '1')"), {"id": group_id})
+        connection.execute(text("INSERT INTO students VALUES (:id, 'student', '1')"), {"id": student_id})
+        # Повторные связи, которые раньше не запрещались
+        for _ in range(3):
+            connection.execute(
+                text("INSERT INTO group_students VALUES (:id, :group_id, :student_id)"),
+                {"id": uuid4(), "group_id": group_id, "student_id": student_id}
+            )
+
+    target = _target(engine)
+    _migrate(engine, "upgrade", target)
+
+    assert _version(engine) == target
+    _assert_schema(engine, target)
+    # База отмечена ревизией UNVERSIONED_SCHEMA_REVISION: ревизии до неё, создающие таблицу group, не применялись
+    assert not inspect(engine).has_table("group")
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT group_id, student_id FROM group_students")).all() == [(group_id, student_id)]
+        assert connection.execute(text("SELECT name, group_number FROM groups")).all() == [("group", "1")]
+        assert connection.scalar(text("SELECT revision FROM groups")) is not None
+
+
+def test_unversioned_current_schema_is_upgraded(engine):
+    if not _has_trgm(engine):
+        pytest.skip("Модели создают индексы pg_trgm, а расширения нет на сервере")
+    from sqlmodel import SQLModel
+
+    import app.db.models  # noqa: F401
+    SQLModel.metadata.create_all(engine)
+
+    _migrate(engine, "upgrade", _head())
+
+    assert _version(engine) == _head()
+    _assert_schema(engine, _head())
+
+
+def test_downgrade_and_upgrade_again(engine):
+    target = _target(engine)
+    _migrate(engine, "upgrade", target)
+    _migrate(engine, "downgrade", UNVERSIONED_SCHEMA_REVISION)
+
+    assert _version(engine) == UNVERSIONED_SCHEMA_REVISION
+    # Таблицы остаются: их создание в 0003 условное, повторное применение находит их готовыми
+    assert "ix_groups_name_id" not in _indexes(engine, "groups")
+    assert "revision" not in {column["name"] for column in inspect(engine).get_columns("groups")}
+
+    _migrate(engine, "upgrade", target)
+
+    assert _version(engine) == target
+    _assert_schema(engine, target)
@@ -0,0 +1,153 @@
+"""
+Постраничная выдача списков групп и студентов по курсору: страницы идут по (name, id) без пропусков и повторов,
+курсор указывает на позицию, а не на номер записи, некорректный курсор отклоняется ответом 400.
+"""
+import asyncio
+import base64
+import json
+from typing import Awaitable, Callable, List
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.domain.entities import Group, Student
+from backends import BACKENDS, api_client, dispose, memory
+
+pytest.importorskip("httpx")
+
+# Названия с повторами, чтобы порядок внутри одинаковых названий определялся ID
+NAMES = "cabbcaab"
+
+ENTITIES = [
+    pytest.param(Group, "groups", id="groups"),
+    pytest.param(Student, "students", id="students"),
+]
+
+
+def _run(backend, entity, scenario: Callable[[str, List], Awaitable[None]]) -> None:
+    """
+    Создать записи с общим уникальным префиксом названия и выполнить сценарий в одном цикле событий.
+
+    Префикс отделяет записи теста от остальных данных базы: сценарий запрашивает списки с `name_prefix`.
+    """
+
+    async def main() -> None:
+        prefix = f"page{uuid4().hex}"
+        entities = [entity(id=uuid4(), name=f"{prefix}{name}", number=str(index)) for index, name in enumerate(NAMES)]
+        async with backend() as persistence:
+            if entity is Group:
+                await persistence.create_groups_bulk(entities)
+            else:
+                await persistence.create_students_bulk(entities)
+        try:
+            await scenario(prefix, entities)
+        finally:
+            async with backend() as persistence:
+                for created in entities:
+                    if entity is Group:
+                        await persistence.delete_group(created.id)
+                    else:
+                        await persistence.delete_student(created.id)
+            await dispose(backend)
+
+    asyncio.run(main())
+
+
+def _ordered_ids(entities) -> List[str]:
+    return [str(entity.id) for entity in sorted(entities, key=lambda entity: (entity.name, entity.id))]
+
+
+async def _walk(client, path: str, **params) -> List[List[str]]:
+    """Пройти все страницы списка по `next_cursor` и вернуть ID записей каждой страницы."""
+    pages, after = [], None
+    while True:
+        query = dict(params, **({"after": after} if after is not None else {}))
+        response = await client.get(f"/{path}", params=query)
+        assert response.status_code == 200
+        body = response.json()
+        pages.append([item["id"] for item in body[path]])
+        after = body["next_cursor"]
+        if after is None:
+            return pages
+
+
+def _cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("entity,path", ENTITIES)
+@pytest.mark.parametrize("limit,sizes", [(3, [3, 3, 2]), (4, [4, 4]), (100, [8])])
+def test_pages_cover_list_in_order(backend, entity, path, limit, sizes):
+    async def scenario(prefix, entities):
+        async with api_client(backend) as client:
+            pages = await _walk(client, path, name_prefix=prefix, limit=limit)
+        # Последняя страница не возвращает курсор, даже если записей ровно на целое число страниц
+        assert [len(page) for page in pages] == sizes
+        assert [entity_id for page in pages for entity_id in page] == _ordered_ids(entities)
+
+    _run(backend, entity, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("entity,path", ENTITIES)
+def test_cursor_keeps_position_after_changes(backend, entity, path):
+    async def scenario(prefix, entities):
+        expected = _ordered_ids(entities)
+        async with api_client(backend) as client:
+            first = await client.get(f"/{path}", params={"name_prefix": prefix, "limit": 3})
+            assert [item["id"] for item in first.json()[path]] == expected[:3]
+
+            # Удаление последней записи страницы и новая запись перед курсором не сдвигают следующую страницу
+            inserted = entity(id=uuid4(), name=prefix, number="0")
+            last = UUID(expected[2])
+            async with backend() as persistence:
+                if entity is Group:
+                    await persistence.delete_group(last)
+                    await persistence.create_group(inserted)
+                else:
+                    await persistence.delete_student(last)
+                    await persistence.create_student(inserted)
+            entities[:] = [created for created in entities if created.id != last] + [inserted]
+
+            second = await client.get(
+                f"/{path}", params={"name_prefix": prefix, "limit": 3, "after": first.json()["next_cursor"]}
+            )
+            assert [item["id"] for item in second.json()[path]] == expected[3:6]
+
+    _run(backend, entity, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("path", ["groups", "students"])
+@pytest.mark.parametrize("cursor", [
+    pytest.param("not a cursor!", id="not-base64"),
+    pytest.param(base64.urlsafe_b64encode(b"not json").decode(), id="not-json"),
+    pytest.param(_cursor(42), id="not-a-pair"),
+    pytest.param(_cursor(["name"]), id="short"),
+    pytest.param(_cursor(["name", str(uuid4()), "extra"]), id="long"),
+    pytest.param(_cursor(["name", "not-a-uuid"]), id="bad-id"),
+    pytest.param(_cursor(["name", None]), id="null-id"),
+])
+def test_invalid_cursor_is_rejected(backend, path, cursor):
+    async def main() -> None:
+        try:
+            async with api_client(backend) as client:
+                response = await client.get(f"/{path}", params={"after": cursor})
+            assert response.status_code == 400
+            assert response.json()["detail"] == "Invalid cursor"
+        finally:
+            await dispose(backend)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("path", ["groups", "students"])
+@pytest.mark.parametrize("limit", [0, -1, 1001])
+def test_limit_out_of_range_is_rejected(path, limit):
+    async def main() -> None:
+        async with api_client(memory) as client:
+            response = await client.get(f"/{path}", params={"limit": limit})
+        assert response.status_code == 422
+
+    asyncio.run(main())
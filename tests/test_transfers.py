@@ -0,0 +1,83 @@
+"""
+Пакетный перевод студентов: переводы применяются по порядку, студент должен состоять в исходной группе,
+пакет применяется целиком или не применяется вовсе — одинаково в хранилище в памяти и в Postgres.
+"""
+import asyncio
+from typing import Awaitable, Callable, List
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.domain.entities import Group, Student
+from app.domain.exceptions import StudentNotInGroupException
+from backends import BACKENDS, dispose
+
+
+def _run(backend, scenario: Callable[[Callable, List[UUID], List[UUID]], Awaitable[None]]) -> None:
+    """Создать три группы и двух студентов, первого — в группе 0, и выполнить сценарий в одном цикле событий."""
+
+    async def main() -> None:
+        group_ids, student_ids = [uuid4() for _ in range(3)], [uuid4() for _ in range(2)]
+        async with backend() as persistence:
+            await persistence.create_groups_bulk(
+                [Group(id=group_id, name=f"test {group_id}", number=str(index)) for index, group_id in enumerate(group_ids)]
+            )
+            await persistence.create_students_bulk(
+                [Student(id=student_id, name=f"test {student_id}", number="1") for student_id in student_ids]
+            )
+            await persistence.assign_student_to_group(student_ids[0], group_ids[0])
+        try:
+            await scenario(backend, group_ids, student_ids)
+        finally:
+            async with backend() as persistence:
+                for student_id in student_ids:
+                    await persistence.delete_student(student_id)
+                for group_id in group_ids:
+                    await persistence.delete_group(group_id)
+            await dispose(backend)
+
+    asyncio.run(main())
+
+
+async def _group_ids(backend, student_id: UUID) -> List[UUID]:
+    async with backend() as persistence:
+        return (await persistence.get_student_by_id(student_id)).group_ids
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_transfer_of_non_member_is_rejected(backend):
+    async def scenario(backend, group_ids, student_ids):
+        async with backend() as persistence:
+            with pytest.raises(StudentNotInGroupException):
+                await persistence.transfer_students_between_groups([(student_ids[1], group_ids[0], group_ids[1])])
+        assert await _group_ids(backend, student_ids[1]) == []
+
+    _run(backend, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_rejected_batch_changes_nothing(backend):
+    async def scenario(backend, group_ids, student_ids):
+        async with backend() as persistence:
+            with pytest.raises(StudentNotInGroupException):
+                await persistence.transfer_students_between_groups([
+                    (student_ids[0], group_ids[0], group_ids[1]),
+                    (student_ids[1], group_ids[0], group_ids[1]),
+                ])
+        assert await _group_ids(backend, student_ids[0]) == [group_ids[0]]
+        assert await _group_ids(backend, student_ids[1]) == []
+
+    _run(backend, scenario)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_chained_transfers_apply_in_order(backend):
+    async def scenario(backend, group_ids, student_ids):
+        async with backend() as persistence:
+            await persistence.transfer_students_between_groups([
+                (student_ids[0], group_ids[0], group_ids[1]),
+                (student_ids[0], group_ids[1], group_ids[2]),
+            ])
+        assert await _group_ids(backend, student_ids[0]) == [group_ids[2]]
+
+    _run(backend, scenario)
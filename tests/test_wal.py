@@ -0,0 +1,131 @@
+"""
+Сохранение хранилища в памяти: журнал изменений, восстановление из снимка и хвоста журнала,
+отбрасывание оборванной последней записи и резервирование ревизий между перезапусками.
+"""
+import asyncio
+import os
+import struct
+from uuid import uuid4
+
+import pytest
+
+from app.domain.entities import Group, Student
+from app.persistance import dictionary
+from app.persistance.dictionary import GroupDictionaryPersistence
+from app.persistance.wal import WalOperation, WriteAheadLog, read_records
+
+
+@pytest.fixture
+def paths(tmp_path):
+    """Пути снимка и журнала; после теста журналирование выключается, а хранилище очищается."""
+    yield str(tmp_path / "snapshot.bin"), str(tmp_path / "wal.log")
+    dictionary.close()
+    dictionary.recover(str(tmp_path / "empty.bin"), str(tmp_path / "empty.log"))
+    dictionary.close()
+
+
+def _state() -> tuple:
+    """Всё содержимое хранилища, включая индексы и порядок сортировки."""
+    return (
+        {group_id: (record.name, record.number) for group_id, record in dictionary.groups.items()},
+        {student_id: (record.name, record.number) for student_id, record in dictionary.students.items()},
+        {group_id: set(member_ids) for group_id, member_ids in dictionary.group_students.items()},
+        {student_id: set(group_ids) for student_id, group_ids in dictionary.student_groups.items()},
+        list(dictionary.groups_order),
+        list(dictionary.students_order),
+        {number: set(ids) for number, ids in dictionary.groups_by_number.items()},
+        {number: set(ids) for number, ids in dictionary.students_by_number.items()},
+    )
+
+
+async def _changes() -> None:
+    """Создания, связи, переводы, удаления и пересоздание группы с другим названием."""
+    persistence = GroupDictionaryPersistence()
+    group_ids, student_ids = [uuid4() for _ in range(3)], [uuid4() for _ in range(4)]
+    await persistence.create_groups_bulk([Group(id=group_id, name=f"g{index}", number=str(index)) for index, group_id in enumerate(group_ids)])
+    await persistence.create_students_bulk([Student(id=student_id, name=f"s{index}", number="1") for index, student_id in enumerate(student_ids)])
+    await persistence.assign_students_to_groups([(student_id, group_ids[0]) for student_id in student_ids])
+    await persistence.assign_student_to_group(student_ids[0], group_ids[1])
+    await persistence.transfer_student_between_groups(student_ids[1], group_ids[0], group_ids[2])
+    await persistence.remove_student_from_group(student_ids[2], group_ids[0])
+    await persistence.delete_student(student_ids[3])
+    await persistence.create_group(Group(id=group_ids[1], name="renamed", number="9"))
+    await persistence.delete_group(group_ids[2])
+
+
+def test_recover_replays_the_log(paths):
+    dictionary.recover(*paths)
+    asyncio.run(_changes())
+    expected = _state()
+    dictionary.close()
+
+    dictionary.recover(*paths)
+    assert _state() == expected
+    # Повторное восстановление из того же журнала даёт то же состояние
+    dictionary.close()
+    dictionary.recover(*paths)
+    assert _state() == expected
+
+
+def test_torn_final_record_is_dropped(paths):
+    dictionary.recover(*paths)
+    asyncio.run(_changes())
+    expected = _state()
+    dictionary.close()
+    with open(paths[1], "ab") as file:
+        file.write(struct.pack("=II", 100, 0) + b"partial")  # Запись, оборванная сбоем посреди записи
+
+    dictionary.recover(*paths)
+    assert _state() == expected
+    # Журнал обрезан до оборванной записи, поэтому новые записи читаются после восстановления
+    group_id = uuid4()
+    asyncio.run(GroupDictionaryPersistence().create_group(Group(id=group_id, name="after", number="1")))
+    dictionary.close()
+    dictionary.recover(*paths)
+    assert dictionary.groups[group_id].name == "after"
+
+
+def test_checkpoint_then_replay(paths):
+    dictionary.recover(*paths)
+    asyncio.run(_changes())
+    dictionary.checkpoint(paths[0])
+    # После снимка в журнале остаётся только резерв ревизий
+    assert [operation for operation, _ in read_records(paths[1])] == [WalOperation.RESERVE_REVISIONS]
+    asyncio.run(_changes())
+    expected = _state()
+    dictionary.close()
+
+    dictionary.recover(*paths)
+    assert _state() == expected
+
+
+def test_truncate_keeps_records_appended_after_position(tmp_path):
+    path = str(tmp_path / "wal.log")
+    first, second = uuid4(), uuid4()
+    wal = WriteAheadLog(path, sync_interval=60)
+    wal.append(WalOperation.DELETE_GROUP, first)
+    position = wal.position()
+    number = wal.append(WalOperation.DELETE_GROUP, second)
+    wal.truncate(position)
+    assert wal.synced(number)
+    wal.append(WalOperation.DELETE_STUDENT, first)
+    wal.close()
+    assert list(read_records(path)) == [(WalOperation.DELETE_GROUP, (second,)), (WalOperation.DELETE_STUDENT, (first,))]
+
+
+def test_revisions_continue_above_reserved_after_restart(paths, monkeypatch):
+    monkeypatch.setattr(dictionary, "REVISION_RESERVE", 5)
+    dictionary.recover(*paths, sync_interval=60)
+    persistence = GroupDictionaryPersistence()
+    group_id = uuid4()
+    for _ in range(12):  # Выдача переходит через несколько блоков резерва
+        asyncio.run(persistence.create_group(Group(id=group_id, name="g", number="1")))
+    issued = dictionary.groups[group_id].revision
+    # Без явного сброса журнала: блок, из которого выдана ревизия, уже записан в файл
+    reserved = max(args[0] for operation, args in read_records(paths[1]) if operation == WalOperation.RESERVE_REVISIONS)
+    assert reserved >= issued
+    dictionary.close()
+
+    dictionary.recover(*paths)
+    asyncio.run(persistence.create_group(Group(id=group_id, name="g", number="1")))
+    assert dictionary.groups[group_id].revision > issued